@@ -0,0 +1,59 @@
+"""
+=====================================
+Benchmark the TimeDelayingRidge model
+=====================================
+
+Time the fitting and the prediction of :class:`mne.decoding.TimeDelayingRidge`
+on simulated encoding models with 200 lags and 16, 32 and 64 input channels.
+The lagged auto-correlation matrix has ``n_channels * n_lags`` rows and
+columns, so that with 64 channels solving the regularized system (and not
+building it) dominates the fitting time.
+
+This script is not run when building the documentation because it takes a
+few minutes and about 5 GB of memory.
+"""
+# License: BSD (3-clause)
+
+import time
+
+import numpy as np
+
+from mne.decoding import TimeDelayingRidge
+
+print(__doc__)
+
+###############################################################################
+# Simulate the input channels and a response to all of them
+
+sfreq = 1000.
+tmin, tmax = -0.05, 0.149  # 200 lags
+n_times, n_epochs = 6000, 4
+rng = np.random.RandomState(0)
+
+
+def simulate(n_channels):
+    """Simulate white inputs and a response to their lagged versions."""
+    X = rng.randn(n_times, n_epochs, n_channels)
+    kernel = rng.randn(n_channels, int(round((tmax - tmin) * sfreq)) + 1)
+    y = np.zeros((n_times, n_epochs, 1))
+    for ei in range(n_epochs):
+        for ci in range(n_channels):
+            y[:, ei, 0] += np.convolve(X[:, ei, ci], kernel[ci], 'same')
+    y += rng.randn(*y.shape)
+    return X, y
+
+
+###############################################################################
+# Fit and predict
+
+for n_channels in (16, 32, 64):
+    X, y = simulate(n_channels)
+    model = TimeDelayingRidge(tmin, tmax, sfreq, alpha=1.)
+    t0 = time.time()
+    model.fit(X, y)
+    t_fit = time.time() - t0
+    t0 = time.time()
+    model.predict(X)
+    t_predict = time.time() - t0
+    print('%2d channels: fit %6.2f s, predict %5.2f s'
+          % (n_channels, t_fit, t_predict))
@@ -0,0 +1,85 @@
+"""
+================================================
+Benchmark reading the headers of a whole dataset
+================================================
+
+Summarize a directory of FIF, EDF, BDF and BrainVision files (the sampling
+frequencies, channels, durations and events of all recordings) with
+:func:`mne.io.scan_headers`, and compare it with opening each file with its
+raw reader. The headers are small, so that reading them with several threads
+mostly helps when the files are on a slow or network file system.
+
+The dataset is made of copies of simulated FIF recordings with annotations
+and of the EDF, BDF and BrainVision files of the tests of MNE. This script
+is not run when building the documentation because it writes about 1.5 GB of
+files.
+"""
+# License: BSD (3-clause)
+
+import os
+import os.path as op
+import shutil
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+import mne
+
+print(__doc__)
+
+###############################################################################
+# Make the dataset
+
+n_copies = 100
+root = tempfile.mkdtemp()
+rng = np.random.RandomState(0)
+info = mne.create_info(64, 1000., 'eeg')
+raw = mne.io.RawArray(rng.randn(64, 60000) * 1e-5, info)
+raw.set_annotations(mne.Annotations(np.arange(1., 59.), np.ones(58),
+                                    ['stim'] * 58))
+fif_fname = op.join(root, 'sim_raw.fif')
+raw.save(fif_fname)
+io_dir = op.join(op.dirname(mne.__file__), 'io')
+edf_dir = op.join(io_dir, 'edf', 'tests', 'data')
+vhdr_dir = op.join(io_dir, 'brainvision', 'tests', 'data')
+for ii in range(n_copies):
+    subject_dir = op.join(root, 'sub-%03d' % ii)
+    os.makedirs(subject_dir)
+    shutil.copy(fif_fname, op.join(subject_dir, 'sub-%03d_raw.fif' % ii))
+    shutil.copy(op.join(edf_dir, 'test.edf'), subject_dir)
+    shutil.copy(op.join(edf_dir, 'test.bdf'), subject_dir)
+    for ext in ('.vhdr', '.vmrk', '.eeg'):
+        shutil.copy(op.join(vhdr_dir, 'test' + ext), subject_dir)
+os.remove(fif_fname)
+
+###############################################################################
+# Open each file with its raw reader
+
+readers = {'.fif': mne.io.read_raw_fif, '.edf': mne.io.read_raw_edf,
+           '.bdf': mne.io.read_raw_edf, '.vhdr': mne.io.read_raw_brainvision}
+t0 = time.time()
+n_files = 0
+with warnings.catch_warnings(record=True):
+    for dirpath, _, fnames in os.walk(root):
+        for fname in fnames:
+            ext = op.splitext(fname)[1]
+            if ext in readers:
+                readers[ext](op.join(dirpath, fname), verbose='error')
+                n_files += 1
+print('Raw readers: %d files in %0.2f s' % (n_files, time.time() - t0))
+
+###############################################################################
+# Read the headers only, with 1 and 4 threads
+
+for n_jobs in (1, 4):
+    t0 = time.time()
+    summary = mne.io.scan_headers(root, n_jobs=n_jobs, verbose=False)
+    print('scan_headers with %d thread(s): %d files in %0.2f s'
+          % (n_jobs, len(summary['fname']), time.time() - t0))
+
+for key in ('format', 'sfreq', 'n_channels', 'duration', 'n_events'):
+    print('%s: %s' % (key, summary[key][:4]))
+
+shutil.rmtree(root)
@@ -0,0 +1,51 @@
+"""
+====================================
+Benchmark the Infomax ICA iterations
+====================================
+
+Time the steps of :func:`mne.preprocessing.infomax` on simulated, whitened
+data with 64, 128 and 306 channels, in double and single precision. The
+``callback`` of :func:`~mne.preprocessing.infomax` is used to report the
+duration and the weight change of each step (pass over the data).
+
+This script is not run when building the documentation because it takes a
+few minutes.
+"""
+# License: BSD (3-clause)
+
+import numpy as np
+
+from mne.preprocessing import infomax
+
+print(__doc__)
+
+###############################################################################
+# Simulate super-gaussian sources, mix and whiten them
+
+n_samples = 30000
+n_iter = 5
+
+
+def simulate(n_channels, rng):
+    """Simulate whitened mixed Laplacian sources."""
+    data = np.dot(rng.randn(n_channels, n_channels),
+                  rng.laplace(size=(n_channels, n_samples))).T
+    data -= data.mean(axis=0)
+    eigval, eigvec = np.linalg.eigh(np.cov(data.T))
+    return np.dot(data, np.dot(eigvec / np.sqrt(eigval), eigvec.T))
+
+
+###############################################################################
+# Run a fixed number of steps and report the mean step duration
+
+rng = np.random.RandomState(0)
+for n_channels in (64, 128, 306):
+    data = simulate(n_channels, rng)
+    for dtype in ('float64', 'float32'):
+        steps = list()
+        infomax(data, extended=True, max_iter=n_iter, n_small_angle=None,
+                w_change=0., random_state=0, dtype=dtype,
+                callback=steps.append, verbose=False)
+        times = np.array([step['time'] for step in steps])
+        print('%3d channels, %s: %0.3f s per step (final weight change %0.2e)'
+              % (n_channels, dtype, times.mean(), steps[-1]['change']))
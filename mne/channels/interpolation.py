@@ -2,16 +2,17 @@
 #
 # License: BSD (3-clause)
 
+from collections import OrderedDict
+
 import numpy as np
 from numpy.polynomial.legendre import legval
 from scipy import linalg
 
 from ..fixes import einsum
-from ..utils import logger, warn, verbose
+from ..utils import logger, warn, verbose, _check_preload
 from ..io.pick import pick_types, pick_channels, pick_info
 from ..surface import _normalize_vectors
 from ..bem import _fit_sphere
-from ..forward import _map_meg_channels
 
 
 def _calc_g(cosang, stiffness=4, num_lterms=50):
@@ -89,6 +90,115 @@ def _make_interpolation_matrix(pos_from, pos_to, alpha=1e-5):
     return interpolation
 
 
+class _SplineInterpolator(object):
+    """Spherical spline interpolation matrices for a fixed montage.
+
+    Computed matrices are kept in a least-recently-used cache keyed by the
+    good and bad channel indices. With ``downdate=True``, the regularized
+    spline system of the full montage is inverted once, and the
+    interpolation matrix for any split of the channels into good and bad
+    ones is obtained by removing the rows and columns of the unused
+    channels from this inverse (a Schur complement downdate), which costs
+    ``O(n_channels ** 2 * n_unused)`` instead of a new pseudo-inverse.
+    Otherwise, each matrix is computed by
+    :func:`_make_interpolation_matrix`.
+
+    Parameters
+    ----------
+    pos : np.ndarray of float, shape(n_sensors, 3)
+        The positions of all sensors of the montage.
+    alpha : float
+        Regularization parameter. Defaults to 1e-5.
+    max_cached : int
+        The maximum number of interpolation matrices to keep.
+    downdate : bool
+        Whether to derive the matrices from the inverse of the spline system
+        of the full montage.
+    """
+
+    def __init__(self, pos, alpha=1e-5, max_cached=128, downdate=True):
+        self._pos = np.array(pos, dtype=np.float64)
+        self._alpha = alpha
+        self._G = self._C_inv = None
+        self.n_channels = len(self._pos)
+        self.max_cached = max_cached
+        self.downdate = downdate
+        self.n_computed = 0
+        self._matrices = OrderedDict()
+
+    def get_matrix(self, goods, bads):
+        """Get the matrix mapping signals of ``goods`` to ``bads``."""
+        goods = np.array(goods, dtype=np.int64)
+        bads = np.array(bads, dtype=np.int64)
+        key = (goods.tobytes(), bads.tobytes())
+        interpolation = self._matrices.pop(key, None)
+        if interpolation is None:
+            interpolation = self._compute_matrix(goods, bads)
+            if len(self._matrices) >= self.max_cached:
+                self._matrices.popitem(last=False)
+        self._matrices[key] = interpolation
+        return interpolation
+
+    def _invert(self):
+        """Invert the spline system of the full montage."""
+        pos = self._pos.copy()
+        _normalize_vectors(pos)
+        n_channels = self.n_channels
+        self._G = _calc_g(pos.dot(pos.T))
+        C = np.zeros((n_channels + 1, n_channels + 1))
+        C[:-1, :-1] = self._G
+        C.flat[:-1:n_channels + 2] += self._alpha
+        C[:-1, -1] = C[-1, :-1] = 1.
+        try:
+            self._C_inv = linalg.inv(C)
+        except linalg.LinAlgError:
+            self._C_inv = linalg.pinv(C)
+
+    def _compute_matrix(self, goods, bads):
+        self.n_computed += 1
+        if not self.downdate:
+            return _make_interpolation_matrix(self._pos[goods],
+                                              self._pos[bads], self._alpha)
+        if self._C_inv is None:
+            self._invert()
+        keep = np.concatenate([goods, [self.n_channels]])
+        drop = np.setdiff1d(np.arange(self.n_channels), goods)
+        C_inv = self._C_inv[np.ix_(keep, keep)]
+        if len(drop) > 0:
+            C_inv_kd = self._C_inv[np.ix_(keep, drop)]
+            C_inv -= C_inv_kd.dot(linalg.solve(
+                self._C_inv[np.ix_(drop, drop)], C_inv_kd.T))
+        G_to_from = self._G[np.ix_(bads, goods)]
+        return np.c_[G_to_from,
+                     np.ones((len(bads), 1))].dot(C_inv[:, :-1])
+
+
+_spline_interpolators = OrderedDict()
+
+
+def _get_spline_interpolator(pos, alpha=1e-5, downdate=True, max_montages=4):
+    """Get a (cached) spline interpolator for sensor positions."""
+    pos = np.ascontiguousarray(pos, dtype=np.float64)
+    key = (pos.tobytes(), alpha, downdate)
+    interpolator = _spline_interpolators.pop(key, None)
+    if interpolator is None:
+        interpolator = _SplineInterpolator(pos, alpha, downdate=downdate)
+        if len(_spline_interpolators) >= max_montages:
+            _spline_interpolators.popitem(last=False)
+    _spline_interpolators[key] = interpolator
+    return interpolator
+
+
+def _check_spherical_fit(pos):
+    """Warn if sensor positions are poorly described by a sphere."""
+    radius, center = _fit_sphere(pos)
+    distance = np.sqrt(np.sum((pos - center) ** 2, 1))
+    distance = np.mean(distance / radius)
+    if np.abs(1. - distance) > 0.1:
+        warn('Your spherical fit is poor, interpolation results are '
+             'likely to be inaccurate.')
+
+
 def _do_interp_dots(inst, interpolation, goods_idx, bads_idx):
     """Dot product of channel mapping matrix to channel data."""
     from ..io.base import BaseRaw
@@ -139,17 +249,14 @@ def _interpolate_bads_eeg(inst, verbose=None):
     pos_bad = pos[bads_idx_pos]
 
     # test spherical fit
-    radius, center = _fit_sphere(pos_good)
-    distance = np.sqrt(np.sum((pos_good - center) ** 2, 1))
-    distance = np.mean(distance / radius)
-    if np.abs(1. - distance) > 0.1:
-        warn('Your spherical fit is poor, interpolation results are '
-             'likely to be inaccurate.')
+    _check_spherical_fit(pos_good)
 
     logger.info('Computing interpolation matrix from {0} sensor '
                 'positions'.format(len(pos_good)))
 
-    interpolation = _make_interpolation_matrix(pos_good, pos_bad)
+    # a single split is computed exactly, and cached for the next calls
+    interpolation = _get_spline_interpolator(pos, downdate=False).get_matrix(
+        np.where(goods_idx_pos)[0], np.where(bads_idx_pos)[0])
 
     logger.info('Interpolating {0} sensors'.format(len(pos_bad)))
     _do_interp_dots(inst, interpolation, goods_idx, bads_idx)
@@ -188,9 +295,121 @@ def _interpolate_bads_meg(inst, mode='accurate', verbose=None):
     # return without doing anything if there are no meg channels
     if len(picks_meg) == 0 or len(picks_bad) == 0:
         return
+    from ..forward import _map_meg_channels
     inst_info = inst.info.copy()
     inst_info['comps'] = []
     info_from = pick_info(inst_info, picks_good)
     info_to = pick_info(inst_info, picks_bad)
     mapping = _map_meg_channels(info_from, info_to, mode=mode)
     _do_interp_dots(inst, mapping, picks_good, picks_bad)
+
+
+@verbose
+def interpolate_bads_epochs(epochs, bads, reset_bads=True, mode='accurate',
+                            verbose=None):
+    """Interpolate a different set of bad channels in each epoch.
+
+    Operates in place.
+
+    Parameters
+    ----------
+    epochs : instance of Epochs
+        The epochs to interpolate. Must be preloaded.
+    bads : list of list of str
+        The names of the channels to interpolate in each epoch. Must have
+        one entry per epoch. Channels in ``epochs.info['bads']`` are
+        interpolated in every epoch in addition to these.
+    reset_bads : bool
+        If True, remove the bads from info.
+    mode : str
+        Either ``'accurate'`` or ``'fast'``, determines the quality of the
+        Legendre polynomial expansion used for interpolation of MEG
+        channels.
+    verbose : bool, str, int, or None
+        If not None, override default verbose level (see :func:`mne.verbose`
+        and :ref:`Logging documentation <tut_logging>` for more).
+
+    Returns
+    -------
+    epochs : instance of Epochs
+        The modified instance.
+
+    See Also
+    --------
+    mne.Epochs.interpolate_bads
+
+    Notes
+    -----
+    Epochs that share the same set of bad channels are interpolated
+    together, so each interpolation matrix is computed only once per call.
+    For EEG channels, the spherical spline system of the full montage is
+    inverted once and cached across calls, and the matrix for each set of
+    bad channels is derived from it by a low-rank downdate.
+
+    .. versionadded:: 0.17
+    """
+    from ..epochs import BaseEpochs
+    from ..forward import _map_meg_channels
+    if not isinstance(epochs, BaseEpochs):
+        raise TypeError('epochs must be an instance of Epochs, got %s'
+                        % (type(epochs),))
+    _check_preload(epochs, 'interpolation')
+    if len(bads) != len(epochs):
+        raise ValueError('bads must have one entry per epoch (%d), got %d'
+                         % (len(epochs), len(bads)))
+    ch_names = epochs.ch_names
+    groups = OrderedDict()
+    for ii, epoch_bads in enumerate(bads):
+        epoch_bads = set(epoch_bads) | set(epochs.info['bads'])
+        missing = sorted(epoch_bads - set(ch_names))
+        if len(missing) > 0:
+            raise ValueError('Bad channels %s for epoch %d are not present '
+                             'in the data' % (missing, ii))
+        key = tuple(sorted(epoch_bads))
+        groups.setdefault(key, []).append(ii)
+    groups.pop((), None)
+    if len(groups) == 0:
+        warn('No bad channels to interpolate. Doing nothing...')
+        return epochs
+
+    epochs.info._check_consistency()
+    picks_eeg = pick_types(epochs.info, meg=False, eeg=True, exclude=[])
+    picks_meg = pick_types(epochs.info, meg=True, eeg=False, ref_meg=True,
+                           exclude=[])
+    interpolator = None
+    if len(picks_eeg) > 0 and any(ch_names[p] in key for key in groups
+                                  for p in picks_eeg):
+        pos = epochs._get_channel_positions(picks_eeg)
+        _check_spherical_fit(pos)
+        interpolator = _get_spline_interpolator(pos)
+    info_meg = epochs.info.copy()
+    info_meg['comps'] = []
+
+    logger.info('Interpolating %d distinct sets of bad channels in %d epochs'
+                % (len(groups), sum(len(idx) for idx in groups.values())))
+    data = epochs._data
+    for key, idx in groups.items():
+        idx = np.array(idx)[:, np.newaxis]
+        key = set(key)
+        mappings = list()
+        if interpolator is not None:
+            is_bad = np.array([ch_names[p] in key for p in picks_eeg])
+            if is_bad.any():
+                mappings.append((
+                    interpolator.get_matrix(np.where(~is_bad)[0],
+                                            np.where(is_bad)[0]),
+                    picks_eeg[~is_bad], picks_eeg[is_bad]))
+        is_bad = np.array([ch_names[p] in key for p in picks_meg], bool)
+        if is_bad.any():
+            picks_good, picks_bad = picks_meg[~is_bad], picks_meg[is_bad]
+            mappings.append((_map_meg_channels(
+                pick_info(info_meg, picks_good),
+                pick_info(info_meg, picks_bad), mode=mode),
+                picks_good, picks_bad))
+        for interpolation, picks_good, picks_bad in mappings:
+            data[idx, picks_bad] = einsum(
+                'ij,xjy->xiy', interpolation, data[idx, picks_good])
+
+    if reset_bads is True:
+        epochs.info['bads'] = []
+    return epochs
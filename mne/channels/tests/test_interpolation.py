@@ -5,7 +5,9 @@ from numpy.testing import (assert_allclose, assert_array_equal)
 import pytest
 
 from mne import io, pick_types, pick_channels, read_events, Epochs
-from mne.channels.interpolation import _make_interpolation_matrix
+from mne.channels import interpolate_bads_epochs
+from mne.channels.interpolation import (_make_interpolation_matrix,
+                                        _SplineInterpolator)
 from mne.datasets import testing
 from mne.utils import run_tests_if_main
 
@@ -152,6 +154,61 @@ def test_interpolation():
     assert np.corrcoef(data1, data2)[0, 1] > thresh
 
 
+def test_spline_interpolator():
+    """Test cached spherical spline interpolation matrices."""
+    rng = np.random.RandomState(0)
+    pos = rng.randn(64, 3)
+    pos[:, 2] = np.abs(pos[:, 2])
+    interpolator = _SplineInterpolator(pos, max_cached=2)
+    for bads in ([3], [0, 10, 63], list(range(5, 25))):
+        goods = np.setdiff1d(np.arange(len(pos)), bads)
+        want = _make_interpolation_matrix(pos[goods], pos[bads])
+        got = interpolator.get_matrix(goods, bads)
+        assert got.shape == (len(bads), len(goods))
+        assert_allclose(got, want, rtol=1e-6, atol=1e-8)
+    assert interpolator.n_computed == 3
+    # cached
+    interpolator.get_matrix(goods, bads)
+    assert interpolator.n_computed == 3
+    # evicted
+    interpolator.get_matrix(np.arange(1, len(pos)), [0])
+    assert interpolator.n_computed == 4
+    interpolator.get_matrix([1, 2], [3])
+    assert interpolator.n_computed == 5
+    assert len(interpolator._matrices) == 2
+    # without downdate, the matrices are computed exactly
+    interpolator = _SplineInterpolator(pos, downdate=False)
+    assert_array_equal(interpolator.get_matrix(goods, bads), want)
+    assert interpolator._C_inv is None
+
+
+@pytest.mark.slowtest
+def test_interpolate_bads_epochs():
+    """Test interpolation of different bad channels per epoch."""
+    raw, epochs, epochs_eeg, epochs_meg = _load_data()
+    epochs = epochs[:4]
+    epochs.info['bads'] = []
+    names = [epochs.ch_names[0], 'EEG 012', 'EEG 020']
+    bads = [names[:1], names[1:], [], names[1:]]
+    want = list()
+    for ii, epoch_bads in enumerate(bads):
+        epoch = epochs[ii]
+        epoch.info['bads'] = list(epoch_bads)
+        if len(epoch_bads) > 0:
+            epoch.interpolate_bads()
+        want.append(epoch.get_data()[0])
+    got = interpolate_bads_epochs(epochs.copy(), bads).get_data()
+    assert_allclose(got, want, rtol=1e-6, atol=1e-20)
+    assert_array_equal(got[2], epochs.get_data()[2])
+    pytest.raises(ValueError, interpolate_bads_epochs, epochs, bads[:2])
+    pytest.raises(ValueError, interpolate_bads_epochs, epochs,
+                  [['foo']] * len(epochs))
+    with pytest.warns(RuntimeWarning, match='Doing nothing'):
+        interpolate_bads_epochs(epochs, [[]] * len(epochs))
+    epochs.preload = False
+    pytest.raises(RuntimeError, interpolate_bads_epochs, epochs, bads)
+
+
 @testing.requires_testing_data
 def test_interpolation_ctf_comp():
     """Test interpolation with compensated CTF data."""
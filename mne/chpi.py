@@ -16,7 +16,8 @@
 #     5. Use a linear model (DC + linear slope + sin + cos terms set up
 #        in ``_setup_hpi_struct``) to fit sinusoidal amplitudes to MEG
 #        channels. Use SVD to determine the phase/amplitude of the sinusoids.
-#        This step is accomplished using ``_fit_cHPI_amplitudes``
+#        This step is accomplished using ``_fit_cHPI_amplitudes``, or for
+#        many windows at once using ``_iter_chpi_amplitudes``.
 #     6. If the amplitudes are 98% correlated with last position
 #        (and Δt < t_step_max), skip fitting.
 #     7. Fit magnetic dipoles using the amplitudes for each coil frequency
@@ -376,13 +377,15 @@ def _magnetic_dipole_objective(x, B, B2, coils, scale, method):
         fwd = _magnetic_dipole_field_vec(x[np.newaxis, :], coils)
     else:
         from .preprocessing.maxwell import _sss_basis
-        # Eventually we can try incorporating external bases here, which
-        # is why the :3 is on the SVD below
+        # Eventually we can try incorporating external bases here
         fwd = _sss_basis(dict(origin=x, int_order=1, ext_order=0), coils).T
     fwd = np.dot(fwd, scale.T)
-    one = np.dot(linalg.svd(fwd, full_matrices=False)[2][:3], B)
-    one *= one
-    Bm2 = one.sum()
+    # The explained power is that of the projection of B onto the (three)
+    # rows of fwd, i.e. the norm of B in the basis of the right singular
+    # vectors of fwd, but solving the 3x3 normal equations is much cheaper
+    # than doing an SVD for each evaluation
+    one = np.dot(fwd, B)
+    Bm2 = np.dot(one, np.linalg.solve(np.dot(fwd, fwd.T), one))
     return B2 - Bm2
 
 
@@ -550,63 +553,173 @@ def _fit_cHPI_amplitudes(raw, time_sl, hpi, fit_time, verbose=None):
     with use_log_level(False):
         # loads good channels
         this_data = raw[hpi['meg_picks'], time_sl][0]
-
-    # which HPI coils to use
-    # other then erroring I don't see this getting used elsewhere?
-    if hpi['hpi_pick'] is not None:
-        with use_log_level(False):
+        chpi_data = None
+        if hpi['hpi_pick'] is not None:
             # loads hpi_stim channel
             chpi_data = raw[hpi['hpi_pick'], time_sl][0]
+    return _fit_chpi_amplitudes_windows(
+        this_data, None if chpi_data is None else chpi_data[0],
+        np.zeros(1, int), this_data.shape[1], hpi,
+        [fit_time])[0]
+
+
+# Number of samples (channels x times) to read at once in
+# _iter_chpi_amplitudes, ~80 MB of float64 data
+_chpi_batch_samples = 10000000
+
+
+def _iter_chpi_amplitudes(raw, fit_idxs, hpi, batch_size=None):
+    """Fit cHPI amplitudes for all time windows, in batches.
+
+    Parameters
+    ----------
+    raw : instance of Raw
+        Raw data with cHPI information.
+    fit_idxs : ndarray of int
+        The center sample (relative to ``raw.first_samp``) of each window.
+    hpi : dict
+        The cHPI structure from ``_setup_hpi_struct``.
+    batch_size : int | None
+        Number of windows to read and fit at once. If None, it is chosen
+        based on the number of channels and the window length.
+
+    Yields
+    ------
+    fit_time : float
+        The time of the window start (used for logging and as fit time).
+    sin_fit : ndarray, shape (n_freqs, n_channels) | None
+        The sin amplitudes, or None if the window should be skipped.
+    """
+    n_window = hpi['n_window']
+    n_times = len(raw.times)
+    fit_idxs = np.asarray(fit_idxs, int)
+    fit_times = (fit_idxs + raw.first_samp - n_window / 2.) / \
+        raw.info['sfreq']
+    starts = fit_idxs - n_window // 2
+    stops = np.minimum(starts + n_window, n_times)
+    starts = np.maximum(starts, 0)
+    if batch_size is None:
+        batch_size = _chpi_batch_samples // (len(hpi['meg_picks']) * n_window)
+    batch_size = max(int(batch_size), 1)
+    for bi in range(0, len(fit_idxs), batch_size):
+        b_starts = starts[bi:bi + batch_size]
+        b_stops = stops[bi:bi + batch_size]
+        b_times = fit_times[bi:bi + batch_size]
+        lens = b_stops - b_starts
+        # Read the span covering all windows at once unless the windows are
+        # so sparse that this would mostly read unused samples
+        span = (b_starts.min(), b_stops.max())
+        if span[1] - span[0] <= 2 * lens.sum():
+            offsets = b_starts - span[0]
+            sls = [slice(*span)]
+        else:
+            offsets = np.concatenate([[0], np.cumsum(lens)[:-1]])
+            sls = [slice(start, stop)
+                   for start, stop in zip(b_starts, b_stops)]
+        with use_log_level(False):
+            data = [raw[hpi['meg_picks'], sl][0] for sl in sls]
+            data = data[0] if len(data) == 1 else np.concatenate(data, -1)
+            chpi_data = None
+            if hpi['hpi_pick'] is not None:
+                chpi_data = np.concatenate([raw[hpi['hpi_pick'], sl][0][0]
+                                            for sl in sls])
+        sin_fits = [None] * len(b_times)
+        # all windows with the same length share a single model
+        for this_len in np.unique(lens):
+            use = np.where(lens == this_len)[0]
+            fits = _fit_chpi_amplitudes_windows(
+                data, chpi_data, offsets[use], this_len, hpi, b_times[use])
+            for ui, sin_fit in zip(use, fits):
+                sin_fits[ui] = sin_fit
+        del data, chpi_data
+        for fit_time, sin_fit in zip(b_times, sin_fits):
+            yield fit_time, sin_fit
+
+
+def _fit_chpi_amplitudes_windows(data, chpi_data, starts, this_len, hpi,
+                                 fit_times):
+    """Fit cHPI amplitudes for time windows of equal length.
+
+    Parameters
+    ----------
+    data : ndarray, shape (n_channels, n_times)
+        The MEG data containing all windows.
+    chpi_data : ndarray, shape (n_times,) | None
+        The cHPI status channel data.
+    starts : ndarray of int, shape (n_windows,)
+        The first sample of each window in ``data``.
+    this_len : int
+        The number of samples in each window.
+    hpi : dict
+        The cHPI structure from ``_setup_hpi_struct``.
+    fit_times : array-like, shape (n_windows,)
+        The time of each window (for logging).
 
-        ons = (np.round(chpi_data).astype(np.int) &
+    Returns
+    -------
+    sin_fits : list of (ndarray, shape (n_freqs, n_channels)) or None
+        The sin amplitudes matching each cHPI frequency for each window,
+        or None if the window should be skipped.
+    """
+    sin_fits = [None] * len(fit_times)
+    # which HPI coils to use
+    # other then erroring I don't see this getting used elsewhere?
+    use = np.arange(len(fit_times))
+    if chpi_data is not None:
+        chpi_data = chpi_data[starts[:, np.newaxis] + np.arange(this_len)]
+        ons = (np.round(chpi_data).astype(np.int)[:, np.newaxis] &
                hpi['on'][:, np.newaxis]).astype(bool)
-        n_on = np.sum(ons, axis=0)
-        if not (n_on >= 3).all():
-            logger.info(_time_prefix(fit_time) + '%s < 3 HPI coils turned on, '
-                        'skipping fit' % (n_on.min(),))
-            return None
+        n_on = np.sum(ons, axis=1)
+        good = (n_on >= 3).all(axis=-1)
+        for wi in np.where(~good)[0]:
+            logger.info(_time_prefix(fit_times[wi]) + '%s < 3 HPI coils '
+                        'turned on, skipping fit' % (n_on[wi].min(),))
+        use = use[good]
         # #TODO REMOVE # ons = ons.all(axis=1)  # which HPI coils to use
+    if len(use) == 0:
+        return sin_fits
+    starts = starts[use]
 
     n_freqs = hpi['n_freqs']
-    this_len = time_sl.stop - time_sl.start
     if this_len == hpi['n_window']:
         model, inv_model = hpi['model'], hpi['inv_model']
     else:  # first or last window
         model = hpi['model'][:this_len]
         inv_model = linalg.pinv(model)
-    X = np.dot(inv_model, this_data.T)
-    X_sin, X_cos = X[:n_freqs], X[n_freqs:2 * n_freqs]
+    # stack the windows to solve them all with a single product, X has
+    # shape (n_windows, n_model, n_channels)
+    n_win, n_chan = len(starts), data.shape[0]
+    windows = data[:, starts[:, np.newaxis] + np.arange(this_len)]
+    X = np.dot(windows.reshape(n_chan * n_win, this_len), inv_model.T)
+    X = np.ascontiguousarray(
+        X.reshape(n_chan, n_win, len(inv_model)).transpose(1, 2, 0))
+    norm = np.einsum('cwt,cwt->wc', windows, windows)
+    del windows
 
     # use SVD across all sensors to estimate the sinusoid phase
-    sin_fit = np.zeros((n_freqs, X_sin.shape[1]))
-    for fi in range(n_freqs):
-        u, s, vt = np.linalg.svd(np.vstack((X_sin[fi, :], X_cos[fi, :])),
-                                 full_matrices=False)
-        # the first component holds the predominant phase direction
-        # (so ignore the second, effectively doing s[1] = 0):
-        sin_fit[fi, :] = vt[0]
-        # Do not modify X, however, because it will break the signal
-        # reconstruction step.
-
-    data_diff_sq = np.dot(model, X).T - this_data
-    data_diff_sq *= data_diff_sq
-    data_diff_sq = np.sum(data_diff_sq, axis=-1)
-
-    # compute amplitude correlation (for logging), protect against zero
-    norm = this_data
-    del this_data
-    norm *= norm
-    norm = np.sum(norm, axis=-1)
-    norm_sum = norm.sum()
-    norm_sum = np.inf if norm_sum == 0 else norm_sum
+    X_sc = X[:, :2 * n_freqs].reshape(n_win, 2, n_freqs, n_chan)
+    # the first component holds the predominant phase direction
+    # (so ignore the second, effectively doing s[1] = 0):
+    sin_fit = np.linalg.svd(X_sc.transpose(0, 2, 1, 3),
+                            full_matrices=False)[2][:, :, 0]
+    del X_sc
+
+    # compute amplitude correlation (for logging), protect against zero.
+    # Because model * inv_model is a projection, the squared residual is the
+    # squared norm of the data minus that of the modeled signal
+    data_diff_sq = norm - np.einsum(
+        'wkc,wkc->wc', X, np.einsum('kl,wlc->wkc', np.dot(model.T, model), X))
+    norm_sum = norm.sum(axis=-1)
+    norm_sum[norm_sum == 0] = np.inf
     norm[norm == 0] = np.inf
-    g_sin = 1 - data_diff_sq.sum() / norm_sum
+    g_sin = 1 - data_diff_sq.sum(axis=-1) / norm_sum
     g_chan = 1 - data_diff_sq / norm
-    logger.debug('    HPI amplitude correlation %0.3f: %0.3f '
-                 '(%s chnls > 0.95)' % (fit_time, g_sin,
-                                        (g_chan > 0.95).sum()))
-
-    return sin_fit
+    for ui, wi in enumerate(use):
+        logger.debug('    HPI amplitude correlation %0.3f: %0.3f '
+                     '(%s chnls > 0.95)' % (fit_times[wi], g_sin[ui],
+                                            (g_chan[ui] > 0.95).sum()))
+        sin_fits[wi] = sin_fit[ui]
+    return sin_fits
 
 
 @verbose
@@ -743,21 +856,12 @@ def _calculate_chpi_positions(raw, t_step_min=0.1, t_step_max=10.,
     pos_0 = None
 
     hpi['n_freqs'] = len(hpi['freqs'])
-    for midpt in fit_idxs:
-        #
-        # 0. determine samples to fit.
-        #
-        fit_time = (midpt + raw.first_samp - hpi['n_window'] / 2.) /\
-            raw.info['sfreq']
-
-        time_sl = midpt - hpi['n_window'] // 2
-        time_sl = slice(max(time_sl, 0),
-                        min(time_sl + hpi['n_window'], len(raw.times)))
-
-        #
-        # 1. Fit amplitudes for each channel from each of the N cHPI sinusoids
-        #
-        sin_fit = _fit_cHPI_amplitudes(raw, time_sl, hpi, fit_time)
+    #
+    # 0. determine samples to fit and
+    # 1. Fit amplitudes for each channel from each of the N cHPI sinusoids
+    #    (done in batches of windows, see _iter_chpi_amplitudes)
+    #
+    for fit_time, sin_fit in _iter_chpi_amplitudes(raw, fit_idxs, hpi):
 
         # skip this window if bad
         # logging has already been done! Maybe turn this into an Exception
@@ -963,21 +1067,12 @@ def _calculate_chpi_coil_locs(raw, t_step_min=0.1, t_step_max=10.,
                 % (len(fit_idxs), t_end - t_begin))
 
     hpi['n_freqs'] = len(hpi['freqs'])
-    for midpt in fit_idxs:
-        #
-        # 0. determine samples to fit.
-        #
-        fit_time = (midpt + raw.first_samp - hpi['n_window'] / 2.) /\
-            raw.info['sfreq']
-
-        time_sl = midpt - hpi['n_window'] // 2
-        time_sl = slice(max(time_sl, 0),
-                        min(time_sl + hpi['n_window'], len(raw.times)))
-
-        #
-        # 1. Fit amplitudes for each channel from each of the N cHPI sinusoids
-        #
-        sin_fit = _fit_cHPI_amplitudes(raw, time_sl, hpi, fit_time)
+    #
+    # 0. determine samples to fit and
+    # 1. Fit amplitudes for each channel from each of the N cHPI sinusoids
+    #    (done in batches of windows, see _iter_chpi_amplitudes)
+    #
+    for fit_time, sin_fit in _iter_chpi_amplitudes(raw, fit_idxs, hpi):
 
         # skip this window if bad
         # logging has already been done! Maybe turn this into an Exception
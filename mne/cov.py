@@ -1587,13 +1587,41 @@ def _regularized_covariance(data, reg=None, method_params=None, info=None):
     info = create_info(data.shape[-2], 1000., 'eeg') if info is None else info
     picks_list = _picks_by_type(info)
     scalings = _handle_default('scalings_cov_rank', None)
+    # the data are rescaled in place
     cov = _compute_covariance_auto(
-        data.T, method=method, method_params=method_params,
+        data.T.copy(), method=method, method_params=method_params,
         info=info, cv=None, n_jobs=1, stop_early=True,
         picks_list=picks_list, scalings=scalings)[reg]['data']
     return cov
 
 
+def _get_shrinkage(reg, method_params):
+    """Get the shrinkage for covariances computed from sums of products.
+
+    None is returned if the regularization needs the data themselves.
+    """
+    if method_params is not None:
+        return None
+    if reg is None or reg == 'empirical':
+        return 0.
+    if isinstance(reg, string_types):
+        try:
+            return float(reg)
+        except ValueError:
+            return None
+    return float(reg)
+
+
+def _shrink_covs(covs, shrinkage):
+    """Shrink empirical covariances like sklearn ShrunkCovariance."""
+    if shrinkage == 0.:
+        return covs
+    n_channels = covs.shape[-1]
+    mu = np.trace(covs, axis1=-2, axis2=-1) / n_channels
+    return ((1. - shrinkage) * covs +
+            shrinkage * mu[..., np.newaxis, np.newaxis] * np.eye(n_channels))
+
+
 @verbose
 def compute_whitener(noise_cov, info, picks=None, rank=None,
                      scalings=None, return_rank=False,
@@ -14,7 +14,34 @@ from scipy import linalg
 
 from .mixin import TransformerMixin
 from .base import BaseEstimator
-from ..cov import _regularized_covariance
+from ..cov import _regularized_covariance, _get_shrinkage, _shrink_covs
+
+
+def _epoch_covs(X):
+    """Compute the empirical covariance of each epoch (assumed centered)."""
+    covs = np.empty((len(X), X.shape[1], X.shape[1]))
+    for ii, epoch in enumerate(X):
+        np.dot(epoch, epoch.T, out=covs[ii])
+    covs /= X.shape[2]
+    return covs
+
+
+def _check_epoch_covs(epoch_covs, X, shrinkage):
+    """Check precomputed covariances or compute them if possible."""
+    if epoch_covs is None:
+        if shrinkage is not None:
+            epoch_covs = _epoch_covs(X)
+        return epoch_covs
+    if shrinkage is None:
+        raise ValueError('epoch_covs can only be used if reg is None, '
+                         '"empirical" or a float, and cov_method_params is '
+                         'None')
+    epoch_covs = np.asarray(epoch_covs, dtype=np.float64)
+    expected = (len(X), X.shape[1], X.shape[1])
+    if epoch_covs.shape != expected:
+        raise ValueError('epoch_covs must have shape %s, got %s'
+                         % (expected, epoch_covs.shape))
+    return epoch_covs
 
 
 class CSP(TransformerMixin, BaseEstimator):
@@ -136,7 +163,7 @@ class CSP(TransformerMixin, BaseEstimator):
         if X.ndim < 3:
             raise ValueError('X must have at least 3 dimensions.')
 
-    def fit(self, X, y):
+    def fit(self, X, y, epoch_covs=None):
         """Estimate the CSP decomposition on epochs.
 
         Parameters
@@ -145,6 +172,18 @@ class CSP(TransformerMixin, BaseEstimator):
             The data on which to estimate the CSP.
         y : array, shape (n_epochs,)
             The class for each epoch.
+        epoch_covs : ndarray, shape (n_epochs, n_channels, n_channels) | None
+            The empirical covariance of each epoch, i.e.
+            ``np.dot(epoch, epoch.T) / n_times``, neither regularized nor
+            normalized. If None (default), it is computed from ``X``. This
+            allows computing them once for a whole dataset, e.g. passing them
+            in the ``fit_params`` of
+            :func:`sklearn.model_selection.cross_val_score`, which selects the
+            covariances of the training epochs of each fold. Can only be used
+            if ``reg`` is None, ``'empirical'`` or a float, and
+            ``cov_method_params`` is None.
+
+            .. versionadded:: 0.17
 
         Returns
         -------
@@ -162,10 +201,19 @@ class CSP(TransformerMixin, BaseEstimator):
         if n_classes < 2:
             raise ValueError("n_classes must be >= 2.")
 
+        # Without data-driven regularization, the class covariances are
+        # (shrunk) averages of the epoch covariances
+        shrinkage = _get_shrinkage(self.reg, self.cov_method_params)
+        epoch_covs = _check_epoch_covs(epoch_covs, X, shrinkage)
+
         covs = np.zeros((n_classes, n_channels, n_channels))
         sample_weights = list()
         for class_idx, this_class in enumerate(self._classes):
-            if self.cov_est == "concat":  # concatenate epochs
+            if epoch_covs is not None:
+                weight = np.sum(y == this_class)
+                cov = _shrink_covs(epoch_covs[y == this_class].mean(axis=0),
+                                   shrinkage)
+            elif self.cov_est == "concat":  # concatenate epochs
                 class_ = np.transpose(X[y == this_class], [1, 0, 2])
                 class_ = class_.reshape(n_channels, -1)
                 cov = _regularized_covariance(
@@ -736,7 +784,7 @@ class SPoC(CSP):
         delattr(self, 'cov_est')
         delattr(self, 'norm_trace')
 
-    def fit(self, X, y):
+    def fit(self, X, y, epoch_covs=None):
         """Estimate the SPoC decomposition on epochs.
 
         Parameters
@@ -745,6 +793,11 @@ class SPoC(CSP):
             The data on which to estimate the SPoC.
         y : array, shape (n_epochs,)
             The class for each epoch.
+        epoch_covs : ndarray, shape (n_epochs, n_channels, n_channels) | None
+            The empirical covariance of each epoch, see
+            :meth:`mne.decoding.CSP.fit`.
+
+            .. versionadded:: 0.17
 
         Returns
         -------
@@ -769,10 +822,15 @@ class SPoC(CSP):
         n_epochs, n_channels = X.shape[:2]
 
         # Estimate single trial covariance
-        covs = np.empty((n_epochs, n_channels, n_channels))
-        for ii, epoch in enumerate(X):
-            covs[ii] = _regularized_covariance(
-                epoch, reg=self.reg, method_params=self.cov_method_params)
+        shrinkage = _get_shrinkage(self.reg, self.cov_method_params)
+        epoch_covs = _check_epoch_covs(epoch_covs, X, shrinkage)
+        if epoch_covs is not None:
+            covs = _shrink_covs(epoch_covs, shrinkage)
+        else:
+            covs = np.empty((n_epochs, n_channels, n_channels))
+            for ii, epoch in enumerate(X):
+                covs[ii] = _regularized_covariance(
+                    epoch, reg=self.reg, method_params=self.cov_method_params)
 
         C = covs.mean(0)
         Cz = np.mean(covs * target[:, np.newaxis, np.newaxis], axis=0)
@@ -167,6 +167,98 @@ class ReceptiveField(BaseEstimator):
         self : instance
             The instance so you can chain operations.
         """
+        X, y = self._initialize(X, y)
+        n_feats = X.shape[-1]
+        # Create input features
+        X, y = self._delay_and_reshape(X, y)
+
+        self.estimator_.fit(X, y)
+        self._set_coef(n_feats, X, y)
+        return self
+
+    def partial_fit(self, X, y, solve=True):
+        """Accumulate a chunk of data into the receptive field model.
+
+        This can be called repeatedly with chunks of data (e.g., trials of
+        different lengths read one at a time) that do not fit in memory at
+        once, without ever building the time-delayed inputs. It is only
+        supported when ``estimator`` is a float or a
+        :class:`mne.decoding.TimeDelayingRidge` instance, see
+        :meth:`mne.decoding.TimeDelayingRidge.partial_fit`.
+
+        Parameters
+        ----------
+        X : array, shape (n_times[, n_epochs], n_features)
+            The input features for the model.
+        y : array, shape (n_times[, n_epochs][, n_outputs])
+            The output features for the model.
+        solve : bool
+            If True (default), the model coefficients are updated. Use False
+            to only accumulate the data, and :meth:`refit` to solve the
+            model once all the chunks are done.
+
+        Returns
+        -------
+        self : instance
+            The instance so you can chain operations.
+
+        Notes
+        -----
+        .. versionadded:: 0.17
+        """
+        if not hasattr(self, 'estimator_'):
+            X, y = self._initialize(X, y)
+        else:
+            X, y, _, y_dim = self._check_dimensions(X, y)
+            if y_dim != self._y_dim:
+                raise ValueError('y must have the same number of dimensions '
+                                 'as during the previous fit (%s), got %s'
+                                 % (self._y_dim, y_dim))
+            if X.shape[-1] != len(self.feature_names):
+                raise ValueError('n_features in X does not match feature '
+                                 'names (%s != %s)'
+                                 % (X.shape[-1], len(self.feature_names)))
+        if not isinstance(self.estimator_, TimeDelayingRidge):
+            raise ValueError('partial_fit requires estimator to be a float '
+                             'or a TimeDelayingRidge instance, got %s'
+                             % (type(self.estimator_),))
+        self.estimator_.partial_fit(X, y, solve=solve)
+        if solve:
+            self._set_coef(X.shape[-1])
+        return self
+
+    def refit(self, alpha=None):
+        """Solve the model again using the accumulated data.
+
+        Parameters
+        ----------
+        alpha : float | None
+            The regularization factor to use. If None (default), the current
+            one is used. See :meth:`mne.decoding.TimeDelayingRidge.refit`,
+            which makes evaluating a grid of values cheap.
+
+        Returns
+        -------
+        self : instance
+            The instance so you can chain operations.
+
+        Notes
+        -----
+        .. versionadded:: 0.17
+        """
+        if not isinstance(getattr(self, 'estimator_', None),
+                          TimeDelayingRidge):
+            raise ValueError('refit requires the model to be fit with '
+                             'estimator a float or a TimeDelayingRidge '
+                             'instance')
+        self.estimator_.refit(alpha)
+        if alpha is not None and isinstance(self.estimator, numbers.Real):
+            self.estimator = self.estimator_.alpha
+        self._set_coef(len(self.feature_names))
+        return self
+
+    def _initialize(self, X, y):
+        """Check the parameters and initialize the estimator."""
         if self.scoring not in _SCORERS.keys():
             raise ValueError('scoring must be one of %s, got'
                              '%s ' % (sorted(_SCORERS.keys()), self.scoring))
@@ -206,23 +298,20 @@ class ReceptiveField(BaseEstimator):
         del estimator
         _check_estimator(self.estimator_)
 
-        # Create input features
-        n_times, n_epochs, n_feats = X.shape
-        n_outputs = y.shape[-1]
-        n_delays = len(self.delays_)
-
         # Update feature names if we have none
+        n_feats = X.shape[-1]
         if self.feature_names is None:
             self.feature_names = ['feature_%s' % ii for ii in range(n_feats)]
         if len(self.feature_names) != n_feats:
             raise ValueError('n_features in X does not match feature names '
                              '(%s != %s)' % (n_feats, len(self.feature_names)))
+        return X, y
 
-        # Create input features
-        X, y = self._delay_and_reshape(X, y)
-
-        self.estimator_.fit(X, y)
+    def _set_coef(self, n_feats, X=None, y=None):
+        """Set the coefficients (and patterns) from the fit estimator."""
+        n_delays = len(self.delays_)
         coef = get_coef(self.estimator_, 'coef_')  # (n_targets, n_features)
+        n_outputs = coef.shape[0] if coef.ndim > 1 else 1
         shape = [n_feats, n_delays]
         if self._y_dim > 1:
             shape.insert(0, -1)
@@ -231,20 +320,27 @@ class ReceptiveField(BaseEstimator):
         # Inverse-transform model weights
         if self.patterns:
             if isinstance(self.estimator_, TimeDelayingRidge):
-                cov_ = self.estimator_.cov_ / float(n_times * n_epochs - 1)
-                y = y.reshape(-1, y.shape[-1], order='F')
+                corrs = self.estimator_._corrs
+                n_samples = float(corrs['n_samples'])
+                cov_ = self.estimator_.cov_ / (n_samples - 1)
+                # center the outputs even without intercept, as np.cov
+                y_mean = corrs['y_sum'] / n_samples
+                cov_y = (corrs['y_y'] - n_samples *
+                         np.outer(y_mean, y_mean)) / (n_samples - 1)
+                del corrs
             else:
+                n_samples = float(len(X))
                 X = X - X.mean(0, keepdims=True)
                 cov_ = np.cov(X.T)
-            del X
+                if n_outputs != 1:
+                    cov_y = np.cov(y.T)
+            del X, y
 
             # Inverse output covariance
-            if y.ndim == 2 and y.shape[1] != 1:
-                y = y - y.mean(0, keepdims=True)
-                inv_Y = linalg.pinv(np.cov(y.T))
+            if n_outputs != 1:
+                inv_Y = linalg.pinv(cov_y)
             else:
-                inv_Y = 1. / float(n_times * n_epochs - 1)
-            del y
+                inv_Y = 1. / (n_samples - 1)
 
             # Inverse coef according to Haufe's method
             # patterns has shape (n_feats * n_delays, n_outputs)
@@ -252,8 +348,6 @@ class ReceptiveField(BaseEstimator):
             patterns = cov_.dot(coef.dot(inv_Y))
             self.patterns_ = patterns.reshape(shape)
 
-        return self
-
     def predict(self, X):
         """Generate predictions with a receptive field.
 
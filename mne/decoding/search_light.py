@@ -5,8 +5,10 @@
 import numpy as np
 
 from .mixin import TransformerMixin
-from .base import BaseEstimator, _check_estimator
+from .base import BaseEstimator, LinearModel, _check_estimator
+from .transformer import Vectorizer
 from ..parallel import parallel_func
+from ..externals.six import string_types
 from ..utils import _validate_type
 
 
@@ -128,8 +130,8 @@ class SlidingEstimator(BaseEstimator, TransformerMixin):
         # not across the estimators to avoid memory load.
         parallel, p_func, n_jobs = parallel_func(_sl_transform, self.n_jobs)
         n_jobs = min(n_jobs, X.shape[-1])
-        X_splits = np.array_split(X, n_jobs, axis=-1)
         est_splits = np.array_split(self.estimators_, n_jobs)
+        X_splits = np.array_split(X, n_jobs, axis=-1)
         y_pred = parallel(p_func(est, x, method)
                           for (est, x) in zip(est_splits, X_splits))
 
@@ -271,8 +273,8 @@ class SlidingEstimator(BaseEstimator, TransformerMixin):
         # not across the estimators to avoid memory load.
         parallel, p_func, n_jobs = parallel_func(_sl_score, self.n_jobs)
         n_jobs = min(n_jobs, X.shape[-1])
-        X_splits = np.array_split(X, n_jobs, axis=-1)
         est_splits = np.array_split(self.estimators_, n_jobs)
+        X_splits = np.array_split(X, n_jobs, axis=-1)
         score = parallel(p_func(est, scoring, x, y)
                          for (est, x) in zip(est_splits, X_splits))
 
@@ -433,6 +435,12 @@ class GeneralizingEstimator(SlidingEstimator):
         """Aux. function to make parallel predictions/transformation."""
         self._check_Xy(X)
         method = _check_method(self.base_estimator, method)
+        if method in ('predict', 'decision_function'):
+            # linear models: all estimators on all slices at once
+            y_pred = _gl_linear_predictions(self.estimators_, X,
+                                            predict=method == 'predict')
+            if y_pred is not None and method in y_pred:
+                return y_pred[method]
         parallel, p_func, n_jobs = parallel_func(_gl_transform, self.n_jobs)
         n_jobs = min(n_jobs, X.shape[-1])
         y_pred = parallel(
@@ -475,6 +483,14 @@ class GeneralizingEstimator(SlidingEstimator):
         -------
         y_pred : array, shape (n_samples, n_estimators, n_slices) | (n_samples, n_estimators, n_slices, n_targets)
             The predicted values for each estimator.
+
+        Notes
+        -----
+        If base_estimator is a linear model (a scikit-learn linear model,
+        possibly wrapped in :class:`mne.decoding.LinearModel` or preceded in
+        a pipeline by :class:`mne.decoding.Vectorizer` and
+        ``StandardScaler``), the predictions of all estimators on all slices
+        are computed with a single matrix product.
         """  # noqa: E501
         return self._transform(X, 'predict')
 
@@ -520,6 +536,8 @@ class GeneralizingEstimator(SlidingEstimator):
         Notes
         -----
         This requires base_estimator to have a ``decision_function`` method.
+        For linear models, the distances are computed with a single matrix
+        product, see :meth:`predict`.
         """  # noqa: E501
         return self._transform(X, 'decision_function')
 
@@ -548,11 +566,12 @@ class GeneralizingEstimator(SlidingEstimator):
         # not across the estimators to avoid memory load.
         parallel, p_func, n_jobs = parallel_func(_gl_score, self.n_jobs)
         n_jobs = min(n_jobs, X.shape[-1])
-        X_splits = np.array_split(X, n_jobs, axis=-1)
         scoring = check_scoring(self.base_estimator, self.scoring)
         y = _fix_auc(scoring, y)
-        score = parallel(p_func(self.estimators_, scoring, x, y)
-                         for x in X_splits)
+        # the scorers named by a string only use the predictions
+        stack = isinstance(self.scoring, string_types)
+        score = parallel(p_func(self.estimators_, scoring, x, y, stack)
+                         for x in np.array_split(X, n_jobs, axis=-1))
 
         score = np.concatenate(score, axis=1)
         return score
@@ -576,18 +595,11 @@ def _gl_transform(estimators, X, method):
         The transformed values generated by each estimator.
     """
     n_sample, n_iter = X.shape[0], X.shape[-1]
+    # stack generalized data for faster prediction
+    X_stack = _gl_stack(X)
     for ii, est in enumerate(estimators):
-        # stack generalized data for faster prediction
-        X_stack = X.transpose(np.r_[0, X.ndim - 1, range(1, X.ndim - 1)])
-        X_stack = X_stack.reshape(np.r_[n_sample * n_iter, X_stack.shape[2:]])
         transform = getattr(est, method)
-        _y_pred = transform(X_stack)
-        # unstack generalizations
-        if _y_pred.ndim == 2:
-            _y_pred = np.reshape(_y_pred, [n_sample, n_iter, _y_pred.shape[1]])
-        else:
-            shape = np.r_[n_sample, n_iter, _y_pred.shape[1:]].astype(int)
-            _y_pred = np.reshape(_y_pred, shape)
+        _y_pred = _gl_unstack(transform(X_stack), n_sample, n_iter)
         # Initialize array of predictions on the first transform iteration
         if ii == 0:
             y_pred = _gl_init_pred(_y_pred, X, len(estimators))
@@ -595,6 +607,18 @@ def _gl_transform(estimators, X, method):
     return y_pred
 
 
+def _gl_stack(X):
+    """Stack the slices of X along the samples."""
+    n_sample, n_iter = X.shape[0], X.shape[-1]
+    X_stack = X.transpose(np.r_[0, X.ndim - 1, range(1, X.ndim - 1)])
+    return X_stack.reshape(np.r_[n_sample * n_iter, X_stack.shape[2:]])
+
+
+def _gl_unstack(y_pred, n_sample, n_iter):
+    """Unstack the predictions of stacked slices."""
+    return np.reshape(y_pred, (n_sample, n_iter) + y_pred.shape[1:])
+
+
 def _gl_init_pred(y_pred, X, n_train):
     """Aux. function to GeneralizingEstimator to initialize y_pred."""
     n_sample, n_iter = X.shape[0], X.shape[-1]
@@ -606,7 +630,7 @@ def _gl_init_pred(y_pred, X, n_train):
     return y_pred
 
 
-def _gl_score(estimators, scoring, X, y):
+def _gl_score(estimators, scoring, X, y, stack=False):
     """Score GeneralizingEstimator in parallel.
 
     Predict and score each slice of data.
@@ -624,6 +648,9 @@ def _gl_score(estimators, scoring, X, y):
         X.shape = (n_samples, n_features_1, n_features_2, n_estimators)
     y : array, shape (n_samples,) | (n_samples, n_targets)
         The target values.
+    stack : bool
+        Whether the scorer only uses the predictions of the estimators, which
+        can then be computed once on all the slices stacked together.
 
     Returns
     -------
@@ -633,8 +660,21 @@ def _gl_score(estimators, scoring, X, y):
     # FIXME: The level parallelization may be a bit high, and might be memory
     # consuming. Perhaps need to lower it down to the loop across X slices.
     score_shape = [len(estimators), X.shape[-1]]
+    # Scorers that only use the predictions of the estimator get them from
+    # a single call on all the stacked slices
+    X_stack = y_pred = None
+    if stack:
+        X_stack = _gl_stack(X)
+        y_pred = _gl_linear_predictions(estimators, X)
     for ii, est in enumerate(estimators):
+        if X_stack is not None:
+            est = _StackedPredictions(est, X_stack, X.shape[0], X.shape[-1])
+            if y_pred is not None:
+                est._predictions.update(
+                    (method, pred[:, ii]) for method, pred in y_pred.items())
         for jj in range(X.shape[-1]):
+            if X_stack is not None:
+                est._jj = jj
             _score = scoring(est, X[..., jj], y)
             # Initialize array of predictions on the first score iteration
             if (ii == 0) & (jj == 0):
@@ -644,6 +684,113 @@ def _gl_score(estimators, scoring, X, y):
     return score
 
 
+def _get_linear_map(estimator):
+    """Collapse a linear estimator into an affine map of the features.
+
+    Returns ``coef`` (n_outputs, n_features) and ``intercept`` (n_outputs,)
+    such that the decision function of ``estimator`` is
+    ``np.dot(X.reshape(len(X), -1), coef.T) + intercept``, and the final
+    linear model. Returns None if ``estimator`` is not of this form.
+    """
+    from sklearn.linear_model.base import LinearClassifierMixin
+    from sklearn.linear_model.base import LinearModel as SkLinearModel
+    from sklearn.preprocessing import StandardScaler
+    steps = [step for _, step in getattr(estimator, 'steps',
+                                         [(None, estimator)])]
+    model = steps[-1]
+    if isinstance(model, LinearModel):
+        model = model.model
+    if not isinstance(model, (LinearClassifierMixin, SkLinearModel)) or \
+            not isinstance(getattr(model, 'coef_', None), np.ndarray):
+        return None
+    coef = np.atleast_2d(model.coef_)
+    intercept = np.zeros(len(coef)) + model.intercept_
+    for step in steps[-2::-1]:
+        if isinstance(step, StandardScaler):
+            if step.with_std:
+                coef = coef / step.scale_
+            if step.with_mean:
+                intercept = intercept - np.dot(coef, step.mean_)
+        elif step is not None and not isinstance(step, Vectorizer):
+            return None
+    return coef, intercept, model
+
+
+def _gl_linear_predictions(estimators, X, predict=True):
+    """Predict with linear estimators on all slices with one product.
+
+    Returns a dict with the ``'decision_function'`` (classifiers only) and
+    ``'predict'`` (if ``predict``, always for regressors) outputs of shape
+    (n_samples, n_estimators, n_slices[, n_outputs]), or None if the
+    estimators are not all linear.
+    """
+    try:
+        maps = [_get_linear_map(est) for est in estimators]
+    except ImportError:
+        return None
+    if len(maps) == 0 or any(m is None for m in maps) or \
+            len(set(m[0].shape for m in maps)) != 1:
+        return None
+    coef = np.array([m[0] for m in maps])
+    if coef.shape[2] != np.prod(X.shape[1:-1]):
+        return None
+    n_sample, n_iter = X.shape[0], X.shape[-1]
+    n_train, n_out = coef.shape[:2]
+    model = maps[0][2]
+    intercept = np.concatenate([m[1] for m in maps])
+    coef = coef.reshape(n_train * n_out, -1)
+    X = X.reshape(n_sample, -1, n_iter)
+    y_pred = np.empty((n_sample, n_train * n_out, n_iter),
+                      np.result_type(coef, X))
+    for y_sample, X_sample in zip(y_pred, X):
+        np.dot(coef, X_sample, out=y_sample)
+        y_sample += intercept[:, np.newaxis]
+    y_pred = y_pred.reshape(n_sample, n_train, n_out, n_iter)
+    if n_out == 1 and (hasattr(model, 'classes_') or model.coef_.ndim == 1):
+        y_pred = y_pred[:, :, 0]
+    else:
+        y_pred = np.ascontiguousarray(y_pred.transpose(0, 1, 3, 2))
+    if not hasattr(model, 'classes_'):
+        return dict(predict=y_pred)
+    y_pred = dict(decision_function=y_pred)
+    if predict:  # as in LinearClassifierMixin
+        if n_out == 1:
+            indices = (y_pred['decision_function'] > 0).astype(int)
+        else:
+            indices = y_pred['decision_function'].argmax(axis=-1)
+        y_pred['predict'] = model.classes_[indices]
+    return y_pred
+
+
+class _StackedPredictions(object):
+    """Serve the predictions of an estimator on one slice at a time.
+
+    The prediction methods of ``estimator`` are called once on all stacked
+    slices, and return the predictions of the slice ``_jj``. Other attributes
+    are those of ``estimator``.
+    """
+
+    def __init__(self, estimator, X_stack, n_sample, n_iter):
+        self._estimator = estimator
+        self._X_stack = X_stack
+        self._n_sample = n_sample
+        self._n_iter = n_iter
+        self._predictions = dict()
+        self._jj = 0
+
+    def __getattr__(self, attr):
+        if attr not in ('predict', 'predict_proba', 'decision_function'):
+            return getattr(self._estimator, attr)
+        method = getattr(self._estimator, attr)
+
+        def _predict(X):
+            if attr not in self._predictions:
+                self._predictions[attr] = _gl_unstack(
+                    method(self._X_stack), self._n_sample, self._n_iter)
+            return self._predictions[attr][:, self._jj]
+        return _predict
+
+
 def _fix_auc(scoring, y):
     from sklearn.preprocessing import LabelEncoder
     # This fixes sklearn's inability to compute roc_auc when y not in [0, 1]
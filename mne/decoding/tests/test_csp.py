@@ -219,6 +219,58 @@ def test_csp_pipeline():
     assert (pipe.get_params()["CSP__reg"] == 0.2)
 
 
+@requires_sklearn
+def test_csp_epoch_covs():
+    """Test CSP and SPoC with precomputed epoch covariances."""
+    from sklearn.model_selection import cross_val_score
+    from sklearn.pipeline import make_pipeline
+    from sklearn.linear_model import LogisticRegression
+    from mne.cov import _regularized_covariance
+    rng = np.random.RandomState(0)
+    X = rng.randn(30, 5, 40)
+    X_orig = X.copy()
+    y = np.arange(30) % 3
+    epoch_covs = np.array([np.dot(epoch, epoch.T) / X.shape[2]
+                           for epoch in X])
+    for reg in (None, 0.1):
+        covs = np.array([_regularized_covariance(epoch, reg=reg)
+                         for epoch in X])
+        for n_classes in (2, 3):
+            this_y = y % n_classes
+            for cov_est in ('concat', 'epoch'):
+                csp = CSP(reg=reg, cov_est=cov_est)
+                csp.fit(X[3:], this_y[3:], epoch_covs=epoch_covs[3:])
+                csp_data = CSP(reg=reg, cov_est=cov_est).fit(X[3:],
+                                                             this_y[3:])
+                assert_array_almost_equal(csp.filters_, csp_data.filters_)
+                assert_array_almost_equal(csp.mean_, csp_data.mean_)
+        # SPoC matches the covariances estimated epoch by epoch
+        spoc = SPoC(reg=reg).fit(X, y, epoch_covs=epoch_covs)
+        evals, evecs = np.linalg.eig(np.linalg.solve(
+            covs.mean(0), np.mean(covs * ((y - y.mean()) / y.std())[
+                :, np.newaxis, np.newaxis], axis=0)))
+        evecs = evecs[:, np.argsort(np.abs(evals))[::-1]].T
+        evecs /= np.linalg.norm(evecs, axis=1, keepdims=True)
+        filters = spoc.filters_ / np.linalg.norm(spoc.filters_, axis=1,
+                                                 keepdims=True)
+        assert_array_almost_equal(np.abs(np.sum(filters * evecs, axis=1)),
+                                  np.ones(5))
+    assert_array_equal(X, X_orig)  # the data are not modified
+
+    # the covariances of each fold are selected by cross_val_score
+    pipe = make_pipeline(CSP(reg=0.1), LogisticRegression())
+    scores = cross_val_score(pipe, X, y % 2, cv=3,
+                             fit_params=dict(csp__epoch_covs=epoch_covs))
+    assert_array_almost_equal(scores,
+                              cross_val_score(pipe, X, y % 2, cv=3))
+
+    pytest.raises(ValueError, CSP(reg='ledoit_wolf').fit, X, y,
+                  epoch_covs=epoch_covs)
+    pytest.raises(ValueError, CSP().fit, X, y, epoch_covs=epoch_covs[1:])
+    pytest.raises(ValueError, SPoC(reg='oas').fit, X, y.astype(float),
+                  epoch_covs=epoch_covs)
+
+
 def test_ajd():
     """Test approximate joint diagonalization."""
     # The implementation shuold obtain the same
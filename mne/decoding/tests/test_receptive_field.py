@@ -7,6 +7,7 @@ import pytest
 import numpy as np
 
 from numpy.testing import assert_array_equal, assert_allclose, assert_equal
+from scipy import linalg
 
 from mne import io, pick_types
 from mne.fixes import einsum
@@ -328,6 +329,16 @@ def test_time_delaying_fast_calc():
             x_xt_true = np.dot(X_del.T, X_del).T
             assert_allclose(x_xt, x_xt_true, atol=1e-7, err_msg=(smin, smax))
 
+    # multiple epochs are summed, delays can exceed the signal length
+    X = rng.randn(25, 4, 3)
+    y = rng.randn(25, 4, 2)
+    for smin, smax in ((-3, 5), (2, 6), (-6, -2), (-30, 30), (27, 31)):
+        x_xt, x_yt, n_ch_x = _compute_corrs(X, y, smin, smax + 1)
+        X_del = _delay_time_series(X, smin, smax, 1.)
+        X_del.shape = (X.shape[0] * X.shape[1], -1)
+        assert_allclose(x_xt, np.dot(X_del.T, X_del), atol=1e-7)
+        assert_allclose(x_yt, np.dot(X_del.T, y.reshape(-1, 2)), atol=1e-7)
+
 
 @requires_version('sklearn', '0.17')
 def test_receptive_field_1d():
@@ -519,4 +530,65 @@ def test_inverse_coef():
             rf.fit(y, X)
 
 
+@requires_version('sklearn', '0.17')
+def test_receptive_field_partial_fit():
+    """Test accumulating the receptive field model over chunks of data."""
+    rng = np.random.RandomState(0)
+    tmin, tmax, sfreq = -2, 3, 1.
+    X = rng.randn(100, 4, 3) + 1.
+    y = rng.randn(100, 4, 2) - 1.
+    for fit_intercept in (True, False):
+        rf = ReceptiveField(tmin, tmax, sfreq, estimator=1.,
+                            fit_intercept=fit_intercept, patterns=True)
+        rf.fit(X, y)
+        rf_part = ReceptiveField(tmin, tmax, sfreq, estimator=1.,
+                                 fit_intercept=fit_intercept, patterns=True)
+        for ei in range(X.shape[1]):
+            rf_part.partial_fit(X[:, ei], y[:, ei], solve=(ei == 3))
+        assert_allclose(rf_part.coef_, rf.coef_, atol=1e-12)
+        assert_allclose(rf_part.patterns_, rf.patterns_, atol=1e-12)
+        # the output covariance is centered as with np.cov
+        cov_ = rf.estimator_.cov_ / (X.shape[0] * X.shape[1] - 1)
+        cov_y = np.cov(y.reshape(-1, y.shape[-1]).T)
+        patterns = np.dot(cov_, np.dot(rf.coef_.reshape(-1, y.shape[-1]),
+                                       linalg.pinv(cov_y)))
+        assert_allclose(rf.patterns_.reshape(patterns.shape), patterns,
+                        rtol=1e-10)
+        assert_allclose(rf_part.predict(X), rf.predict(X), atol=1e-12)
+        # solving again for other values of alpha
+        for alpha in (0.1, 10.):
+            rf_part.refit(alpha)
+            assert rf_part.estimator == alpha
+            rf = ReceptiveField(tmin, tmax, sfreq, estimator=alpha,
+                                fit_intercept=fit_intercept).fit(X, y)
+            assert_allclose(rf_part.coef_, rf.coef_, atol=1e-12)
+            assert_allclose(rf_part.estimator_.intercept_,
+                            rf.estimator_.intercept_, atol=1e-12)
+
+    # chunks of different lengths match solving the delayed data directly
+    tdr = TimeDelayingRidge(tmin, tmax, sfreq, alpha=2., reg_type='laplacian')
+    Xs = [rng.randn(n_times, 2) + 1. for n_times in (30, 45, 12)]
+    ys = [rng.randn(n_times, 1) for n_times in (30, 45, 12)]
+    for this_X, this_y in zip(Xs, ys):
+        tdr.partial_fit(this_X, this_y)
+    X_mean = np.concatenate(Xs).mean(axis=0)
+    y_mean = np.concatenate(ys).mean(axis=0)
+    X_del = np.concatenate([
+        _delay_time_series(this_X - X_mean, tmin, tmax, sfreq).reshape(
+            len(this_X), -1) for this_X in Xs])
+    reg = _compute_reg_neighbors(2, tmax - tmin + 1, 'laplacian')
+    coef = np.linalg.solve(np.dot(X_del.T, X_del) + 2. * reg,
+                           np.dot(X_del.T, np.concatenate(ys) - y_mean))
+    assert_allclose(tdr.coef_, coef.T.reshape(tdr.coef_.shape), atol=1e-12)
+    tdr.refit(1.)
+    tdr.refit(2.)
+    assert_allclose(tdr.coef_, coef.T.reshape(tdr.coef_.shape), atol=1e-12)
+    pytest.raises(ValueError, tdr.partial_fit, Xs[0][:, :1], ys[0])
+    pytest.raises(ValueError, TimeDelayingRidge(0, 1, 1.).refit)
+
+    from sklearn.linear_model import Ridge
+    rf = ReceptiveField(tmin, tmax, sfreq, estimator=Ridge())
+    pytest.raises(ValueError, rf.partial_fit, X, y)
+
+
 run_tests_if_main()
@@ -3,12 +3,15 @@
 # License: BSD (3-clause)
 
 import numpy as np
-from numpy.testing import assert_array_equal, assert_equal
+from numpy.testing import assert_array_equal, assert_equal, assert_allclose
 import pytest
 
 from mne.utils import requires_version
-from mne.decoding.search_light import SlidingEstimator, GeneralizingEstimator
+from mne.decoding.search_light import (SlidingEstimator,
+                                       GeneralizingEstimator, _gl_transform,
+                                       _gl_linear_predictions)
 from mne.decoding.transformer import Vectorizer
+from mne.decoding.base import LinearModel
 
 
 def make_data():
@@ -86,6 +89,11 @@ def test_search_light():
     score = sl.score(X, y)
     assert_array_equal(score, [roc_auc_score(y - 1, _y_pred - 1)
                                for _y_pred in sl.decision_function(X).T])
+    # -- same with a scorer object
+    sl.scoring = make_scorer(roc_auc_score, needs_threshold=True)
+    assert_array_equal(sl.score(X, y), score)
+    with pytest.raises(ValueError, match='two-class'):
+        sl.score(X, np.arange(len(X)) % 3)
     y = np.arange(len(X)) % 2
 
     # Cannot pass a metric as a scoring parameter
@@ -159,7 +167,7 @@ def test_generalization_light():
     """Test GeneralizingEstimator."""
     from sklearn.pipeline import make_pipeline
     from sklearn.linear_model import LogisticRegression
-    from sklearn.metrics import roc_auc_score
+    from sklearn.metrics import roc_auc_score, make_scorer
 
     X, y = make_data()
     n_epochs, _, n_time = X.shape
@@ -212,6 +220,11 @@ def test_generalization_light():
     manual_score = [[roc_auc_score(y - 1, _y_pred) for _y_pred in _y_preds]
                     for _y_preds in gl.decision_function(X).transpose(1, 2, 0)]
     assert_array_equal(score, manual_score)
+    # -- same with a scorer object
+    gl.scoring = make_scorer(roc_auc_score, needs_threshold=True)
+    assert_array_equal(gl.score(X, y), score)
+    with pytest.raises(ValueError, match='two-class'):
+        gl.score(X, np.arange(len(X)) % 3)
 
     # n_jobs
     gl = GeneralizingEstimator(LogisticRegression(), n_jobs=2)
@@ -220,6 +233,21 @@ def test_generalization_light():
     assert_array_equal(y_pred.shape, [n_epochs, n_time, n_time])
     score = gl.score(X, y)
     assert_array_equal(score.shape, [n_time, n_time])
+    for n_jobs in [1, 2]:
+        gl = GeneralizingEstimator(LogisticRegression(), scoring='accuracy',
+                                   n_jobs=n_jobs).fit(X, y)
+        manual_score = [[np.mean(_y_pred == y) for _y_pred in _y_preds]
+                        for _y_preds in gl.predict(X).transpose(1, 2, 0)]
+        assert_array_equal(gl.score(X, y), manual_score)
+
+    # other scorers may not only use the predictions on the given slice
+    def scoring(est, X, y):
+        return np.mean(est.predict(X[::-1]) == y)
+    scoring._score_func = None
+    gl.scoring = scoring
+    manual_score = [[np.mean(_y_pred[::-1] == y) for _y_pred in _y_preds]
+                    for _y_preds in gl.predict(X).transpose(1, 2, 0)]
+    assert_array_equal(gl.score(X, y), manual_score)
 
     # n_jobs > n_estimators
     gl.fit(X[..., [0]], y)
@@ -238,6 +266,43 @@ def test_generalization_light():
     assert_array_equal(y_preds[0], y_preds[1])
 
 
+@requires_version('sklearn', '0.17')
+def test_generalization_light_linear():
+    """Test the closed-form predictions of linear GeneralizingEstimator."""
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.linear_model import LogisticRegression, Ridge
+    from sklearn.svm import SVC
+    from sklearn.metrics.scorer import check_scoring
+    from sklearn.base import is_classifier
+
+    X, y = make_data()
+    X = X.reshape(len(X), 4, 8, X.shape[-1])
+    for clf, this_y in [(LogisticRegression(), y),
+                        (LogisticRegression(multi_class='multinomial',
+                                            solver='lbfgs'),
+                         np.arange(len(y)) % 3),
+                        (LinearModel(LogisticRegression()), y), (Ridge(), y),
+                        (Ridge(), np.c_[y, -y])]:
+        clf = make_pipeline(Vectorizer(), StandardScaler(), clf)
+        gl = GeneralizingEstimator(clf).fit(X, this_y)
+        y_preds = _gl_linear_predictions(gl.estimators_, X)
+        assert y_preds is not None
+        for method in ('predict', 'decision_function'):
+            if hasattr(clf, method):
+                y_pred = _gl_transform(gl.estimators_, X, method)
+                assert_allclose(y_preds[method], y_pred, atol=1e-10)
+                assert_allclose(getattr(gl, method)(X), y_pred, atol=1e-10)
+        gl.scoring = 'accuracy' if is_classifier(clf) else 'r2'
+        scorer = check_scoring(clf, gl.scoring)
+        assert_allclose(gl.score(X, this_y), [[scorer(est, X[..., jj], this_y)
+                                               for jj in range(X.shape[-1])]
+                                              for est in gl.estimators_])
+    # not linear
+    gl = GeneralizingEstimator(SVC(kernel='rbf')).fit(X[:, 0], y)
+    assert _gl_linear_predictions(gl.estimators_, X[:, 0]) is None
+
+
 @requires_version('sklearn', '0.17')
 def test_cross_val_predict():
     """Test cross_val_predict with predict_proba."""
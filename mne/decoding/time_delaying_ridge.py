@@ -14,6 +14,39 @@ from ..utils import warn
 from ..externals.six import string_types
 
 
+def _cross_spectra(a_fft, b_fft):
+    """Sum the cross-spectra of all channel pairs across epochs."""
+    return np.einsum('fei,fej->fij', a_fft.conj(), b_fft)
+
+
+def _adjust_edge(x_xt_4d, X_edge, dmin):
+    """Remove the products cut off at one edge from the autocorrelations.
+
+    For delays ``d = dmin + np.arange(n_delays)`` counted from the edge
+    sample ``X_edge[0]``, the products cut off between the delays ``d_i``
+    and ``d_j`` are the sum of ``X_edge[d_i - s] * X_edge[d_j - s]`` over
+    ``1 <= s <= min(d_i, d_j)``. Each row of delays is thus the previous row
+    shifted by one delay plus the products of a single sample.
+    """
+    n_ch, n_delays = x_xt_4d.shape[:2]
+    n_epochs = X_edge.shape[1]
+    dmax = dmin + n_delays - 1
+    lo = min(dmin, 0)
+    delays = np.arange(lo, dmax + 1)
+    mask = (delays >= 1) & (delays <= len(X_edge))
+    cols = np.zeros((n_epochs, n_ch, len(delays)))
+    cols[:, :, mask] = X_edge[delays[mask] - 1].transpose(1, 2, 0)
+    cols = cols.reshape(n_epochs, -1)
+    adjust = np.zeros((n_ch, n_ch, len(delays)))
+    for d in range(1, dmax + 1):
+        adjust[:, :, 1:] = adjust[:, :, :-1]
+        adjust[:, :, 0] = 0.
+        if d <= len(X_edge):
+            adjust += np.dot(X_edge[d - 1].T, cols).reshape(adjust.shape)
+        if d >= dmin:
+            x_xt_4d[:, d - dmin] -= adjust[:, :, dmin - lo:]
+
+
 def _compute_corrs(X, y, smin, smax):
     """Compute auto- and cross-correlations."""
     if X.ndim == 2:
@@ -23,111 +56,111 @@ def _compute_corrs(X, y, smin, smax):
     assert X.shape[:2] == y.shape[:2]
     len_trf = smax - smin
     len_x, n_epochs, n_ch_x = X.shape
-    len_y, n_epcohs, n_ch_y = y.shape
+    len_y, n_epochs, n_ch_y = y.shape
     assert len_x == len_y
 
-    n_fft = next_fast_len(X.shape[0] + max(smax, 0) - min(smin, 0) - 1)
-
-    x_xt = np.zeros([n_ch_x * len_trf] * 2)
-    x_y = np.zeros((len_trf, n_ch_x, n_ch_y), order='F')
-    for ei in range(n_epochs):
-        this_X = X[:, ei, :]
-        X_fft = np.fft.rfft(this_X, n_fft, axis=0)
-        y_fft = np.fft.rfft(y[:, ei, :], n_fft, axis=0)
-
-        # compute the autocorrelations
-        for ch0 in range(n_ch_x):
-            other_sl = slice(ch0, n_ch_x)
-            ac_temp = np.fft.irfft(X_fft[:, ch0][:, np.newaxis] *
-                                   X_fft[:, other_sl].conj(), n_fft, axis=0)
-            n_other = ac_temp.shape[1]
-            row = ac_temp[:len_trf]  # zero and positive lags
-            col = ac_temp[-1:-len_trf:-1]  # negative lags
-            # Our autocorrelation structure is a Toeplitz matrix, but
-            # it's faster to create the Toeplitz ourselves.
-            x_xt_temp = np.zeros((len_trf, len_trf, n_other))
-            for ii in range(len_trf):
-                x_xt_temp[ii, ii:] = row[:len_trf - ii]
-                x_xt_temp[ii + 1:, ii] = col[:len_trf - ii - 1]
-            row_adjust = np.zeros((len_trf, n_other))
-            col_adjust = np.zeros((len_trf, n_other))
-
-            # However, we need to adjust for coeffs that are cut off by
-            # the mode="same"-like behavior of the algorithm,
-            # i.e. the non-zero delays should not have the same AC value
-            # as the zero-delay ones (because they actually have fewer
-            # coefficients).
-            #
-            # These adjustments also follow a Toeplitz structure, but it's
-            # computationally more efficient to manually accumulate and
-            # subtract from each row and col, rather than accumulate a single
-            # adjustment matrix using Toeplitz repetitions then subtract
-
-            # Adjust positive lags where the tail gets cut off
-            for idx in range(1, smax):
-                ii = idx - smin
-                end_sl = slice(X.shape[0] - idx, -smax - min(ii, 0), -1)
-                c = (this_X[-idx, other_sl][np.newaxis] *
-                     this_X[end_sl, ch0][:, np.newaxis])
-                r = this_X[-idx, ch0] * this_X[end_sl, other_sl]
-                if ii <= 0:
-                    col_adjust += c
-                    row_adjust += r
-                    if ii == 0:
-                        x_xt_temp[0, :] = row - row_adjust
-                        x_xt_temp[1:, 0] = col - col_adjust[1:]
-                else:
-                    col_adjust[:-ii] += c
-                    row_adjust[:-ii] += r
-                    x_xt_temp[ii, ii:] = row[:-ii] - row_adjust[:-ii]
-                    x_xt_temp[ii + 1:, ii] = col[:-ii] - col_adjust[1:-ii]
-
-            # Adjust negative lags where the head gets cut off
-            x_xt_temp = x_xt_temp[::-1][:, ::-1]
-            row_adjust.fill(0.)
-            col_adjust.fill(0.)
-            for idx in range(0, -smin):
-                ii = idx + smax
-                start_sl = slice(idx, -smin + min(ii, 0))
-                c = (this_X[idx, other_sl][np.newaxis] *
-                     this_X[start_sl, ch0][:, np.newaxis])
-                r = this_X[idx, ch0] * this_X[start_sl, other_sl]
-                if ii <= 0:
-                    col_adjust += c
-                    row_adjust += r
-                    if ii == 0:
-                        x_xt_temp[0, :] -= row_adjust
-                        x_xt_temp[1:, 0] -= col_adjust[1:]
-                else:
-                    col_adjust[:-ii] += c
-                    row_adjust[:-ii] += r
-                    x_xt_temp[ii, ii:] -= row_adjust[:-ii]
-                    x_xt_temp[ii + 1:, ii] -= col_adjust[1:-ii]
-
-            x_xt_temp = x_xt_temp[::-1][:, ::-1]
-            for oi in range(n_other):
-                ch1 = oi + ch0
-                # Store the result
-                this_result = x_xt_temp[:, :, oi]
-                x_xt[ch0 * len_trf:(ch0 + 1) * len_trf,
-                     ch1 * len_trf:(ch1 + 1) * len_trf] += this_result
-                if ch0 != ch1:
-                    x_xt[ch1 * len_trf:(ch1 + 1) * len_trf,
-                         ch0 * len_trf:(ch0 + 1) * len_trf] += this_result.T
-
-            # compute the crosscorrelations
-            cc_temp = np.fft.irfft(
-                y_fft * X_fft[:, ch0][:, np.newaxis].conj(), n_fft, axis=0)
-            if smin < 0 and smax >= 0:
-                x_y[:-smin, ch0] += cc_temp[smin:]
-                x_y[len_trf - smax:, ch0] += cc_temp[:smax]
-            else:
-                x_y[:, ch0] += cc_temp[smin:smax]
-
-    x_y = np.reshape(x_y, (n_ch_x * len_trf, n_ch_y), order='F')
+    n_fft = next_fast_len(len_x + max(smax - 1, 0) - min(smin, 0))
+
+    # Transform all epochs and channels at once, the cross-spectra are
+    # summed across epochs before going back to the time domain
+    X_fft = np.fft.rfft(X, n_fft, axis=0)
+    y_fft = np.fft.rfft(y, n_fft, axis=0)
+
+    # compute the crosscorrelations
+    x_y = np.fft.irfft(_cross_spectra(X_fft, y_fft), n_fft, axis=0)
+    x_y = x_y[np.arange(smin, smax) % n_fft].transpose(1, 0, 2)
+    x_y = np.reshape(x_y, (n_ch_x * len_trf, n_ch_y))
+
+    # compute the autocorrelations (zero and positive lags), in blocks of
+    # channels to keep the inverse FFT buffer to a reasonable size
+    ac = np.empty((len_trf, n_ch_x, n_ch_x))
+    n_block = max(2 ** 24 // (n_fft * n_ch_x), 1)
+    for start in range(0, n_ch_x, n_block):
+        sl = slice(start, start + n_block)
+        ac[:, sl] = np.fft.irfft(_cross_spectra(X_fft[:, :, sl], X_fft),
+                                 n_fft, axis=0)[:len_trf]
+    del X_fft, y_fft
+
+    # Our autocorrelation structure is a block Toeplitz matrix, which we
+    # fill one row of delays at a time from the autocorrelations ordered
+    # by decreasing lag difference (negative lags are the transposes).
+    x_xt = np.empty([n_ch_x * len_trf] * 2)
+    x_xt_4d = x_xt.reshape(n_ch_x, len_trf, n_ch_x, len_trf)
+    ac_diag = np.empty((n_ch_x, n_ch_x, 2 * len_trf - 1))
+    ac_diag[:, :, len_trf - 1::-1] = ac.transpose(1, 2, 0)
+    ac_diag[:, :, len_trf:] = ac[1:].transpose(2, 1, 0)
+    for ii in range(len_trf):
+        x_xt_4d[:, ii] = ac_diag[:, :, len_trf - 1 - ii:2 * len_trf - 1 - ii]
+    del ac, ac_diag
+
+    # However, we need to adjust for coeffs that are cut off by the
+    # mode="same"-like behavior of the algorithm, i.e. the non-zero delays
+    # should not have the same AC value as the zero-delay ones (because they
+    # actually have fewer coefficients). The tail gets cut off for positive
+    # delays (counted backward from the last sample) and the head for
+    # negative ones (counted forward from the first sample, in reverse order).
+    _adjust_edge(x_xt_4d, X[::-1], smin)
+    _adjust_edge(x_xt_4d[:, ::-1, :, ::-1], X, 1 - smax)
     return x_xt, x_y, n_ch_x
 
 
+def _compute_window_sums(X, y, smin, smax):
+    """Compute the sums of the delayed samples used to center correlations.
+
+    For each pair of delays, this is the sum of the samples of ``X`` delayed
+    by the first delay where the second one is valid (not zero-filled), and
+    the number of such samples. For ``y``, it is the sum of the samples where
+    each delay is valid.
+    """
+    if X.ndim == 2:
+        X = X[:, np.newaxis, :]
+        y = y[:, np.newaxis, :]
+    len_x, n_epochs = X.shape[:2]
+    delays = np.arange(smin, smax)
+    d_i, d_j = delays[:, np.newaxis], delays[np.newaxis]
+    lo = np.minimum(np.maximum(np.maximum(d_j - d_i, -d_i), 0), len_x)
+    hi = np.maximum(np.minimum(np.minimum(d_j - d_i, -d_i), 0) + len_x, lo)
+    x_cum = np.zeros((len_x + 1, X.shape[2]))
+    np.cumsum(X.sum(axis=1), axis=0, out=x_cum[1:])
+    x_win = x_cum[hi] - x_cum[lo]  # (n_delays, n_delays, n_ch_x)
+    n_win = n_epochs * (hi - lo)
+    y_cum = np.zeros((len_x + 1, y.shape[2]))
+    np.cumsum(y.sum(axis=1), axis=0, out=y_cum[1:])
+    y_win = (y_cum[np.clip(delays + len_x, 0, len_x)] -
+             y_cum[np.clip(delays, 0, len_x)])  # (n_delays, n_ch_y)
+    return x_win, y_win, n_win
+
+
+def _center_corrs(corrs, fit_intercept):
+    """Remove the sample mean from the accumulated correlations."""
+    n_samples = float(corrs['n_samples'])
+    x_xt, x_y, y_y = corrs['x_xt'], corrs['x_y'], corrs['y_y']
+    X_offset, y_offset = corrs['X_ref'], corrs['y_ref']
+    if fit_intercept:
+        x_mean = corrs['x_sum'] / n_samples
+        y_mean = corrs['y_sum'] / n_samples
+        X_offset, y_offset = X_offset + x_mean, y_offset + y_mean
+        x_win, y_win, n_win = corrs['x_win'], corrs['y_win'], corrs['n_win']
+        n_ch_x, len_trf = len(x_mean), len(n_win)
+        x_xt = x_xt.copy()
+        x_xt_4d = x_xt.reshape(n_ch_x, len_trf, n_ch_x, len_trf)
+        adjust = (x_win.transpose(2, 0, 1)[:, :, np.newaxis] *
+                  x_mean[:, np.newaxis])
+        x_xt_4d -= adjust
+        x_xt_4d -= adjust.transpose(2, 3, 0, 1)
+        del adjust
+        x_xt_4d += (np.outer(x_mean, x_mean)[:, np.newaxis, :, np.newaxis] *
+                    n_win[:, np.newaxis])
+        x_y = x_y.reshape(n_ch_x, len_trf, -1).copy()
+        idx = np.arange(len_trf)
+        x_y -= x_win[idx, idx].T[:, :, np.newaxis] * y_mean
+        x_y -= x_mean[:, np.newaxis, np.newaxis] * (
+            y_win - n_win[idx, idx][:, np.newaxis] * y_mean)
+        x_y = x_y.reshape(n_ch_x * len_trf, -1)
+        y_y = y_y - n_samples * np.outer(y_mean, y_mean)
+    return x_xt, x_y, y_y, X_offset, y_offset
+
+
 def _compute_reg_neighbors(n_ch_x, n_delays, reg_type, method='direct',
                            normed=False):
     """Compute regularization parameter from neighbors."""
@@ -205,6 +238,38 @@ def _fit_corrs(x_xt, x_y, n_ch_x, reg_type, alpha, n_ch_in):
     return w
 
 
+def _eig_corrs(x_xt, n_ch_x, reg_type):
+    """Diagonalize the correlation and regularization matrices together."""
+    n_delays = x_xt.shape[0] // n_ch_x
+    reg = _compute_reg_neighbors(n_ch_x, n_delays, reg_type)
+    if np.array_equal(reg, np.eye(len(reg))):
+        x_scale, evecs = linalg.eigh(x_xt)
+        return x_scale, np.ones_like(x_scale), evecs
+    try:
+        # evecs.T @ x_xt @ evecs is then the identity
+        reg_scale, evecs = linalg.eigh(reg, x_xt)
+    except np.linalg.LinAlgError:
+        return None
+    return np.ones_like(reg_scale), reg_scale, evecs
+
+
+def _fit_eig(eig, x_y, alpha, n_ch_in):
+    """Fit the model using diagonalized correlation matrices."""
+    x_scale, reg_scale, evecs = eig
+    n_ch_out = x_y.shape[1]
+    n_delays = x_y.shape[0] // n_ch_in
+    scale = x_scale + alpha * reg_scale
+    mask = scale > len(scale) * np.finfo(float).eps * np.abs(scale).max()
+    if not mask.all():
+        warn('Singular matrix in solving dual problem. Using '
+             'least-squares solution instead.')
+    scale[mask] = 1. / scale[mask]
+    scale[~mask] = 0.
+    w = np.dot(evecs, scale[:, np.newaxis] * np.dot(evecs.T, x_y))
+    w = w.T.reshape([n_ch_out, n_ch_in, n_delays])
+    return w
+
+
 class TimeDelayingRidge(BaseEstimator):
     """Ridge regression of data with time delays.
 
@@ -278,33 +343,137 @@ class TimeDelayingRidge(BaseEstimator):
         self : instance of TimeDelayingRidge
             Returns the modified instance.
         """
+        self._corrs = None
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y, solve=True):
+        """Accumulate the correlations of a chunk of data.
+
+        This can be called repeatedly with chunks of data (e.g., trials of
+        different lengths read one at a time) that do not fit in memory at
+        once. The auto- and cross-correlations of the chunks are summed, and
+        the model is fit to all the chunks seen since the last call to
+        :meth:`fit`, as if they were concatenated (without delaying the
+        samples across chunks).
+
+        Parameters
+        ----------
+        X : array, shape (n_samples[, n_epochs], n_features)
+            The training input samples to estimate the linear coefficients.
+        y : array, shape (n_samples[, n_epochs],  n_outputs)
+            The target values.
+        solve : bool
+            If True (default), the coefficients are updated. Use False to
+            only accumulate the correlations, for example for all but the
+            last chunk, or call :meth:`refit` once all the chunks are done.
+
+        Returns
+        -------
+        self : instance of TimeDelayingRidge
+            Returns the modified instance.
+
+        Notes
+        -----
+        .. versionadded:: 0.17
+        """
         if X.ndim == 3:
             assert y.ndim == 3
             assert X.shape[:2] == y.shape[:2]
         else:
             assert X.ndim == 2 and y.ndim == 2
             assert X.shape[0] == y.shape[0]
-        # These are split into two functions because it's possible that we
-        # might want to allow people to do them separately (e.g., to test
-        # different regularization parameters).
-        if self.fit_intercept:
-            # We could do this in the Fourier domain, too, but it should
-            # be a bit cleaner numerically to do it here.
-            X_offset = np.mean(X, axis=0)
-            y_offset = np.mean(y, axis=0)
-            if X.ndim == 3:
-                X_offset = X_offset.mean(axis=0)
-                y_offset = np.mean(y_offset, axis=0)
-            X = X - X_offset
-            y = y - y_offset
+        corrs = getattr(self, '_corrs', None)
+        if corrs is None:
+            if self.fit_intercept:
+                # The mean of the first chunk is removed to keep the sums of
+                # products well conditioned, the exact sample mean of all
+                # the chunks is removed when solving.
+                X_ref = np.mean(X.reshape(-1, X.shape[-1]), axis=0)
+                y_ref = np.mean(y.reshape(-1, y.shape[-1]), axis=0)
+            else:
+                X_ref = np.zeros(X.shape[-1])
+                y_ref = np.zeros(y.shape[-1])
+            corrs = dict(X_ref=X_ref, y_ref=y_ref, n_samples=0)
+        elif (X.shape[-1], y.shape[-1]) != (len(corrs['X_ref']),
+                                            len(corrs['y_ref'])):
+            raise ValueError('The numbers of features and outputs (%s and %s) '
+                             'must match the previous data (%s and %s)'
+                             % (X.shape[-1], y.shape[-1],
+                                len(corrs['X_ref']), len(corrs['y_ref'])))
+        X = X - corrs['X_ref']
+        y = y - corrs['y_ref']
+        x_xt, x_y, _ = _compute_corrs(X, y, self._smin, self._smax)
+        x_win, y_win, n_win = _compute_window_sums(X, y, self._smin,
+                                                   self._smax)
+        X = X.reshape(-1, X.shape[-1])
+        y = y.reshape(-1, y.shape[-1])
+        chunk = dict(x_xt=x_xt, x_y=x_y, y_y=np.dot(y.T, y),
+                     x_sum=X.sum(axis=0), y_sum=y.sum(axis=0),
+                     x_win=x_win, y_win=y_win, n_win=n_win)
+        del x_xt, x_y
+        for key, val in chunk.items():
+            if key in corrs:
+                corrs[key] += val
+            else:
+                corrs[key] = val
+        corrs['n_samples'] += len(X)
+        self._corrs = corrs
+        self._solver = None
+        if solve:
+            self.refit()
+        return self
+
+    def refit(self, alpha=None):
+        """Solve the model again using the accumulated correlations.
+
+        Parameters
+        ----------
+        alpha : float | None
+            The regularization factor to use. If None (default),
+            ``self.alpha`` is used, otherwise it is updated.
+
+        Returns
+        -------
+        self : instance of TimeDelayingRidge
+            Returns the modified instance.
+
+        Notes
+        -----
+        The correlations are not computed again. The first solve uses the
+        regularized correlation matrix directly, and the following ones an
+        eigendecomposition (jointly with the regularization matrix) that is
+        computed only once, so that the coefficients for a grid of ``alpha``
+        values only cost one matrix product each.
+
+        .. versionadded:: 0.17
+        """
+        if getattr(self, '_corrs', None) is None:
+            raise ValueError('Estimator has not been fit yet.')
+        if alpha is not None:
+            self.alpha = float(alpha)
+        n_ch_x = len(self._corrs['X_ref'])
+        if self._solver is None:
+            self.cov_, x_y, y_y, X_offset, y_offset = _center_corrs(
+                self._corrs, self.fit_intercept)
+            self._solver = dict(x_y=x_y, y_y=y_y, X_offset=X_offset,
+                                y_offset=y_offset)
+            self.coef_ = _fit_corrs(self.cov_, x_y, n_ch_x,
+                                    self.reg_type, self.alpha, n_ch_x)
         else:
-            X_offset = y_offset = 0.
-        self.cov_, x_y_, n_ch_x = _compute_corrs(X, y, self._smin, self._smax)
-        self.coef_ = _fit_corrs(self.cov_, x_y_, n_ch_x,
-                                self.reg_type, self.alpha, n_ch_x)
+            solver = self._solver
+            if 'eig' not in solver:
+                solver['eig'] = _eig_corrs(self.cov_, n_ch_x, self.reg_type)
+            if solver['eig'] is None:  # not positive definite
+                self.coef_ = _fit_corrs(self.cov_, solver['x_y'], n_ch_x,
+                                        self.reg_type, self.alpha, n_ch_x)
+            else:
+                self.coef_ = _fit_eig(solver['eig'], solver['x_y'],
+                                      self.alpha, n_ch_x)
         # This is the sklearn formula from LinearModel (will be 0. for no fit)
         if self.fit_intercept:
-            self.intercept_ = y_offset - np.dot(X_offset, self.coef_.sum(-1).T)
+            self.intercept_ = (self._solver['y_offset'] -
+                               np.dot(self._solver['X_offset'],
+                                      self.coef_.sum(-1).T))
         else:
             self.intercept_ = 0.
         return self
@@ -330,12 +499,16 @@ class TimeDelayingRidge(BaseEstimator):
         out = np.zeros(X.shape[:2] + (self.coef_.shape[0],))
         smin = self._smin
         offset = max(smin, 0)
-        for ei in range(X.shape[1]):
-            for oi in range(self.coef_.shape[0]):
-                for fi in range(self.coef_.shape[1]):
-                    temp = np.convolve(X[:, ei, fi], self.coef_[oi, fi])
-                    temp = temp[max(-smin, 0):][:len(out) - offset]
-                    out[offset:len(temp) + offset, ei, oi] += temp
+        # Convolve all epochs, features and outputs at once in the
+        # frequency domain, summing across features
+        len_conv = X.shape[0] + self.coef_.shape[2] - 1
+        n_fft = next_fast_len(len_conv)
+        X_fft = np.fft.rfft(X, n_fft, axis=0)
+        coef_fft = np.fft.rfft(self.coef_, n_fft, axis=-1)
+        temp = np.fft.irfft(np.einsum('fei,oif->feo', X_fft, coef_fft),
+                            n_fft, axis=0)[:len_conv]
+        temp = temp[max(-smin, 0):][:len(out) - offset]
+        out[offset:len(temp) + offset] = temp
         out += self.intercept_
         if singleton:
             out = out[:, 0, :]
@@ -26,7 +26,7 @@ from .io.write import (start_file, start_block, end_file, end_block,
 from .io.meas_info import read_meas_info, write_meas_info, _merge_info
 from .io.open import fiff_open, _get_next_fname
 from .io.tree import dir_tree_find
-from .io.tag import read_tag, read_tag_info
+from .io.tag import read_tag, read_tag_info, _read_tags_into
 from .io.constants import FIFF
 from .io.pick import (pick_types, channel_indices_by_type, channel_type,
                       pick_channels, pick_info, _pick_data_channels,
@@ -2505,7 +2505,9 @@ def _read_one_epoch_file(f, tree, preload):
 
         # Read the data
         if preload:
-            data = read_tag(fid, data_tag.pos).data.astype(np.float64)
+            data = np.empty((len(events),) + epoch_shape)
+            _read_tags_into(fid, [(data_tag.pos + 16, data.size)], '>f4',
+                            data)
             data *= cals[np.newaxis, :, :]
 
         # Put it all together
@@ -2689,13 +2691,10 @@ class EpochsFIF(BaseEpochs):
         # >>> data = read_tag(raw.fid, raw.data_tag.pos).data.astype(float)
         # >>> data *= raw.cals[np.newaxis, :, :]
         # >>> data = data[idx]
-        #
-        # Eventually this could be refactored in io/tag.py if other functions
-        # could make use of it
 
-        raw.fid.seek(raw.data_tag.pos + offset + 16, 0)  # 16 = Tag header
-        data = np.frombuffer(raw.fid.read(size), '>f4').astype(np.float64)
-        data.shape = raw.epoch_shape
+        data = np.empty(raw.epoch_shape)
+        _read_tags_into(raw.fid, [(raw.data_tag.pos + offset + 16,  # header
+                                   data.size)], '>f4', data)
         data *= raw.cals
         return data
 
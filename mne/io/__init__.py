@@ -43,6 +43,7 @@ from .artemis123 import read_raw_artemis123
 from .eeglab import read_raw_eeglab, read_epochs_eeglab, read_events_eeglab
 from .eeglab import read_annotations_eeglab
 from .eximia import read_raw_eximia
+from .scan import scan_headers
 
 # for backward compatibility
 from .fiff import Raw
@@ -9,6 +9,7 @@
 
 import copy
 from copy import deepcopy
+from multiprocessing.pool import ThreadPool
 import os
 import os.path as op
 
@@ -17,29 +18,28 @@ import numpy as np
 from .constants import FIFF
 from .pick import pick_types, channel_type, pick_channels, pick_info
 from .pick import _pick_data_channels, _pick_data_or_ica
-from .meas_info import write_meas_info
+from .meas_info import write_meas_info, Info
 from .proj import setup_proj, activate_proj, _proj_equal, ProjMixin
 from ..channels.channels import (ContainsMixin, UpdateChannelsMixin,
                                  SetChannelsMixin, InterpolationMixin)
 from ..channels.montage import read_montage, _set_montage, Montage
 from .compensator import set_current_comp, make_compensator
 from .write import (start_file, end_file, start_block, end_block,
-                    write_dau_pack16, write_float, write_double,
-                    write_complex64, write_complex128, write_int,
-                    write_id, write_string, _get_split_size)
+                    write_int, write_int_matrix, write_id, write_string,
+                    _get_split_size, _compress_data_buffer, _get_lzma)
 
 from ..annotations import (_annotations_starts_stops, _write_annotations,
                            _handle_meas_date)
 from ..filter import (filter_data, notch_filter, resample, next_fast_len,
                       _resample_stim_channels, _filt_check_picks,
                       _filt_update_info)
-from ..parallel import parallel_func
+from ..parallel import parallel_func, check_n_jobs
 from ..utils import (_check_fname, _check_pandas_installed, sizeof_fmt,
-                     _check_pandas_index_arguments,
+                     _check_pandas_index_arguments, get_config,
                      check_fname, _get_stim_channel,
                      logger, verbose, _time_mask, warn, SizeMixin,
                      copy_function_doc_to_method_doc,
-                     _check_preload)
+                     _check_preload, use_log_level)
 from ..viz import plot_raw, plot_raw_psd, plot_raw_psd_topo
 from ..defaults import _handle_default
 from ..externals.six import string_types
@@ -428,6 +428,7 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         # most classes only store real data, they won't need anything special
         return self._dtype_
 
+    @verbose
     def _read_segment(self, start=0, stop=None, sel=None, data_buffer=None,
                       projector=None, verbose=None):
         """Read a chunk of raw data.
@@ -457,6 +458,15 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         -------
         data : array, [channels x samples]
            the data matrix (channels x samples).
+
+        Notes
+        -----
+        When the span covers several files (split files or concatenated
+        raw instances), the portions of the files can be read concurrently
+        by a pool of threads by setting the ``MNE_IO_N_THREADS`` config
+        value (see :func:`mne.set_config`). Each thread fills its own slice
+        of the data, which mostly helps on network file systems where the
+        latency of each file dominates.
         """
         #  Initial checks
         start = int(start)
@@ -508,6 +518,7 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         cals = cals.T[idx]
 
         # read from necessary files
+        reads = list()
         offset = 0
         for fi in np.nonzero(files_used)[0]:
             start_file = self._first_samps[fi]
@@ -520,10 +531,26 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
                 raise ValueError('Bad array indexing, could be a bug')
             n_read = stop_file - start_file
             this_sl = slice(offset, offset + n_read)
-            self._read_segment_file(data[:, this_sl], idx, fi,
-                                    int(start_file), int(stop_file),
-                                    cals, mult)
+            reads.append((data[:, this_sl], idx, fi, int(start_file),
+                          int(stop_file), cals, mult))
             offset += n_read
+
+        n_threads = 1
+        if len(reads) > 1:
+            n_threads = min(check_n_jobs(
+                int(get_config('MNE_IO_N_THREADS', 1))), len(reads))
+        if n_threads > 1:
+            logger.debug('    Reading %d files using %d threads'
+                         % (len(reads), n_threads))
+            pool = ThreadPool(n_threads)
+            try:
+                pool.map(lambda args: self._read_segment_file(*args), reads)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for args in reads:
+                self._read_segment_file(*args)
         return data
 
     def _read_segment_file(self, data, idx, fi, start, stop, cals, mult):
@@ -629,6 +656,8 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         assert len(self._data) == self.info['nchan']
         self.preload = True
         self._comp = None  # no longer needed
+        if isinstance(self.info, Info):  # the file is no longer needed
+            self.info._load_lazy()
         self.close()
 
     def _update_times(self):
@@ -1608,7 +1637,8 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
     @verbose
     def save(self, fname, picks=None, tmin=0, tmax=None, buffer_size_sec=None,
              drop_small_buffer=False, proj=False, fmt='single',
-             overwrite=False, split_size='2GB', verbose=None):
+             overwrite=False, split_size='2GB', compression=None,
+             verbose=None):
         """Save raw data to file.
 
         Parameters
@@ -1662,6 +1692,17 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
             .. note:: Due to FIFF file limitations, the maximum split
                       size is 2GB.
 
+        compression : None | str
+            If 'zlib' (fast) or 'lzma' (smaller, Python 3 only), each data
+            buffer is compressed on its own, after taking the differences
+            between successive samples (for 'short' and 'int' formats) or
+            grouping the bytes by significance (floating-point formats).
+            Contrary to gzipped files, the data can still be read with random
+            access, but the files can only be read by MNE-Python. If None
+            (default), the data are not compressed.
+
+            .. versionadded:: 0.17
+
         verbose : bool, str, int, or None
             If not None, override default verbose level (see
             :func:`mne.verbose` and :ref:`Logging documentation <tut_logging>`
@@ -1675,6 +1716,12 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         work properly on a saved concatenated file (e.g., probably some
         or all forms of SSS). It is recommended not to concatenate and
         then save raw files for this reason.
+
+        The data buffers are encoded in large blocks written at once. If the
+        ``MNE_IO_N_THREADS`` config value is larger than one (see
+        :func:`mne.set_config`), that many buffers are read at once by a pool
+        of threads, and the blocks are written by a separate thread while the
+        next buffers are read and encoded.
         """
         check_fname(fname, 'raw', ('raw.fif', 'raw_sss.fif', 'raw_tsss.fif',
                                    'raw.fif.gz', 'raw_sss.fif.gz',
@@ -1699,6 +1746,11 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         if fmt not in type_dict.keys():
             raise ValueError('fmt must be "short", "int", "single", '
                              'or "double"')
+        if compression not in (None, 'zlib', 'lzma'):
+            raise ValueError('compression must be None, "zlib" or "lzma", '
+                             'got %r' % (compression,))
+        if compression == 'lzma':
+            _get_lzma()  # check that it is available
         reset_dict = dict(short=False, int=False, single=True, double=True)
         reset_range = reset_dict[fmt]
         data_type = type_dict[fmt]
@@ -1737,7 +1789,7 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         # write the raw file
         _write_raw(fname, self, info, picks, fmt, data_type, reset_range,
                    start, stop, buffer_size, projector, drop_small_buffer,
-                   split_size, 0, None)
+                   split_size, 0, None, compression=compression)
 
     @copy_function_doc_to_method_doc(plot_raw)
     def plot(self, events=None, duration=10.0, start=0.0, n_channels=20,
@@ -2160,10 +2212,27 @@ class _RawShell():
 
 ###############################################################################
 # Writing
+def _read_raw_buffer(raw, picks, first, last, transform):
+    """Read one buffer of data to write, optionally transforming it."""
+    data, times = raw[picks, first:last]
+    if transform is not None:
+        data = transform(data)
+    return data, times
+
+
 def _write_raw(fname, raw, info, picks, fmt, data_type, reset_range, start,
                stop, buffer_size, projector, drop_small_buffer,
-               split_size, part_idx, prev_fname):
-    """Write raw file with splitting."""
+               split_size, part_idx, prev_fname, transform=None, n_jobs=None,
+               compression=None):
+    """Write raw file with splitting.
+
+    If not None, ``transform(data)`` maps each buffer of ``raw`` (channels
+    ``picks``) to the channels of ``info``. With ``n_jobs > 1``, buffers are
+    read and transformed ``n_jobs`` at a time by a pool of threads, and the
+    encoded buffers are written in order by a separate thread. If None,
+    ``n_jobs`` is the ``MNE_IO_N_THREADS`` config value. If not None,
+    ``compression`` is the codec used to compress each buffer on its own.
+    """
     # we've done something wrong if we hit this
     n_times_max = len(raw.times)
     if start >= stop or stop > n_times_max:
@@ -2221,70 +2290,109 @@ def _write_raw(fname, raw, info, picks, fmt, data_type, reset_range, start,
                 warn('Acquisition skips detected but did not fit evenly into '
                      'output buffer_size, will be written as zeroes.')
 
+    def _is_skip(first, last):
+        return do_skips and ((first >= sk_onsets) & (last <= sk_ends)).any()
+
+    # the buffers are read (and transformed) and the blocks of encoded
+    # buffers written by a pool of threads sharing the raw instance
+    if n_jobs is None:
+        n_jobs = int(get_config('MNE_IO_N_THREADS', 1))
+    n_jobs = check_n_jobs(n_jobs)
+    pool = ThreadPool(n_jobs) if n_jobs > 1 else None
+    buffers = dict()
     n_current_skip = 0
-    for first, last in zip(firsts, lasts):
-        if do_skips:
-            if ((first >= sk_onsets) & (last <= sk_ends)).any():
-                # Track how many we have
-                n_current_skip += 1
-                continue
-            elif n_current_skip > 0:
-                # Write out an empty buffer instead of data
-                write_int(fid, FIFF.FIFF_DATA_SKIP, n_current_skip)
-                # These two NOPs appear to be optional (MaxFilter does not do
-                # it, but some acquisition machines do) so let's not bother.
-                # write_nop(fid)
-                # write_nop(fid)
-                n_current_skip = 0
-        data, times = raw[use_picks, first:last]
-        assert len(times) == last - first
-
-        if projector is not None:
-            data = np.dot(projector, data)
-
-        if ((drop_small_buffer and (first > start) and
-             (len(times) < buffer_size))):
-            logger.info('Skipping data chunk due to small buffer ... '
-                        '[done]')
-            break
-        logger.debug('Writing ...')
-        _write_raw_buffer(fid, data, cals, fmt)
-
-        pos = fid.tell()
-        this_buff_size_bytes = pos - pos_prev
-        overage = pos - split_size + next_file_buffer
-        if overage > 0:
-            # This should occur on the first buffer write of the file, so
-            # we should mention the space required for the meas info
-            fid.close()
-            raise ValueError(
-                'buffer size (%s) is too large for the given split size (%s) '
-                'by %s bytes after writing info (%s) and leaving enough space '
-                'for end tags (%s): decrease "buffer_size_sec" or increase '
-                '"split_size".' % (this_buff_size_bytes, split_size, overage,
-                                   pos_prev, next_file_buffer))
-
-        # Split files if necessary, leave some space for next file info
-        # make sure we check to make sure we actually *need* another buffer
-        # with the "and" check
-        if pos >= split_size - this_buff_size_bytes - next_file_buffer and \
-                first + buffer_size < stop:
-            next_fname, next_idx = _write_raw(
-                fname, raw, info, picks, fmt,
-                data_type, reset_range, first + buffer_size, stop, buffer_size,
-                projector, drop_small_buffer, split_size,
-                part_idx + 1, use_fname)
-
-            start_block(fid, FIFF.FIFFB_REF)
-            write_int(fid, FIFF.FIFF_REF_ROLE, FIFF.FIFFV_ROLE_NEXT_FILE)
-            write_string(fid, FIFF.FIFF_REF_FILE_NAME, op.basename(next_fname))
-            if info['meas_id'] is not None:
-                write_id(fid, FIFF.FIFF_REF_FILE_ID, info['meas_id'])
-            write_int(fid, FIFF.FIFF_REF_FILE_NUM, next_idx)
-            end_block(fid, FIFF.FIFFB_REF)
-            break
-
-        pos_prev = pos
+    writer = _RawBufferWriter(fid, n_jobs > 1, compression)
+    try:
+        for bi, (first, last) in enumerate(zip(firsts, lasts)):
+            if do_skips:
+                if _is_skip(first, last):
+                    # Track how many we have
+                    n_current_skip += 1
+                    continue
+                elif n_current_skip > 0:
+                    # Write out an empty buffer instead of data
+                    writer.flush()
+                    write_int(fid, FIFF.FIFF_DATA_SKIP, n_current_skip)
+                    # These two NOPs appear to be optional (MaxFilter does
+                    # not do it, but some acquisition machines do) so let's
+                    # not bother.
+                    # write_nop(fid)
+                    # write_nop(fid)
+                    n_current_skip = 0
+            if bi not in buffers:
+                buffers.clear()
+                use = [bj for bj in range(bi, len(firsts))
+                       if not _is_skip(firsts[bj], lasts[bj])][:n_jobs]
+                args = [(raw, use_picks, firsts[bj], lasts[bj], transform)
+                        for bj in use]
+                if pool is None:
+                    buffers.update(zip(use, [_read_raw_buffer(*arg)
+                                             for arg in args]))
+                else:
+                    # set the logging level of the reads once for all threads
+                    level = logger.level if raw.verbose is None \
+                        else raw.verbose
+                    with use_log_level(level):
+                        buffers.update(zip(use, pool.map(
+                            lambda arg: _read_raw_buffer(*arg), args)))
+            data, times = buffers.pop(bi)
+            assert len(times) == last - first
+
+            if projector is not None:
+                data = np.dot(projector, data)
+
+            if ((drop_small_buffer and (first > start) and
+                 (len(times) < buffer_size))):
+                logger.info('Skipping data chunk due to small buffer ... '
+                            '[done]')
+                break
+            logger.debug('Writing ...')
+            writer.write(data, cals, fmt)
+
+            pos = writer.tell()
+            this_buff_size_bytes = pos - pos_prev
+            overage = pos - split_size + next_file_buffer
+            if overage > 0:
+                # This should occur on the first buffer write of the file, so
+                # we should mention the space required for the meas info
+                writer.close()
+                fid.close()
+                raise ValueError(
+                    'buffer size (%s) is too large for the given split size '
+                    '(%s) by %s bytes after writing info (%s) and leaving '
+                    'enough space for end tags (%s): decrease '
+                    '"buffer_size_sec" or increase "split_size".'
+                    % (this_buff_size_bytes, split_size, overage, pos_prev,
+                       next_file_buffer))
+
+            # Split files if necessary, leave some space for next file info
+            # make sure we check to make sure we actually *need* another
+            # buffer with the "and" check
+            if pos >= split_size - this_buff_size_bytes - next_file_buffer \
+                    and first + buffer_size < stop:
+                writer.close()
+                next_fname, next_idx = _write_raw(
+                    fname, raw, info, picks, fmt,
+                    data_type, reset_range, first + buffer_size, stop,
+                    buffer_size, projector, drop_small_buffer, split_size,
+                    part_idx + 1, use_fname, transform, n_jobs, compression)
+
+                start_block(fid, FIFF.FIFFB_REF)
+                write_int(fid, FIFF.FIFF_REF_ROLE, FIFF.FIFFV_ROLE_NEXT_FILE)
+                write_string(fid, FIFF.FIFF_REF_FILE_NAME,
+                             op.basename(next_fname))
+                if info['meas_id'] is not None:
+                    write_id(fid, FIFF.FIFF_REF_FILE_ID, info['meas_id'])
+                write_int(fid, FIFF.FIFF_REF_FILE_NUM, next_idx)
+                end_block(fid, FIFF.FIFFB_REF)
+                break
+
+            pos_prev = pos
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
 
     logger.info('Closing %s [done]' % use_fname)
     if info.get('maxshield', False):
@@ -2367,6 +2475,79 @@ def _start_writing_raw(name, info, sel=None, data_type=FIFF.FIFFT_FLOAT,
     return fid, cals
 
 
+_raw_buffer_types = dict(
+    short=(FIFF.FIFFT_DAU_PACK16, '>i2'), int=(FIFF.FIFFT_INT, '>i4'),
+    single=(FIFF.FIFFT_FLOAT, '>f4'), double=(FIFF.FIFFT_DOUBLE, '>f8'))
+_raw_complex_buffer_types = dict(
+    single=(FIFF.FIFFT_COMPLEX_FLOAT, '>c8'),
+    double=(FIFF.FIFFT_COMPLEX_FLOAT, '>c16'))
+
+
+def _get_raw_buffer_type(buf, fmt):
+    """Get the FIF type and the big-endian dtype of a raw data buffer."""
+    if fmt not in ['short', 'int', 'single', 'double']:
+        raise ValueError('fmt must be "short", "single", or "double"')
+
+    if np.isrealobj(buf):
+        return _raw_buffer_types[fmt]
+    elif fmt in _raw_complex_buffer_types:
+        return _raw_complex_buffer_types[fmt]
+    else:
+        raise ValueError('only "single" and "double" supported for '
+                         'writing complex data')
+
+
+def _encode_raw_buffer(buf, cals, fmt, out=None, compression=None):
+    """Encode a raw buffer as a FIF data buffer tag.
+
+    Parameters
+    ----------
+    buf : array
+        The buffer to write.
+    cals : array
+        Calibration factors.
+    fmt : str
+        'short', 'int', 'single', or 'double' for 16/32 bit int or 32/64 bit
+        float for each item. This will be doubled for complex datatypes. Note
+        that short and int formats cannot be used for complex data.
+    out : ndarray of uint8 | None
+        Where to encode the tag (must have the size of the tag). If None, a
+        new array is allocated. Must be None with compression.
+    compression : None | str
+        If not None, the codec used to compress the buffer on its own in a
+        FIFF_MNE_COMPRESSED_DATA_BUFFER tag.
+
+    Returns
+    -------
+    out : ndarray of uint8
+        The bytes of the tag (header and big-endian data).
+    """
+    if buf.shape[0] != len(cals):
+        raise ValueError('buffer and calibration sizes do not match')
+    kind, dtype = _get_raw_buffer_type(buf, fmt)
+    if compression is not None:
+        assert out is None
+        data = np.empty(buf.shape[::-1], dtype)
+        np.divide(buf.T, np.ravel(cals), casting='unsafe', out=data)
+        payload = _compress_data_buffer(data, kind, compression)
+        out = np.empty(16 + len(payload), np.uint8)
+        out[:16].view('>i4')[:] = (FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER,
+                                   FIFF.FIFFT_BYTE, len(payload),
+                                   FIFF.FIFFV_NEXT_SEQ)
+        out[16:] = np.frombuffer(payload, np.uint8)
+        return out
+    data_size = buf.size * np.dtype(dtype).itemsize
+    if out is None:
+        out = np.empty(16 + data_size, np.uint8)
+    assert out.shape == (16 + data_size,)
+    out[:16].view('>i4')[:] = (FIFF.FIFF_DATA_BUFFER, kind, data_size,
+                               FIFF.FIFFV_NEXT_SEQ)
+    # calibrate and cast directly to the big-endian samples, time first
+    np.divide(buf.T, np.ravel(cals), casting='unsafe',
+              out=out[16:].view(dtype).reshape(buf.shape[::-1]))
+    return out
+
+
 def _write_raw_buffer(fid, buf, cals, fmt):
     """Write raw buffer.
 
@@ -2383,32 +2564,104 @@ def _write_raw_buffer(fid, buf, cals, fmt):
         float for each item. This will be doubled for complex datatypes. Note
         that short and int formats cannot be used for complex data.
     """
-    if buf.shape[0] != len(cals):
-        raise ValueError('buffer and calibration sizes do not match')
+    fid.write(_encode_raw_buffer(buf, cals, fmt))
 
-    if fmt not in ['short', 'int', 'single', 'double']:
-        raise ValueError('fmt must be "short", "single", or "double"')
 
-    if np.isrealobj(buf):
-        if fmt == 'short':
-            write_function = write_dau_pack16
-        elif fmt == 'int':
-            write_function = write_int
-        elif fmt == 'single':
-            write_function = write_float
+# Size of the blocks of encoded data buffers written at once
+_WRITE_BLOCK_SIZE = 2 ** 25
+
+
+class _RawBufferWriter(object):
+    """Encode raw data buffers into large blocks and write them at once.
+
+    The tags are encoded in a preallocated block of ``_WRITE_BLOCK_SIZE``
+    bytes, which is written to the file when full or when :meth:`flush` is
+    called. With ``background=True``, the blocks are written by a thread
+    while the following buffers are read and encoded (using two blocks in
+    turn).
+
+    With compression, each buffer is compressed on its own, and the types
+    and uncompressed sizes of the buffers are written in an index tag when
+    closing, so that the file can be opened without reading the buffers.
+    """
+
+    def __init__(self, fid, background=False, compression=None):
+        self.fid = fid
+        self._pos = fid.tell()
+        self._blocks = [np.empty(_WRITE_BLOCK_SIZE, np.uint8)
+                        for _ in range(2 if background else 1)]
+        self._n_used = 0
+        self._pool = ThreadPool(1) if background else None
+        self._pending = None
+        self._compression = compression
+        self._index = list() if compression is not None else None
+
+    def tell(self):
+        """Get the position in the file after the encoded tags."""
+        return self._pos
+
+    def write(self, buf, cals, fmt):
+        """Encode a data buffer tag."""
+        kind, dtype = _get_raw_buffer_type(buf, fmt)
+        data_size = buf.size * np.dtype(dtype).itemsize
+        if self._compression is None:
+            tag = None
+            n_bytes = 16 + data_size
         else:
-            write_function = write_double
-    else:
-        if fmt == 'single':
-            write_function = write_complex64
-        elif fmt == 'double':
-            write_function = write_complex128
+            tag = _encode_raw_buffer(buf, cals, fmt,
+                                     compression=self._compression)
+            n_bytes = len(tag)
+            self._index.append((kind, data_size))
+        if self._n_used + n_bytes > _WRITE_BLOCK_SIZE:
+            self._write_block()
+        if n_bytes > _WRITE_BLOCK_SIZE:  # too large, write it on its own
+            self._wait()
+            self.fid.write(_encode_raw_buffer(buf, cals, fmt)
+                           if tag is None else tag)
         else:
-            raise ValueError('only "single" and "double" supported for '
-                             'writing complex data')
+            block = self._blocks[0][self._n_used:self._n_used + n_bytes]
+            if tag is None:
+                _encode_raw_buffer(buf, cals, fmt, block)
+            else:
+                block[:] = tag
+            self._n_used += n_bytes
+        self._pos += n_bytes
 
-    buf = buf / np.ravel(cals)[:, None]
-    write_function(fid, FIFF.FIFF_DATA_BUFFER, buf)
+    def flush(self):
+        """Write the encoded tags so that the file can be used directly."""
+        self._write_block()
+        self._wait()
+
+    def close(self):
+        """Flush, write the index and stop the writing thread."""
+        try:
+            self.flush()
+            if self._index:
+                write_int_matrix(self.fid, FIFF.FIFF_MNE_COMPRESSED_DATA_INDEX,
+                                 np.array(self._index))
+                self._index = None
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def _write_block(self):
+        if self._n_used == 0:
+            return
+        self._wait()
+        block = self._blocks[0][:self._n_used]
+        if self._pool is None:
+            self.fid.write(block)
+        else:
+            self._pending = self._pool.apply_async(self.fid.write, (block,))
+            self._blocks = self._blocks[::-1]
+        self._n_used = 0
+
+    def _wait(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.get()
 
 
 def _my_hilbert(x, n_fft=None, envelope=False):
@@ -223,49 +223,15 @@ def _read_segments_c(raw, data, idx, fi, start, stop, cals, mult):
         _mult_cal_one(data, block, idx, cals, mult)
 
 
-def _read_vmrk_events(fname, event_id=None, trig_shift_by_type=None):
-    """Read events from a vmrk file.
-
-    Parameters
-    ----------
-    fname : str
-        vmrk file to be read.
-    event_id : dict | None
-        The id of special events to consider in addition to those that
-        follow the normal Brainvision trigger format ('S###').
-        If dict, the keys will be mapped to trigger values on the stimulus
-        channel. Example: {'SyncStatus': 1; 'Pulse Artifact': 3}. If None
-        or an empty dict (default), only stimulus and response events are added
-        to the stimulus channel. Keys are case sensitive. "New Segment" markers
-        are always dropped.
-    response_trig_shift : int | None
-        Integer to shift response triggers by. None ignores response triggers.
+def _read_vmrk_markers(fname):
+    """Read the markers of a vmrk file.
 
     Returns
     -------
-    events : array, shape (n_events, 3)
-        An array containing the whole recording's events, each row representing
-        an event as (onset, duration, trigger) sequence.
+    markers : list of str
+        The comma-separated type, description, position, size (and channel
+        and date) of each marker.
     """
-    if event_id is None:
-        event_id = dict()
-    if trig_shift_by_type is None:
-        trig_shift_by_type = dict()
-    if not isinstance(trig_shift_by_type, dict):
-        raise TypeError("'trig_shift_by_type' must be None or dict")
-    for mrk_type in list(trig_shift_by_type.keys()):
-        cur_shift = trig_shift_by_type[mrk_type]
-        if not isinstance(cur_shift, int) and cur_shift is not None:
-            raise TypeError('shift for type {} must be int or None'.format(
-                mrk_type
-            ))
-        mrk_type_lc = mrk_type.lower()
-        if mrk_type_lc != mrk_type:
-            if mrk_type_lc in trig_shift_by_type:
-                raise ValueError('marker type {} specified twice with'
-                                 'different case'.format(mrk_type_lc))
-            trig_shift_by_type[mrk_type_lc] = cur_shift
-            del trig_shift_by_type[mrk_type]
     # read vmrk file
     with open(fname, 'rb') as fid:
         txt = fid.read()
@@ -306,14 +272,60 @@ def _read_vmrk_events(fname, event_id=None, trig_shift_by_type=None):
     # extract Marker Infos block
     m = re.search(r"\[Marker Infos\]", txt, re.IGNORECASE)
     if not m:
-        return np.zeros((0, 3))
+        return list()
     mk_txt = txt[m.end():]
     m = re.search(r"^\[.*\]$", mk_txt)
     if m:
         mk_txt = mk_txt[:m.start()]
 
     # extract event information
-    items = re.findall(r"^Mk\d+=(.*)", mk_txt, re.MULTILINE)
+    return re.findall(r"^Mk\d+=(.*)", mk_txt, re.MULTILINE)
+
+
+def _read_vmrk_events(fname, event_id=None, trig_shift_by_type=None):
+    """Read events from a vmrk file.
+
+    Parameters
+    ----------
+    fname : str
+        vmrk file to be read.
+    event_id : dict | None
+        The id of special events to consider in addition to those that
+        follow the normal Brainvision trigger format ('S###').
+        If dict, the keys will be mapped to trigger values on the stimulus
+        channel. Example: {'SyncStatus': 1; 'Pulse Artifact': 3}. If None
+        or an empty dict (default), only stimulus and response events are added
+        to the stimulus channel. Keys are case sensitive. "New Segment" markers
+        are always dropped.
+    response_trig_shift : int | None
+        Integer to shift response triggers by. None ignores response triggers.
+
+    Returns
+    -------
+    events : array, shape (n_events, 3)
+        An array containing the whole recording's events, each row representing
+        an event as (onset, duration, trigger) sequence.
+    """
+    if event_id is None:
+        event_id = dict()
+    if trig_shift_by_type is None:
+        trig_shift_by_type = dict()
+    if not isinstance(trig_shift_by_type, dict):
+        raise TypeError("'trig_shift_by_type' must be None or dict")
+    for mrk_type in list(trig_shift_by_type.keys()):
+        cur_shift = trig_shift_by_type[mrk_type]
+        if not isinstance(cur_shift, int) and cur_shift is not None:
+            raise TypeError('shift for type {} must be int or None'.format(
+                mrk_type
+            ))
+        mrk_type_lc = mrk_type.lower()
+        if mrk_type_lc != mrk_type:
+            if mrk_type_lc in trig_shift_by_type:
+                raise ValueError('marker type {} specified twice with'
+                                 'different case'.format(mrk_type_lc))
+            trig_shift_by_type[mrk_type_lc] = cur_shift
+            del trig_shift_by_type[mrk_type]
+    items = _read_vmrk_markers(fname)
     events, dropped = list(), list()
     for info in items:
         mtype, mdesc, onset, duration = info.split(',')[:4]
@@ -401,42 +413,43 @@ _unit_dict = {'V': 1.,  # V stands for Volt
               'N': 1}  # Newton
 
 
-def _get_vhdr_info(vhdr_fname, eog, misc, scale, montage):
-    """Extract all the information from the header file.
+def _read_vmrk_meas_date(mrk_fname):
+    """Read the measurement date from a marker file."""
+    # Usually saved with a marker "New Segment", see BrainVision documentation
+    regexp = r'^Mk\d+=New Segment,.*,\d+,\d+,\d+,(\d{20})$'
+    with open(mrk_fname, 'r') as tmp_mrk_f:
+        lines = tmp_mrk_f.readlines()
 
-    Parameters
-    ----------
-    vhdr_fname : str
-        Raw EEG header to be read.
-    eog : list of str
-        Names of channels that should be designated EOG channels. Names should
-        correspond to the vhdr file.
-    misc : list or tuple of str | 'auto'
-        Names of channels or list of indices that should be designated
-        MISC channels. Values should correspond to the electrodes
-        in the vhdr file. If 'auto', units in vhdr file are used for inferring
-        misc channels. Default is ``'auto'``.
-    scale : float
-        The scaling factor for EEG data. Unless specified otherwise by
-        header file, units are in microvolts. Default scale factor is 1.
-    montage : str | None | instance of Montage
-        Path or instance of montage containing electrode positions. If None,
-        read sensor locations from header file if present, otherwise (0, 0, 0).
-        See the documentation of :func:`mne.channels.read_montage` for more
-        information.
+    for line in lines:
+        match = re.findall(regexp, line.strip())
+
+        # Always take first measurement date we find
+        if match and match[0] != '00000000000000000000':
+            date_str = match[0]
+            meas_date = datetime.strptime(date_str, '%Y%m%d%H%M%S%f')
+
+            # We need list of unix time in milliseconds and as second entry
+            # the additional amount of microseconds
+            epoch = datetime.utcfromtimestamp(0)
+            unix_time = (meas_date - epoch).total_seconds()
+            unix_secs = int(modf(unix_time)[1])
+            microsecs = int(modf(unix_time)[0] * 1e6)
+            return [unix_secs, microsecs]
+    return DATE_NONE
+
+
+def _read_vhdr_cfg(vhdr_fname):
+    """Read the settings of a header file.
 
     Returns
     -------
-    info : Info
-        The measurement info.
-    fmt : str
-        The data format in the file.
-    edf_info : dict
-        A dict containing Brain Vision specific parameters.
-    events : array, shape (n_events, 3)
-        Events from the corresponding vmrk file.
+    cfg : instance of ConfigParser
+        The parameters of the header file.
+    settings : str
+        The comment section of the header file.
+    cinfostr : str
+        The name of the section with the common infos.
     """
-    scale = float(scale)
     ext = op.splitext(vhdr_fname)[-1]
     if ext != '.vhdr':
         raise IOError("The header file must be given to read the data, "
@@ -482,11 +495,50 @@ def _get_vhdr_info(vhdr_fname, eog, misc, scale, montage):
     else:
         cfg.readfp(StringIO(params))
 
-    # get sampling info
-    # Sampling interval is given in microsec
+    # locate the section with the common infos
     cinfostr = 'Common Infos'
     if not cfg.has_section(cinfostr):
         cinfostr = 'Common infos'  # NeurOne BrainVision export workaround
+    return cfg, settings, cinfostr
+
+
+def _get_vhdr_info(vhdr_fname, eog, misc, scale, montage):
+    """Extract all the information from the header file.
+
+    Parameters
+    ----------
+    vhdr_fname : str
+        Raw EEG header to be read.
+    eog : list of str
+        Names of channels that should be designated EOG channels. Names should
+        correspond to the vhdr file.
+    misc : list or tuple of str | 'auto'
+        Names of channels or list of indices that should be designated
+        MISC channels. Values should correspond to the electrodes
+        in the vhdr file. If 'auto', units in vhdr file are used for inferring
+        misc channels. Default is ``'auto'``.
+    scale : float
+        The scaling factor for EEG data. Unless specified otherwise by
+        header file, units are in microvolts. Default scale factor is 1.
+    montage : str | None | instance of Montage
+        Path or instance of montage containing electrode positions. If None,
+        read sensor locations from header file if present, otherwise (0, 0, 0).
+        See the documentation of :func:`mne.channels.read_montage` for more
+        information.
+
+    Returns
+    -------
+    info : Info
+        The measurement info.
+    fmt : str
+        The data format in the file.
+    edf_info : dict
+        A dict containing Brain Vision specific parameters.
+    events : array, shape (n_events, 3)
+        Events from the corresponding vmrk file.
+    """
+    scale = float(scale)
+    cfg, settings, cinfostr = _read_vhdr_cfg(vhdr_fname)
 
     # get sampling info
     # Sampling interval is given in microsec
@@ -519,30 +571,7 @@ def _get_vhdr_info(vhdr_fname, eog, misc, scale, montage):
     mrk_fname = op.join(path, cfg.get(cinfostr, 'MarkerFile'))
 
     # Try to get measurement date from marker file
-    # Usually saved with a marker "New Segment", see BrainVision documentation
-    regexp = r'^Mk\d+=New Segment,.*,\d+,\d+,\d+,(\d{20})$'
-    with open(mrk_fname, 'r') as tmp_mrk_f:
-        lines = tmp_mrk_f.readlines()
-
-    for line in lines:
-        match = re.findall(regexp, line.strip())
-
-        # Always take first measurement date we find
-        if match and match[0] != '00000000000000000000':
-            date_str = match[0]
-            meas_date = datetime.strptime(date_str, '%Y%m%d%H%M%S%f')
-
-            # We need list of unix time in milliseconds and as second entry
-            # the additional amount of microseconds
-            epoch = datetime.utcfromtimestamp(0)
-            unix_time = (meas_date - epoch).total_seconds()
-            unix_secs = int(modf(unix_time)[1])
-            microsecs = int(modf(unix_time)[0] * 1e6)
-            info['meas_date'] = [unix_secs, microsecs]
-            break
-
-    else:
-        info['meas_date'] = DATE_NONE
+    info['meas_date'] = _read_vmrk_meas_date(mrk_fname)
 
     # load channel labels
     nchan = cfg.getint(cinfostr, 'NumberOfChannels') + 1
@@ -906,3 +935,38 @@ def read_raw_brainvision(vhdr_fname, montage=None,
                           response_trig_shift=response_trig_shift,
                           event_id=event_id, verbose=verbose,
                           trig_shift_by_type=trig_shift_by_type)
+
+
+def _scan_brainvision(vhdr_fname):
+    """Read the summary of a BrainVision file from its header and markers."""
+    cfg, _, cinfostr = _read_vhdr_cfg(vhdr_fname)
+    sfreq = 1e6 / cfg.getfloat(cinfostr, 'SamplingInterval')
+    ch_names = [''] * cfg.getint(cinfostr, 'NumberOfChannels')
+    for chan, props in cfg.items('Channel Infos'):
+        ch_names[int(re.findall(r'ch(\d+)', chan)[0]) - 1] = \
+            props.split(',')[0]
+
+    # the number of samples follows from the size of the data file
+    path = op.dirname(vhdr_fname)
+    data_filename = op.join(path, cfg.get(cinfostr, 'DataFile'))
+    mrk_fname = op.join(path, cfg.get(cinfostr, 'MarkerFile'))
+    if cfg.get(cinfostr, 'DataFormat') == 'BINARY':
+        fmt = _fmt_dict[cfg.get('Binary Infos', 'BinaryFormat')]
+        n_times = (op.getsize(data_filename) //
+                   (_fmt_byte_dict[fmt] * len(ch_names)))
+    else:
+        with open(data_filename, 'rb') as f:
+            n_times = sum(1 for _ in f) - cfg.getint('ASCII Infos',
+                                                     'SkipLines')
+
+    meas_date = _read_vmrk_meas_date(mrk_fname)
+    meas_date = (None if np.array_equal(meas_date, DATE_NONE) else
+                 meas_date[0] + meas_date[1] / 1e6)
+    # the markers without description (e.g., "New Segment") are not events
+    markers = [marker.split(',')[:3] for marker in _read_vmrk_markers(
+        mrk_fname)]
+    markers = [marker for marker in markers if len(marker[1]) > 0]
+    onset = np.array([int(marker[2]) - 1 for marker in markers]) / sfreq
+    description = ['%s/%s' % tuple(marker[:2]) for marker in markers]
+    return dict(sfreq=sfreq, ch_names=ch_names, n_times=n_times,
+                meas_date=meas_date, onset=onset, description=description)
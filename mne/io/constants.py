@@ -544,6 +544,16 @@ FIFF.FIFF_MNE_ICA_MISC_PARAMS       = 3609     # ICA misc params
 #
 FIFF.FIFF_MNE_KIT_SYSTEM_ID         = 3612     # Unique ID assigned to KIT systems
 #
+# Compressed raw data
+#
+FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER = 3613    # Data buffer compressed on its own
+FIFF.FIFF_MNE_COMPRESSED_DATA_INDEX  = 3614    # Types and sizes of the compressed buffers
+FIFF.FIFFV_MNE_COMPRESSION_ZLIB      = 1
+FIFF.FIFFV_MNE_COMPRESSION_LZMA      = 2
+FIFF.FIFFV_MNE_FILTER_NONE           = 0
+FIFF.FIFFV_MNE_FILTER_DELTA          = 1       # Differences between samples (integers)
+FIFF.FIFFV_MNE_FILTER_SHUFFLE        = 2       # Bytes grouped by significance (floats)
+#
 # Maxfilter tags
 #
 FIFF.FIFF_SSS_FRAME                 = 263
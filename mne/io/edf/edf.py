@@ -18,7 +18,6 @@ from ..utils import _blk_read_lims
 from ..base import BaseRaw, _check_update_montage
 from ..meas_info import _empty_info
 from ..constants import FIFF
-from ...filter import resample
 from ...externals.six.moves import zip
 from ...utils import copy_function_doc_to_method_doc
 
@@ -155,7 +154,7 @@ class RawEDF(BaseRaw):
         logger.info('Extracting EDF parameters from %s...' % input_fname)
         input_fname = os.path.abspath(input_fname)
         info, edf_info = _get_info(input_fname, stim_channel, annot,
-                                   annotmap, eog, misc, exclude, preload)
+                                   annotmap, eog, misc, exclude)
         logger.info('Creating raw.info structure...')
         _check_update_montage(info, montage)
 
@@ -163,6 +162,14 @@ class RawEDF(BaseRaw):
             warn("Stimulus channel will not be annotated. Both 'annot' and "
                  "'annotmap' must be specified.")
 
+        # Parse the EDF+ annotations once, so that reading segments of the
+        # stim channel does not need the TAL channels
+        if len(edf_info['tal_sel']) > 0:
+            edf_info['events'] = _parse_tal(_read_tal(input_fname, edf_info))
+            if edf_info['stim_channel'] is not None:
+                edf_info['tal_stim'] = _tal_stim_index(
+                    edf_info['events'], info['sfreq'], edf_info['nsamples'])
+
         # Raw attributes
         last_samps = [edf_info['nsamples'] - 1]
         super(RawEDF, self).__init__(
@@ -172,7 +179,6 @@ class RawEDF(BaseRaw):
     @verbose
     def _read_segment_file(self, data, idx, fi, start, stop, cals, mult):
         """Read a chunk of raw data."""
-        from scipy.interpolate import interp1d
         if mult is not None:
             # XXX "cals" here does not function the same way as in RawFIF,
             # and for efficiency we want to be able to combine mult and cals
@@ -213,69 +219,45 @@ class RawEDF(BaseRaw):
         offsets[np.in1d(orig_sel, tal_sel)] = 0
         this_sel = orig_sel[idx]
 
-        # We could read this one EDF block at a time, which would be this:
+        # Memory-map the records, shape (n_records, n_samples_per_record) (in
+        # bytes for BDF), and gather the channels with the same number of
+        # samples per record all at once
         ch_offsets = np.cumsum(np.concatenate([[0], n_samps]))
         block_start_idx, r_lims, d_lims = _blk_read_lims(start, stop, buf_len)
-        # But to speed it up, we really need to read multiple blocks at once,
-        # Otherwise we can end up with e.g. 18,181 chunks for a 20 MB file!
+        record_size = ch_offsets[-1] * dtype_byte
+        records = np.memmap(
+            self._filenames[fi], dtype, mode='r',
+            offset=data_offset + block_start_idx * record_size,
+            shape=(len(r_lims), record_size // np.dtype(dtype).itemsize))
+        n_samp_sel = n_samps[this_sel]
+        zero_stim = (annot and annotmap or stim_data is not None or
+                     len(tal_sel) > 0)
         # Let's do ~10 MB chunks:
-        n_per = max(10 * 1024 * 1024 // (ch_offsets[-1] * dtype_byte), 1)
-        with open(self._filenames[fi], 'rb', buffering=0) as fid:
-
-            # Extract data
-            start_offset = (data_offset +
-                            block_start_idx * ch_offsets[-1] * dtype_byte)
-            for ai in range(0, len(r_lims), n_per):
-                block_offset = ai * ch_offsets[-1] * dtype_byte
-                n_read = min(len(r_lims) - ai, n_per)
-                fid.seek(start_offset + block_offset, 0)
-                # Read and reshape to (n_chunks_read, ch0_ch1_ch2_ch3...)
-                many_chunk = _read_ch(fid, subtype, ch_offsets[-1] * n_read,
-                                      dtype_byte, dtype).reshape(n_read, -1)
-                for ii, ci in enumerate(this_sel):
-                    # This now has size (n_chunks_read, n_samp[ci])
-                    ch_data = many_chunk[:, ch_offsets[ci]:ch_offsets[ci + 1]]
-                    r_sidx = r_lims[ai][0]
-                    r_eidx = (buf_len * (n_read - 1) +
-                              r_lims[ai + n_read - 1][1])
-                    d_sidx = d_lims[ai][0]
-                    d_eidx = d_lims[ai + n_read - 1][1]
-                    if n_samps[ci] != buf_len:
-                        if ci in tal_sel:
-                            # don't resample tal_channels, zero-pad instead.
-                            if n_samps[ci] < buf_len:
-                                z = np.zeros((len(ch_data),
-                                              buf_len - n_samps[ci]))
-                                ch_data = np.append(ch_data, z, -1)
-                            else:
-                                ch_data = ch_data[:, :buf_len]
-                        elif ci == stim_channel:
-                            if (annot and annotmap or stim_data is not None or
-                                    len(tal_sel) > 0):
-                                # don't resample, it gets overwritten later
-                                ch_data = np.zeros((len(ch_data), buf_len))
-                            else:
-                                # Stim channel will be interpolated
-                                old = np.linspace(0, 1, n_samps[ci] + 1, True)
-                                new = np.linspace(0, 1, buf_len, False)
-                                ch_data = np.append(
-                                    ch_data, np.zeros((len(ch_data), 1)), -1)
-                                ch_data = interp1d(old, ch_data,
-                                                   kind='zero', axis=-1)(new)
-                        else:
-                            # XXX resampling each chunk isn't great,
-                            # it forces edge artifacts to appear at
-                            # each buffer boundary :(
-                            # it can also be very slow...
-                            ch_data = resample(ch_data, buf_len, n_samps[ci],
-                                               npad=0, axis=-1)
-                    assert ch_data.shape == (len(ch_data), buf_len)
-                    data[ii, d_sidx:d_eidx] = ch_data.ravel()[r_sidx:r_eidx]
+        n_per = max(10 * 1024 * 1024 // record_size, 1)
+        for ai in range(0, len(r_lims), n_per):
+            n_read = min(len(r_lims) - ai, n_per)
+            r_sidx = r_lims[ai][0]
+            r_eidx = buf_len * (n_read - 1) + r_lims[ai + n_read - 1][1]
+            d_sidx = d_lims[ai][0]
+            d_eidx = d_lims[ai + n_read - 1][1]
+            for n_samp in np.unique(n_samp_sel):
+                ii = np.where(n_samp_sel == n_samp)[0]
+                chs = this_sel[ii]
+                # This now has size (n_chs, n_read, n_samp)
+                ch_data = _read_records(records[ai:ai + n_read],
+                                        ch_offsets[chs], n_samp, subtype)
+                if n_samp != buf_len:
+                    ch_data = _adjust_records(
+                        ch_data, buf_len, np.in1d(chs, tal_sel),
+                        chs == stim_channel, zero_stim)
+                assert ch_data.shape == (len(chs), n_read, buf_len)
+                data[ii, d_sidx:d_eidx] = ch_data.reshape(
+                    len(chs), -1)[:, r_sidx:r_eidx]
+        del records
 
         # only try to read the stim channel if it's not None and it's
         # actually one of the requested channels
         idx = np.arange(self.info['nchan'])[idx]  # slice -> ints
-        read_size = len(r_lims) * buf_len
         stim_channel_idx = np.where(idx == stim_channel)[0]
 
         if subtype == 'bdf':
@@ -294,31 +276,8 @@ class RawEDF(BaseRaw):
                                    self._last_samps[fi])
                 data[stim_channel_idx, :] = evts[start:stop + 1]
             elif len(tal_sel) > 0:
-                tal_channel_idx = np.in1d(orig_sel[idx], tal_sel)
-                evts = _parse_tal_channel(np.atleast_2d(data[tal_channel_idx]))
-                self._raw_extras[fi]['events'] = evts
-
-                unique_annots = sorted(set([e[2] for e in evts]))
-                mapping = dict((a, n + 1) for n, a in enumerate(unique_annots))
-
-                stim = np.zeros(read_size)
-                for t_start, t_duration, annotation in evts:
-                    evid = mapping[annotation]
-                    n_start = int(t_start * sfreq)
-                    n_stop = int(t_duration * sfreq) + n_start - 1
-                    # make sure events without duration get one sample
-                    n_stop = n_stop if n_stop > n_start else n_start + 1
-                    if any(stim[n_start:n_stop]):
-                        warn('EDF+ with overlapping events'
-                             ' are not fully supported')
-                    if n_start >= read_size:  # event out of bounds
-                        warn('Event "{}" (event ID {} with onset {}) is out of'
-                             ' bounds, it cannot be added to the stim channel.'
-                             ' Use find_edf_events to get a list of all EDF '
-                             'events as stored in the '
-                             'file.'.format(annotation, evid, n_start))
-                    stim[n_start:n_stop] += evid
-                data[stim_channel_idx, :] = stim[start:stop]
+                data[stim_channel_idx, :] = _tal_stim(
+                    self._raw_extras[fi]['tal_stim'], start, stop)
             elif stim_data is not None:  # GDF events
                 data[stim_channel_idx, :] = stim_data[start:stop]
             else:
@@ -331,32 +290,123 @@ class RawEDF(BaseRaw):
         return self._raw_extras[0]['events']
 
 
-def _read_ch(fid, subtype, samp, dtype_byte, dtype=None):
-    """Read a number of samples for a single channel."""
-    # BDF
-    if subtype == 'bdf':
-        ch_data = np.fromfile(fid, dtype=dtype, count=samp * dtype_byte)
-        ch_data = ch_data.reshape(-1, 3).astype(np.int32)
-        ch_data = ((ch_data[:, 0]) +
-                   (ch_data[:, 1] << 8) +
-                   (ch_data[:, 2] << 16))
-        # 24th bit determines the sign
-        ch_data[ch_data >= (1 << 23)] -= (1 << 24)
+def _read_records(records, offsets, n_samp, subtype):
+    """Gather the samples of some channels from the data records.
 
+    Parameters
+    ----------
+    records : ndarray, shape (n_records, n_values_per_record)
+        The raw records, with values in bytes for BDF.
+    offsets : ndarray, shape (n_chs,)
+        The offsets of the channels in samples within each record.
+    n_samp : int
+        The number of samples of these channels in each record.
+    subtype : str
+        The file subtype.
+
+    Returns
+    -------
+    ch_data : ndarray, shape (n_chs, n_records, n_samp)
+        The channel data.
+    """
+    if (np.diff(offsets) == n_samp).all():
+        cols = slice(offsets[0], offsets[-1] + n_samp)  # contiguous channels
+    else:
+        cols = (offsets[:, np.newaxis] + np.arange(n_samp)).ravel()
+    if subtype == 'bdf':
+        # 24-bit little-endian integers: the 3 bytes are put in the top of
+        # little-endian int32 values, and shifted back to extend the sign
+        ch_bytes = records.reshape(len(records), -1, 3)[:, cols]
+        ch_data = np.zeros(ch_bytes.shape[:2] + (4,), np.uint8)
+        ch_data[..., 1:] = ch_bytes
+        ch_data = ch_data.view('<i4')[..., 0] >> 8
     # GDF data and EDF data
     else:
-        ch_data = np.fromfile(fid, dtype=dtype, count=samp)
+        ch_data = records[:, cols]
+    return ch_data.reshape(len(records), len(offsets), n_samp).transpose(
+        1, 0, 2)
 
-    return ch_data
 
+def _adjust_records(ch_data, buf_len, is_tal, is_stim, zero_stim):
+    """Bring records of channels with a different sampling rate to buf_len.
+
+    Parameters
+    ----------
+    ch_data : ndarray, shape (n_chs, n_records, n_samp)
+        The channel data.
+    buf_len : int
+        The number of samples per record at the raw sampling rate.
+    is_tal : ndarray of bool, shape (n_chs,)
+        Whether the channels are TAL channels, which are zero-padded.
+    is_stim : ndarray of bool, shape (n_chs,)
+        Whether the channels are the stim channel, which is interpolated.
+    zero_stim : bool
+        Whether the stim channel will be overwritten later on.
+
+    Returns
+    -------
+    out : ndarray, shape (n_chs, n_records, buf_len)
+        The adjusted channel data.
+    """
+    from scipy.interpolate import interp1d
+    n_samp = ch_data.shape[-1]
+    out = np.zeros(ch_data.shape[:2] + (buf_len,))
+    # don't resample tal_channels, zero-pad instead.
+    n_keep = min(n_samp, buf_len)
+    out[is_tal, :, :n_keep] = ch_data[is_tal, :, :n_keep]
+    is_stim = is_stim & ~is_tal
+    if is_stim.any() and not zero_stim:  # otherwise it gets overwritten
+        # Stim channel will be interpolated
+        old = np.linspace(0, 1, n_samp + 1, True)
+        new = np.linspace(0, 1, buf_len, False)
+        stim = np.concatenate((ch_data[is_stim], np.zeros(
+            (is_stim.sum(), ch_data.shape[1], 1))), -1)
+        out[is_stim] = interp1d(old, stim, kind='zero', axis=-1)(new)
+    others = ~(is_tal | is_stim)
+    if others.any():
+        # Each record is resampled on its own so that the data do not depend
+        # on the span that is read, at the cost of edge artifacts at each
+        # record boundary. This is resample(x, buf_len, n_samp, npad=0) for
+        # all records at once, which also keeps the integer dtype of x.
+        x_fft = np.fft.rfft(ch_data[others].astype(np.float64), axis=-1)
+        if min(n_samp, buf_len) % 2 == 0:
+            x_fft[..., min(n_samp, buf_len) // 2] *= \
+                2. if buf_len < n_samp else 0.5
+        x_fft *= float(buf_len) / n_samp
+        out[others] = np.fft.irfft(x_fft, buf_len, axis=-1).astype(
+            ch_data.dtype)
+    return out
+
+
+def _read_tal(fname, edf_info):
+    """Read the raw bytes of the TAL channels of an EDF+ or BDF+ file.
+
+    The annotations are stored as text in the data records, so the bytes are
+    gathered directly from the file (channel by channel) without converting
+    them to samples.
+    """
+    n_bytes = edf_info['n_samps'] * edf_info['dtype_byte']
+    ch_offsets = np.cumsum(np.concatenate([[0], n_bytes]))
+    records = np.memmap(fname, np.uint8, mode='r',
+                        offset=edf_info['data_offset'],
+                        shape=(edf_info['n_records'], ch_offsets[-1]))
+    tals = b''.join(records[:, ch_offsets[ch]:ch_offsets[ch + 1]].tobytes()
+                    for ch in edf_info['tal_sel'])
+    del records
+    return tals
 
-def _parse_tal_channel(tal_channel_data):
-    """Parse time-stamped annotation lists (TALs) in stim_channel.
+
+_TAL_REGEX = re.compile(
+    br'([+-]\d+\.?\d*)(\x15(\d+\.?\d*))?(\x14.*?)\x14\x00')
+
+
+def _parse_tal(tals):
+    """Parse time-stamped annotation lists (TALs) from their raw bytes.
 
     Parameters
     ----------
-    tal_channel_data : ndarray, shape = [n_chans, n_samples]
-        channel data in EDF+ TAL format
+    tals : bytes
+        The content of the TAL channels.
 
     Returns
     -------
@@ -367,31 +417,86 @@ def _parse_tal_channel(tal_channel_data):
     ----------
     http://www.edfplus.info/specs/edfplus.html#tal
     """
-    # convert tal_channel to an ascii string
-    tals = bytearray()
-    for chan in tal_channel_data:
-        for s in chan:
-            i = int(s)
-            tals.extend(np.uint8([i % 256, i // 256]))
-
-    regex_tal = '([+-]\\d+\\.?\\d*)(\x15(\\d+\\.?\\d*))?(\x14.*?)\x14\x00'
-    # use of latin-1 because characters are only encoded for the first 256
-    # code points and utf-8 can triggers an "invalid continuation byte" error
-    tal_list = re.findall(regex_tal, tals.decode('latin-1'))
-
     events = []
-    for ev in tal_list:
-        onset = float(ev[0])
-        duration = float(ev[2]) if ev[2] else 0
-        for annotation in ev[3].split('\x14')[1:]:
+    for onset, _, duration, annotations in _TAL_REGEX.findall(tals):
+        onset = float(onset)
+        duration = float(duration) if duration else 0
+        # use of latin-1 because characters are only encoded for the first
+        # 256 code points and utf-8 can triggers an "invalid continuation
+        # byte" error
+        for annotation in annotations.decode('latin-1').split('\x14')[1:]:
             if annotation:
                 events.append([onset, duration, annotation])
-
     return events
 
 
-def _get_info(fname, stim_channel, annot, annotmap, eog, misc, exclude,
-              preload):
+def _parse_tal_channel(tal_channel_data):
+    """Parse time-stamped annotation lists (TALs) in stim_channel.
+
+    Parameters
+    ----------
+    tal_channel_data : ndarray, shape = [n_chans, n_samples]
+        channel data in EDF+ TAL format
+
+    Returns
+    -------
+    events : list
+        List of events. Each event contains [start, duration, annotation].
+    """
+    # convert tal_channel to a byte string (little-endian 16-bit samples)
+    tals = np.concatenate([np.array(list(chan), float).astype(int)
+                           for chan in tal_channel_data])
+    return _parse_tal(tals.astype('<i2').tobytes())
+
+
+def _tal_stim_index(events, sfreq, n_samples):
+    """Compute the samples spanned by the EDF+ events on the stim channel.
+
+    Returns
+    -------
+    tal_stim : tuple of ndarray
+        The first and last (excluded) samples and the ids of the events, the
+        ids being given by the sorted unique annotations.
+    """
+    unique_annots = sorted(set([e[2] for e in events]))
+    mapping = dict((a, n + 1) for n, a in enumerate(unique_annots))
+    starts = np.zeros(len(events), int)
+    stops = np.zeros(len(events), int)
+    ids = np.zeros(len(events), int)
+    for ei, (t_start, t_duration, annotation) in enumerate(events):
+        ids[ei] = evid = mapping[annotation]
+        starts[ei] = n_start = int(t_start * sfreq)
+        n_stop = int(t_duration * sfreq) + n_start - 1
+        # make sure events without duration get one sample
+        stops[ei] = n_stop if n_stop > n_start else n_start + 1
+        if n_start >= n_samples:  # event out of bounds
+            warn('Event "{}" (event ID {} with onset {}) is out of'
+                 ' bounds, it cannot be added to the stim channel.'
+                 ' Use find_edf_events to get a list of all EDF '
+                 'events as stored in the '
+                 'file.'.format(annotation, evid, n_start))
+    starts = np.clip(starts, 0, n_samples)
+    stops = np.clip(stops, 0, n_samples)
+    keep = starts < stops
+    order = np.argsort(starts[keep], kind='mergesort')
+    s_starts, s_stops = starts[keep][order], stops[keep][order]
+    if np.any(s_starts[1:] < np.maximum.accumulate(s_stops)[:-1]):
+        warn('EDF+ with overlapping events are not fully supported')
+    return starts, stops, ids
+
+
+def _tal_stim(tal_stim, start, stop):
+    """Build the stim channel between two samples from the EDF+ events."""
+    starts, stops, ids = tal_stim
+    n_times = stop - start
+    # ids of overlapping events are combined through addition
+    steps = np.zeros(n_times + 1)
+    np.add.at(steps, np.clip(starts - start, 0, n_times), ids)
+    np.add.at(steps, np.clip(stops - start, 0, n_times), -ids)
+    return np.cumsum(steps[:-1])
+
+
+def _get_info(fname, stim_channel, annot, annotmap, eog, misc, exclude):
     """Extract all the information from the EDF+, BDF or GDF file."""
     if eog is None:
         eog = []
@@ -449,11 +554,6 @@ def _get_info(fname, stim_channel, annot, annotmap, eog, misc, exclude,
     tal_sel = edf_info['sel'][tal_chs]
     edf_info['tal_sel'] = tal_sel
 
-    if len(tal_sel) > 0 and stim_channel is not None and not preload:
-        raise RuntimeError('%s' % ('EDF+ Annotations (TAL) channel needs to be'
-                                   ' parsed completely on loading.'
-                                   ' You must set preload parameter to True.'))
-
     # Creates a list of dicts of eeg channels for raw.info
     logger.info('Setting channel info structure...')
     chs = list()
@@ -573,6 +673,12 @@ def _get_info(fname, stim_channel, annot, annotmap, eog, misc, exclude,
     return info, edf_info
 
 
+def _read_fields(fid, nchan, size):
+    """Read the values of a field of the header for all channels."""
+    block = fid.read(nchan * size)
+    return [block[ii:ii + size] for ii in range(0, nchan * size, size)]
+
+
 def _read_edf_header(fname, annot, annotmap, exclude):
     """Read header information from EDF+ or BDF file."""
     edf_info = dict()
@@ -620,13 +726,11 @@ def _read_edf_header(fname, annot, annotmap, exclude):
                  'record length set to 1.')
 
         nchan = int(fid.read(4).decode())
-        channels = list(range(nchan))
-        ch_names = [fid.read(16).strip().decode() for ch in channels]
+        ch_names = [ch.strip().decode() for ch in _read_fields(fid, nchan, 16)]
         exclude = _find_exclude_idx(ch_names, exclude)
         sel = np.setdiff1d(np.arange(len(ch_names)), exclude)
-        for ch in channels:
-            fid.read(80)  # transducer
-        units = [fid.read(8).strip().decode() for ch in channels]
+        fid.read(80 * nchan)  # transducer
+        units = [unit.strip().decode() for unit in _read_fields(fid, nchan, 8)]
         edf_info['units'] = list()
         for i, unit in enumerate(units):
             if i in exclude:
@@ -637,24 +741,23 @@ def _read_edf_header(fname, annot, annotmap, exclude):
                 edf_info['units'].append(1)
         ch_names = [ch_names[idx] for idx in sel]
 
-        physical_min = np.array([float(fid.read(8).decode())
-                                 for ch in channels])[sel]
-        physical_max = np.array([float(fid.read(8).decode())
-                                 for ch in channels])[sel]
-        digital_min = np.array([float(fid.read(8).decode())
-                                for ch in channels])[sel]
-        digital_max = np.array([float(fid.read(8).decode())
-                                for ch in channels])[sel]
-        prefiltering = [fid.read(80).decode().strip(' \x00')
-                        for ch in channels][:-1]
+        physical_min = np.array([float(x) for x in
+                                 _read_fields(fid, nchan, 8)])[sel]
+        physical_max = np.array([float(x) for x in
+                                 _read_fields(fid, nchan, 8)])[sel]
+        digital_min = np.array([float(x) for x in
+                                _read_fields(fid, nchan, 8)])[sel]
+        digital_max = np.array([float(x) for x in
+                                _read_fields(fid, nchan, 8)])[sel]
+        prefiltering = [filt.decode().strip(' \x00')
+                        for filt in _read_fields(fid, nchan, 80)][:-1]
         highpass = np.ravel([re.findall(r'HP:\s+(\w+)', filt)
                              for filt in prefiltering])
         lowpass = np.ravel([re.findall(r'LP:\s+(\w+)', filt)
                             for filt in prefiltering])
 
         # number of samples per record
-        n_samps = np.array([int(fid.read(8).decode()) for ch
-                            in channels])
+        n_samps = np.array([int(x) for x in _read_fields(fid, nchan, 8)])
 
         # Populate edf_info
         edf_info.update(
@@ -1248,3 +1351,25 @@ def read_raw_edf(input_fname, montage=None, eog=None, misc=None,
     return RawEDF(input_fname=input_fname, montage=montage, eog=eog, misc=misc,
                   stim_channel=stim_channel, annot=annot, annotmap=annotmap,
                   exclude=exclude, preload=preload, verbose=verbose)
+
+
+def _scan_edf(fname):
+    """Read the summary of an EDF or BDF file from its header."""
+    edf_info = _read_edf_header(fname, None, None, ())
+    ch_names = edf_info['ch_names']
+    n_samps = edf_info['n_samps']
+    # the TAL channels are not taken into account for the sampling rate
+    is_tal = np.array(ch_names) == 'EDF Annotations'
+    max_samp = n_samps[~is_tal].max() if (~is_tal).any() else n_samps.max()
+    sfreq = (max_samp * edf_info['record_length'][1] /
+             edf_info['record_length'][0])
+    onset, description = np.zeros(0), list()
+    if is_tal.any():
+        edf_info['tal_sel'] = edf_info['sel'][is_tal]
+        events = _parse_tal(_read_tal(fname, edf_info))
+        onset = np.array([event[0] for event in events], float)
+        description = [event[2] for event in events]
+    return dict(sfreq=sfreq, ch_names=ch_names,
+                n_times=int(edf_info['n_records'] * max_samp),
+                meas_date=float(edf_info['meas_date']), onset=onset,
+                description=description)
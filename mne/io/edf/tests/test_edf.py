@@ -22,7 +22,8 @@ from mne.utils import run_tests_if_main, requires_pandas, _TempDir
 from mne.io import read_raw_edf
 from mne.io.tests.test_raw import _test_raw_reader
 from mne.io.pick import channel_type
-from mne.io.edf.edf import _parse_tal_channel, find_edf_events
+from mne.io.edf.edf import (_parse_tal_channel, find_edf_events,
+                            _read_records)
 from mne.event import find_events
 
 FILE = inspect.getfile(inspect.currentframe())
@@ -198,8 +199,11 @@ def test_stim_channel():
     data_py = np.repeat(data_py, repeats=upsample)
     assert_array_equal(data_py, data_eeglab)
 
-    pytest.raises(RuntimeError, read_raw_edf, edf_path, preload=False,
-                  stim_channel=-1)
+    # the annotations do not need to be preloaded
+    raw = read_raw_edf(edf_path, preload=False, stim_channel=-1)
+    raw_preload = read_raw_edf(edf_path, preload=True, stim_channel=-1)
+    assert_array_equal(raw[-1, 100:2000][0], raw_preload[-1, 100:2000][0])
+    assert_equal(raw.find_edf_events(), raw_preload.find_edf_events())
 
     with pytest.warns(RuntimeWarning,
                       match='Interpolating stim .* Events may jitter'):
@@ -230,6 +234,29 @@ def test_parse_annotation():
                   [3.14, 4.2, 'nothing'], [1800.2, 25.5, 'Apnea']])
 
 
+def test_read_records():
+    """Test gathering channels from EDF and BDF records."""
+    rng = np.random.RandomState(0)
+    n_samps = np.array([4, 2, 4, 4])
+    offsets = np.cumsum(np.concatenate([[0], n_samps]))[:-1]
+    values = rng.randint(-2 ** 23, 2 ** 23, (3, n_samps.sum()))
+    for subtype in ('edf', 'bdf'):
+        if subtype == 'bdf':
+            records = values.astype('<i4').view(np.uint8).reshape(3, -1, 4)
+            records = records[..., :3].reshape(3, -1)
+            want = values
+        else:
+            records = values.astype(np.int16)
+            want = records
+        for chs in ([0], [0, 2], [2, 3], [1]):
+            n_samp = n_samps[chs[0]]
+            ch_data = _read_records(records, offsets[chs], n_samp, subtype)
+            assert ch_data.shape == (len(chs), 3, n_samp)
+            for ci, ch in enumerate(chs):
+                assert_array_equal(
+                    ch_data[ci], want[:, offsets[ch]:offsets[ch] + n_samp])
+
+
 def test_edf_annotations():
     """Test if events are detected correctly in a typical MNE workflow."""
     # test an actual file
@@ -258,6 +285,13 @@ def test_edf_annotations():
 
     assert_array_equal(edf_events, events)
 
+    # the annotations are parsed once, segments can be read without preload
+    raw_nopre = read_raw_edf(edf_path, preload=False, stim_channel='auto')
+    assert_equal(raw_nopre.find_edf_events(), raw.find_edf_events())
+    for start, stop in ((0, None), (60, 71), (1000, 1300), (1200, 2600)):
+        assert_array_equal(raw_nopre[-1, start:stop][0],
+                           raw[-1, start:stop][0])
+
 
 def test_edf_stim_channel():
     """Test stim channel for edf file."""
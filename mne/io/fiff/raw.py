@@ -6,7 +6,6 @@
 #
 # License: BSD (3-clause)
 
-import copy
 import os
 import os.path as op
 
@@ -16,7 +15,10 @@ from ..constants import FIFF
 from ..open import fiff_open, _fiff_get_fid, _get_next_fname
 from ..meas_info import read_meas_info
 from ..tree import dir_tree_find
-from ..tag import read_tag, read_tag_info
+from ..write import DATE_NONE
+from ..tag import (read_tag, read_tag_info, _read_compressed_header,
+                   _read_compressed_data_buffer, _read_tags_into,
+                   _sample_dtypes)
 from ..base import (BaseRaw, _RawShell, _check_raw_compatibility,
                     _check_maxshield)
 from ..utils import _mult_cal_one
@@ -28,6 +30,19 @@ from ...event import AcqParserFIF
 from ...utils import check_fname, logger, verbose, warn
 
 
+# The item size and the format of the samples of each type of data buffer
+_buffer_formats = {
+    FIFF.FIFFT_DAU_PACK16: (2, 'short'),
+    FIFF.FIFFT_SHORT: (2, 'short'),
+    FIFF.FIFFT_FLOAT: (4, 'single'),
+    FIFF.FIFFT_DOUBLE: (8, 'double'),
+    FIFF.FIFFT_INT: (4, 'int'),
+    FIFF.FIFFT_COMPLEX_FLOAT: (8, 'single'),
+    FIFF.FIFFT_COMPLEX_DOUBLE: (16, 'double'),
+}
+_READ_BLOCK_SIZE = 2 ** 22  # bytes of samples read from buffers at once
+
+
 class Raw(BaseRaw):
     """Raw data in FIF format.
 
@@ -98,7 +113,7 @@ class Raw(BaseRaw):
 
         _check_raw_compatibility(raws)
         super(Raw, self).__init__(
-            copy.deepcopy(raws[0].info), False,
+            raws[0].info._copy_lazy(), False,
             [r.first_samp for r in raws], [r.last_samp for r in raws],
             [r.filename for r in raws], [r._raw_extras for r in raws],
             raws[0].orig_format, None, buffer_size_sec=buffer_size_sec,
@@ -153,121 +168,30 @@ class Raw(BaseRaw):
         with ff as fid:
             #   Read the measurement info
 
-            info, meas = read_meas_info(fid, tree, clean_bads=True)
+            info, meas = read_meas_info(fid, tree, clean_bads=True,
+                                        lazy=True)
             annotations = _read_annotations(fid, tree)
 
             #   Locate the data of interest
-            raw_node = dir_tree_find(meas, FIFF.FIFFB_RAW_DATA)
-            if len(raw_node) == 0:
-                raw_node = dir_tree_find(meas, FIFF.FIFFB_CONTINUOUS_DATA)
-                if (len(raw_node) == 0):
-                    raw_node = dir_tree_find(meas, FIFF.FIFFB_SMSH_RAW_DATA)
-                    if (len(raw_node) == 0):
-                        raise ValueError('No raw data in %s' % fname)
-                    _check_maxshield(allow_maxshield)
-                    info['maxshield'] = True
-
-            if len(raw_node) == 1:
-                raw_node = raw_node[0]
+            raw_node, maxshield = _find_raw_node(meas)
+            if raw_node is None:
+                raise ValueError('No raw data in %s' % fname)
+            if maxshield:
+                _check_maxshield(allow_maxshield)
+                info['maxshield'] = True
 
             #   Process the directory
-            directory = raw_node['directory']
-            nent = raw_node['nent']
-            nchan = int(info['nchan'])
-            first = 0
-            first_samp = 0
-            first_skip = 0
-
-            #   Get first sample tag if it is there
-            if directory[first].kind == FIFF.FIFF_FIRST_SAMPLE:
-                tag = read_tag(fid, directory[first].pos)
-                first_samp = int(tag.data)
-                first += 1
-                _check_entry(first, nent)
-
-            #   Omit initial skip
-            if directory[first].kind == FIFF.FIFF_DATA_SKIP:
-                # This first skip can be applied only after we know the bufsize
-                tag = read_tag(fid, directory[first].pos)
-                first_skip = int(tag.data)
-                first += 1
-                _check_entry(first, nent)
+            first_samp, last_samp, raw_extras, orig_format = \
+                _read_raw_buffers(fid, raw_node, int(info['nchan']))
 
             raw = _RawShell()
             raw.filename = fname
             raw.first_samp = first_samp
             raw.set_annotations(annotations)
 
-            #   Go through the remaining tags in the directory
-            raw_extras = list()
-            nskip = 0
-            orig_format = None
-
-            for k in range(first, nent):
-                ent = directory[k]
-                # There can be skips in the data (e.g., if the user unclicked)
-                # an re-clicked the button
-                if ent.kind == FIFF.FIFF_DATA_SKIP:
-                    tag = read_tag(fid, ent.pos)
-                    nskip = int(tag.data)
-                elif ent.kind == FIFF.FIFF_DATA_BUFFER:
-                    #   Figure out the number of samples in this buffer
-                    if ent.type == FIFF.FIFFT_DAU_PACK16:
-                        nsamp = ent.size // (2 * nchan)
-                    elif ent.type == FIFF.FIFFT_SHORT:
-                        nsamp = ent.size // (2 * nchan)
-                    elif ent.type == FIFF.FIFFT_FLOAT:
-                        nsamp = ent.size // (4 * nchan)
-                    elif ent.type == FIFF.FIFFT_DOUBLE:
-                        nsamp = ent.size // (8 * nchan)
-                    elif ent.type == FIFF.FIFFT_INT:
-                        nsamp = ent.size // (4 * nchan)
-                    elif ent.type == FIFF.FIFFT_COMPLEX_FLOAT:
-                        nsamp = ent.size // (8 * nchan)
-                    elif ent.type == FIFF.FIFFT_COMPLEX_DOUBLE:
-                        nsamp = ent.size // (16 * nchan)
-                    else:
-                        raise ValueError('Cannot handle data buffers of type '
-                                         '%d' % ent.type)
-                    if orig_format is None:
-                        if ent.type == FIFF.FIFFT_DAU_PACK16:
-                            orig_format = 'short'
-                        elif ent.type == FIFF.FIFFT_SHORT:
-                            orig_format = 'short'
-                        elif ent.type == FIFF.FIFFT_FLOAT:
-                            orig_format = 'single'
-                        elif ent.type == FIFF.FIFFT_DOUBLE:
-                            orig_format = 'double'
-                        elif ent.type == FIFF.FIFFT_INT:
-                            orig_format = 'int'
-                        elif ent.type == FIFF.FIFFT_COMPLEX_FLOAT:
-                            orig_format = 'single'
-                        elif ent.type == FIFF.FIFFT_COMPLEX_DOUBLE:
-                            orig_format = 'double'
-
-                    #  Do we have an initial skip pending?
-                    if first_skip > 0:
-                        first_samp += nsamp * first_skip
-                        raw.first_samp = first_samp
-                        first_skip = 0
-
-                    #  Do we have a skip pending?
-                    if nskip > 0:
-                        raw_extras.append(dict(
-                            ent=None, first=first_samp, nsamp=nskip * nsamp,
-                            last=first_samp + nskip * nsamp - 1))
-                        first_samp += nskip * nsamp
-                        nskip = 0
-
-                    #  Add a data buffer
-                    raw_extras.append(dict(ent=ent, first=first_samp,
-                                           last=first_samp + nsamp - 1,
-                                           nsamp=nsamp))
-                    first_samp += nsamp
-
             next_fname = _get_next_fname(fid, fname, tree)
 
-        raw.last_samp = first_samp - 1
+        raw.last_samp = last_samp
         raw.orig_format = orig_format
 
         #   Add the calibration factors
@@ -306,7 +230,12 @@ class Raw(BaseRaw):
                         fid.seek(this['ent'].pos, 0)
                         tag = read_tag_info(fid)
                         if tag is not None:
-                            if tag.type in (FIFF.FIFFT_COMPLEX_FLOAT,
+                            tag_type = tag.type
+                            if tag.kind == \
+                                    FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER:
+                                tag_type = _read_compressed_header(
+                                    fid, this['ent'].pos)[1][0]
+                            if tag_type in (FIFF.FIFFT_COMPLEX_FLOAT,
                                             FIFF.FIFFT_COMPLEX_DOUBLE):
                                 dtype = np.complex128
                             else:
@@ -324,50 +253,85 @@ class Raw(BaseRaw):
         """Read a segment of data from a file."""
         stop -= 1
         offset = 0
-        with _fiff_get_fid(self._filenames[fi]) as fid:
-            for this in self._raw_extras[fi]:
-                #  Do we need this buffer
-                if this['last'] >= start:
-                    #  The picking logic is a bit complicated
-                    if stop > this['last'] and start < this['first']:
-                        #    We need the whole buffer
-                        first_pick = 0
-                        last_pick = this['nsamp']
-                        logger.debug('W')
-
-                    elif start >= this['first']:
-                        first_pick = start - this['first']
-                        if stop <= this['last']:
-                            #   Something from the middle
-                            last_pick = this['nsamp'] + stop - this['last']
-                            logger.debug('M')
-                        else:
-                            #   From the middle to the end
-                            last_pick = this['nsamp']
-                            logger.debug('E')
+        picks = list()
+        for this in self._raw_extras[fi]:
+            #  Do we need this buffer
+            if this['last'] >= start:
+                #  The picking logic is a bit complicated
+                if stop > this['last'] and start < this['first']:
+                    #    We need the whole buffer
+                    first_pick = 0
+                    last_pick = this['nsamp']
+                    logger.debug('W')
+
+                elif start >= this['first']:
+                    first_pick = start - this['first']
+                    if stop <= this['last']:
+                        #   Something from the middle
+                        last_pick = this['nsamp'] + stop - this['last']
+                        logger.debug('M')
                     else:
-                        #    From the beginning to the middle
-                        first_pick = 0
-                        last_pick = stop - this['first'] + 1
-                        logger.debug('B')
-
-                    #   Now we are ready to pick
-                    picksamp = last_pick - first_pick
-                    if picksamp > 0:
-                        # only read data if it exists
-                        if this['ent'] is not None:
-                            one = read_tag(fid, this['ent'].pos,
-                                           shape=(this['nsamp'],
-                                                  self.info['nchan']),
-                                           rlims=(first_pick, last_pick)).data
-                            one.shape = (picksamp, self.info['nchan'])
-                            _mult_cal_one(data[:, offset:(offset + picksamp)],
-                                          one.T, idx, cals, mult)
-                        offset += picksamp
-
-                #   Done?
-                if this['last'] >= stop:
-                    break
+                        #   From the middle to the end
+                        last_pick = this['nsamp']
+                        logger.debug('E')
+                else:
+                    #    From the beginning to the middle
+                    first_pick = 0
+                    last_pick = stop - this['first'] + 1
+                    logger.debug('B')
+
+                #   Now we are ready to pick
+                picksamp = last_pick - first_pick
+                if picksamp > 0:
+                    # only read data if it exists
+                    if this['ent'] is not None:
+                        picks.append((this['ent'], this['nsamp'], first_pick,
+                                      picksamp, offset))
+                    offset += picksamp
+
+            #   Done?
+            if this['last'] >= stop:
+                break
+
+        # Group the uncompressed buffers of the same type that are adjacent
+        # in the output, to read them at once
+        nchan = self.info['nchan']
+        max_samp = max(_READ_BLOCK_SIZE // (nchan * data.itemsize), 1)
+        blocks = list()
+        for ent, nsamp, first_pick, picksamp, offset in picks:
+            if ent.kind != FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER and blocks:
+                block = blocks[-1]
+                if block['ent'] is None and \
+                        block['dtype'] == _sample_dtypes[ent.type] and \
+                        block['stop'] == offset and \
+                        block['stop'] + picksamp - block['start'] <= max_samp:
+                    block['reads'].append((ent, first_pick, picksamp))
+                    block['stop'] += picksamp
+                    continue
+            blocks.append(dict(start=offset, stop=offset + picksamp))
+            if ent.kind == FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER:
+                blocks[-1].update(ent=ent, nsamp=nsamp,
+                                  rlims=(first_pick, first_pick + picksamp))
+            else:
+                blocks[-1].update(ent=None, dtype=_sample_dtypes[ent.type],
+                                  reads=[(ent, first_pick, picksamp)])
+
+        with _fiff_get_fid(self._filenames[fi]) as fid:
+            for block in blocks:
+                if block['ent'] is not None:
+                    one = _read_compressed_data_buffer(
+                        fid, block['ent'].pos, (block['nsamp'], nchan),
+                        block['rlims'])
+                else:
+                    one = np.empty((block['stop'] - block['start'], nchan),
+                                   data.dtype)
+                    row_size = nchan * np.dtype(block['dtype']).itemsize
+                    reads = [(ent.pos + 16 + first_pick * row_size,
+                              picksamp * nchan)
+                             for ent, first_pick, picksamp in block['reads']]
+                    _read_tags_into(fid, reads, block['dtype'], one)
+                _mult_cal_one(data[:, block['start']:block['stop']], one.T,
+                              idx, cals, mult)
 
     def fix_mag_coil_types(self):
         """Fix Elekta magnetometer coil types.
@@ -414,6 +378,120 @@ class Raw(BaseRaw):
         return self._acqparser
 
 
+def _find_raw_node(meas):
+    """Find the block of the raw data, and whether it is MaxShield data."""
+    raw_node = dir_tree_find(meas, FIFF.FIFFB_RAW_DATA)
+    if len(raw_node) == 0:
+        raw_node = dir_tree_find(meas, FIFF.FIFFB_CONTINUOUS_DATA)
+    maxshield = len(raw_node) == 0
+    if maxshield:
+        raw_node = dir_tree_find(meas, FIFF.FIFFB_SMSH_RAW_DATA)
+    if len(raw_node) == 0:
+        return None, False
+    return raw_node[0], maxshield
+
+
+def _read_raw_buffers(fid, raw_node, nchan):
+    """Find the data buffers of a raw data block and their samples.
+
+    Returns
+    -------
+    first_samp : int
+        The first sample of the data.
+    last_samp : int
+        The last sample of the data.
+    raw_extras : list of dict
+        The directory entry, the first and last samples and the number of
+        samples of each data buffer (``ent`` is None for skips).
+    orig_format : str | None
+        The format of the samples of the first data buffer.
+    """
+    directory = raw_node['directory']
+    nent = raw_node['nent']
+    first = 0
+    first_samp = 0
+    first_skip = 0
+
+    #   Get first sample tag if it is there
+    if directory[first].kind == FIFF.FIFF_FIRST_SAMPLE:
+        tag = read_tag(fid, directory[first].pos)
+        first_samp = int(tag.data)
+        first += 1
+        _check_entry(first, nent)
+
+    #   Omit initial skip
+    if directory[first].kind == FIFF.FIFF_DATA_SKIP:
+        # This first skip can be applied only after we know the bufsize
+        tag = read_tag(fid, directory[first].pos)
+        first_skip = int(tag.data)
+        first += 1
+        _check_entry(first, nent)
+    start_samp = first_samp
+
+    #   Get the types and sizes of the compressed data buffers
+    compressed_index = list()
+    n_compressed = sum(ent.kind == FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER
+                       for ent in directory)
+    if n_compressed > 0:
+        for ent in directory:
+            if ent.kind == FIFF.FIFF_MNE_COMPRESSED_DATA_INDEX:
+                compressed_index = read_tag(fid, ent.pos).data.tolist()
+                break
+        if len(compressed_index) != n_compressed:
+            compressed_index = list()
+
+    #   Go through the remaining tags in the directory
+    raw_extras = list()
+    nskip = 0
+    orig_format = None
+
+    for k in range(first, nent):
+        ent = directory[k]
+        # There can be skips in the data (e.g., if the user unclicked)
+        # an re-clicked the button
+        if ent.kind == FIFF.FIFF_DATA_SKIP:
+            tag = read_tag(fid, ent.pos)
+            nskip = int(tag.data)
+        elif ent.kind in (FIFF.FIFF_DATA_BUFFER,
+                          FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER):
+            if ent.kind == FIFF.FIFF_DATA_BUFFER:
+                buf_type, buf_size = ent.type, ent.size
+            elif len(compressed_index) > 0:
+                buf_type, buf_size = compressed_index.pop(0)
+            else:  # no index, read the header of the buffer
+                buf_type, _, _, buf_size = _read_compressed_header(
+                    fid, ent.pos)[1]
+            #   Figure out the number of samples in this buffer
+            if buf_type not in _buffer_formats:
+                raise ValueError('Cannot handle data buffers of type '
+                                 '%d' % buf_type)
+            item_size, buf_format = _buffer_formats[buf_type]
+            nsamp = buf_size // (item_size * nchan)
+            if orig_format is None:
+                orig_format = buf_format
+
+            #  Do we have an initial skip pending?
+            if first_skip > 0:
+                first_samp += nsamp * first_skip
+                start_samp = first_samp
+                first_skip = 0
+
+            #  Do we have a skip pending?
+            if nskip > 0:
+                raw_extras.append(dict(
+                    ent=None, first=first_samp, nsamp=nskip * nsamp,
+                    last=first_samp + nskip * nsamp - 1))
+                first_samp += nskip * nsamp
+                nskip = 0
+
+            #  Add a data buffer
+            raw_extras.append(dict(ent=ent, first=first_samp,
+                                   last=first_samp + nsamp - 1,
+                                   nsamp=nsamp))
+            first_samp += nsamp
+    return start_samp, first_samp - 1, raw_extras, orig_format
+
+
 def _check_entry(first, nent):
     """Sanity check entries."""
     if first >= nent:
@@ -457,3 +535,61 @@ def read_raw_fif(fname, allow_maxshield=False, preload=False, verbose=None):
     """
     return Raw(fname=fname, allow_maxshield=allow_maxshield,
                preload=preload, verbose=verbose)
+
+
+def _scan_fif(fname):
+    """Read the summary of a raw FIF file without reading the whole info."""
+    ff, tree, _ = fiff_open(fname)
+    with ff as fid:
+        meas = dir_tree_find(tree, FIFF.FIFFB_MEAS)
+        meas_info = dir_tree_find(meas, FIFF.FIFFB_MEAS_INFO)
+        if len(meas) == 0 or len(meas_info) == 0:
+            raise ValueError('Could not find measurement info in %s' % fname)
+        meas = meas[0]
+        nchan = sfreq = meas_date = None
+        ch_pos = list()
+        for ent in meas_info[0]['directory']:
+            if ent.kind == FIFF.FIFF_NCHAN:
+                nchan = int(read_tag(fid, ent.pos).data)
+            elif ent.kind == FIFF.FIFF_SFREQ:
+                sfreq = float(read_tag(fid, ent.pos).data)
+            elif ent.kind == FIFF.FIFF_MEAS_DATE:
+                meas_date = read_tag(fid, ent.pos).data
+            elif ent.kind == FIFF.FIFF_CH_INFO:
+                ch_pos.append(ent.pos)
+        if nchan is None or sfreq is None:
+            raise ValueError('Number of channels or sampling frequency not '
+                             'found in %s' % fname)
+        if meas_date is None:
+            for ent in meas['directory']:
+                if ent.kind == FIFF.FIFF_BLOCK_ID:
+                    tag = read_tag(fid, ent.pos)
+                    meas_date = [tag.data['secs'], tag.data['usecs']]
+        # only read the names from the channel info structures, which start
+        # after a tag header and 80 bytes of other fields
+        names = np.empty((len(ch_pos), 16), np.uint8)
+        _read_tags_into(fid, [(pos + 96, 16) for pos in ch_pos], '>u1',
+                        names)
+        ch_names = [name.split(b'\0')[0].decode()
+                    for name in names.view('S16').ravel()]
+
+        raw_node, _ = _find_raw_node(meas)
+        if raw_node is None:
+            raise ValueError('No raw data in %s' % fname)
+        first_samp, last_samp = _read_raw_buffers(fid, raw_node, nchan)[:2]
+        annotations = _read_annotations(fid, tree)
+
+    if meas_date is None or np.array_equal(meas_date, DATE_NONE):
+        meas_date = None
+    else:
+        meas_date = meas_date[0] + meas_date[1] / 1e6
+    onset, description = np.zeros(0), list()
+    if annotations is not None:
+        onset = annotations.onset
+        if annotations.orig_time is not None:  # synced to the measurement
+            onset = (onset + annotations.orig_time - (meas_date or 0.) -
+                     first_samp / sfreq)
+        description = list(annotations.description)
+    return dict(sfreq=sfreq, ch_names=ch_names,
+                n_times=last_samp - first_samp + 1, meas_date=meas_date,
+                onset=onset, description=description)
@@ -5,14 +5,17 @@
 
 from copy import deepcopy
 from functools import partial
+from gzip import GzipFile
 import itertools as itt
 import os.path as op
+import shutil
 
 import numpy as np
 from numpy.testing import (assert_array_almost_equal, assert_array_equal,
                            assert_allclose, assert_equal)
 import pytest
 
+import mne
 from mne.datasets import testing
 from mne.filter import filter_data
 from mne.io.constants import FIFF
@@ -252,6 +255,128 @@ def test_output_formats():
         assert_equal(raw2.orig_format, fmt)
 
 
+@pytest.mark.parametrize('compression', ('zlib', 'lzma'))
+def test_compressed_buffers(tmpdir, monkeypatch, compression):
+    """Test saving and loading raw data with compressed data buffers."""
+    pytest.importorskip(compression)
+    rng = np.random.RandomState(0)
+    data = np.cumsum(rng.randn(10, 3000), axis=1)
+    raw = RawArray(data, create_info(10, 1000., 'misc'))
+    for fmt in ('short', 'int', 'single', 'double'):
+        fname = str(tmpdir.join('%s_raw.fif' % fmt))
+        raw.save(fname, fmt=fmt, buffer_size_sec=0.4)
+        raw_want = read_raw_fif(fname)
+        compressed_fname = str(tmpdir.join('%s_compressed_raw.fif' % fmt))
+        raw.save(compressed_fname, fmt=fmt, buffer_size_sec=0.4,
+                 compression=compression)
+        assert op.getsize(compressed_fname) < op.getsize(fname)
+        raw_read = read_raw_fif(compressed_fname)
+        assert raw_read.orig_format == fmt
+        # random access to the buffers
+        for start, stop in ((0, None), (10, 20), (399, 1201), (2900, 3000)):
+            assert_array_equal(raw_read[:, start:stop][0],
+                               raw_want[:, start:stop][0])
+        raw_read.load_data()
+        assert_array_equal(raw_read._data, raw_want[:, :][0])
+
+    # complex data
+    fname = str(tmpdir.join('complex_raw.fif'))
+    raw_complex = RawArray(data + 1j * data[::-1], raw.info)
+    with pytest.warns(RuntimeWarning, match='complex data'):
+        raw_complex.save(fname, buffer_size_sec=0.4, compression=compression)
+    raw_read = read_raw_fif(fname, preload=True)
+    assert_allclose(raw_read._data, raw_complex._data, rtol=1e-7)
+
+    # split files and acquisition skips, without the index
+    monkeypatch.setattr(mne.io.base, 'write_int_matrix',
+                        lambda fid, kind, mat: None)
+    raw.set_annotations(Annotations([0.5], [0.5], 'bad_acq_skip'))
+    fname = str(tmpdir.join('split_raw.fif'))
+    raw.save(fname, buffer_size_sec=0.25, split_size=2 ** 20 + 40000,
+             compression=compression)
+    assert op.isfile(str(tmpdir.join('split_raw-1.fif')))
+    raw_read = read_raw_fif(fname)
+    assert len(raw_read._filenames) > 1
+    want = raw.get_data()
+    want[:, 500:1000] = 0.
+    assert_allclose(raw_read[:, :][0], want, rtol=1e-7)
+    pytest.raises(ValueError, raw.save, fname, compression='gzip',
+                  overwrite=True)
+
+
+def test_gzip_seek_points(monkeypatch):
+    """Test random access to gzipped files using seek points."""
+    from mne.io.utils import _GzipIndexFile
+    monkeypatch.setattr('mne.io.utils._GZIP_INDEX_SPACING', 2 ** 14)
+    monkeypatch.setattr('mne.io.utils._GZIP_SCAN_SPACING', 2 ** 15)
+    monkeypatch.setattr('mne.io.utils._GZIP_CHUNK_SIZE', 2 ** 10)
+    tempdir = _TempDir()
+    rng = np.random.RandomState(0)
+    raw = RawArray(rng.randn(10, 10000), create_info(10, 1000., 'eeg'))
+    fname = op.join(tempdir, 'test_raw.fif')
+    raw.save(fname)
+    with open(fname, 'rb') as fid:
+        want = fid.read()
+
+    def _check_reads(fname_gz, use_index):
+        with _GzipIndexFile(fname_gz) as fid:
+            assert fid._raw is use_index
+            assert len(fid._points) > 1
+            for start in rng.randint(0, len(want), 20):
+                fid.seek(start)
+                n_read = rng.randint(0, 100000)
+                assert fid.read(n_read) == want[start:start + n_read]
+            fid.seek(-10, 2)
+            assert fid.read() == want[-10:]
+            fid.seek(0)
+            assert fid.read() == want
+        raw_read = read_raw_fif(fname_gz)
+        for start in (9000, 2000, 6000, 0):
+            assert_allclose(raw_read[:, start:start + 1000][0],
+                            raw[:, start:start + 1000][0])
+
+    # files written by us have flush points and an index
+    fname_gz = fname + '.gz'
+    raw.save(fname_gz)
+    assert op.isfile(fname_gz + '.idx')
+    _check_reads(fname_gz, True)
+    # other files (here with two members) are scanned
+    fname_other = op.join(tempdir, 'other_raw.fif.gz')
+    with open(fname_other, 'wb') as fid:
+        for data in (want[:100000], want[100000:]):
+            with GzipFile(fileobj=fid, mode='wb') as fid_gz:
+                fid_gz.write(data)
+    _check_reads(fname_other, False)
+    # an index that does not match the file is ignored
+    shutil.copyfile(fname_gz + '.idx', fname_other + '.idx')
+    _check_reads(fname_other, False)
+    # small files do not need an index
+    raw.copy().crop(0, 0.1).save(fname_gz, overwrite=True)
+    assert not op.isfile(fname_gz + '.idx')
+
+
+@pytest.mark.parametrize('fmt', ('short', 'int', 'single', 'double'))
+def test_read_buffers_in_blocks(monkeypatch, fmt):
+    """Test reading several data buffers at once."""
+    tempdir = _TempDir()
+    rng = np.random.RandomState(0)
+    raw = RawArray(rng.randn(7, 3000) * 1000, create_info(7, 1000., 'eeg'))
+    raw.set_annotations(Annotations([1.], [0.5], 'bad_acq_skip'))
+    fname = op.join(tempdir, 'test_raw.fif')
+    raw.save(fname, fmt=fmt, buffer_size_sec=0.1)
+    want = read_raw_fif(fname, preload=True).get_data()
+    # split the blocks of buffers and the reads of the runs of buffers
+    for block_size, chunk_size in ((2 ** 22, 2 ** 24), (1000, 100)):
+        monkeypatch.setattr('mne.io.fiff.raw._READ_BLOCK_SIZE', block_size)
+        monkeypatch.setattr('mne.io.tag._READ_CHUNK_SIZE', chunk_size)
+        raw_read = read_raw_fif(fname)
+        for start, stop in ((0, 3000), (150, 1250), (1490, 1510), (7, 8)):
+            assert_array_equal(raw_read.get_data(start=start, stop=stop),
+                               want[:, start:stop])
+        assert_array_equal(raw_read.get_data([5, 2], 10, 2000),
+                           want[[5, 2], 10:2000])
+
+
 def _compare_combo(raw, new, times, n_times):
     """Compare data."""
     for ti in times:  # let's do a subset of points for speed
@@ -5,18 +5,20 @@
 #
 # License: BSD (3-clause)
 
-from collections import Counter
+from collections import Counter, OrderedDict
 from copy import deepcopy
 import datetime
+import os
 import os.path as op
 import re
+from weakref import WeakValueDictionary
 
 import numpy as np
 from scipy import linalg
 
 from .pick import channel_type
 from .constants import FIFF
-from .open import fiff_open
+from .open import fiff_open, _fiff_get_fid
 from .tree import dir_tree_find
 from .tag import read_tag, find_tag
 from .proj import _read_proj, _write_proj, _uniquify_projs, _normalize_proj
@@ -68,6 +70,18 @@ def _stamp_to_dt(stamp):
             datetime.timedelta(0, 0, stamp[1]))  # day, sec, μs
 
 
+def _read_lazy_first(name):
+    """Wrap a dict method to read the lazy entries of an Info first."""
+    method = getattr(dict, name)
+
+    def _method(self, *args, **kwargs):
+        self._load_lazy()
+        return method(self, *args, **kwargs)
+    _method.__name__ = name
+    _method.__doc__ = method.__doc__
+    return _method
+
+
 # XXX Eventually this should be de-duplicated with the MNE-MATLAB stuff...
 class Info(dict):
     """Measurement information.
@@ -375,7 +389,114 @@ class Info(dict):
         info : instance of Info
             The copied info.
         """
-        return Info(deepcopy(self))
+        return deepcopy(self)
+
+    # Some entries of an info read from a file can be read when they are
+    # first accessed (see read_meas_info). Until then, they are missing from
+    # the dict and self._lazy gives the reader of each of them. Accessing one
+    # such entry reads it, and the other methods (including copies) read all
+    # of them first.
+
+    def _set_lazy(self, reader):
+        """Read the lazy entries from a reader when they are accessed."""
+        self._lazy = dict((key, reader) for key in _lazy_info_keys)
+        _lazy_infos[id(self)] = self
+
+    def _load_lazy(self, keys=None):
+        """Read the lazy entries that have not been read yet."""
+        lazy = self.__dict__.get('_lazy')
+        if not lazy:
+            return
+        keys = [key for key in (lazy if keys is None else keys)
+                if key in lazy]
+        for reader in set(lazy[key] for key in keys):
+            these = [key for key in keys if lazy[key] is reader]
+            for key, value in zip(these, reader.read(these)):
+                dict.__setitem__(self, key, value)
+                del lazy[key]
+        if not lazy:
+            _lazy_infos.pop(id(self), None)
+
+    def __missing__(self, key):  # noqa: D105
+        if key in self.__dict__.get('_lazy', ()):
+            self._load_lazy([key])
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):  # noqa: D105
+        return (dict.__contains__(self, key) or
+                key in self.__dict__.get('_lazy', ()))
+
+    def __setitem__(self, key, value):  # noqa: D105
+        self.__dict__.get('_lazy', {}).pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):  # noqa: D105
+        if self.__dict__.get('_lazy', {}).pop(key, None) is None:
+            dict.__delitem__(self, key)
+
+    def __eq__(self, other):  # noqa: D105
+        self._load_lazy()
+        if isinstance(other, Info):
+            other._load_lazy()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):  # noqa: D105
+        return not self == other
+
+    __hash__ = None
+
+    def __deepcopy__(self, memodict):  # noqa: D105
+        # the copies are handed to other objects (e.g., epochs or evoked
+        # data), so that they must not depend on the file
+        self._load_lazy()
+        return self._copy_lazy(memodict)
+
+    def _copy_lazy(self, memodict=None):
+        """Copy the instance, without reading the lazy entries."""
+        memodict = dict() if memodict is None else memodict
+        result = type(self).__new__(type(self))
+        memodict[id(self)] = result
+        for key, value in dict.items(self):
+            dict.__setitem__(result, key, deepcopy(value, memodict))
+        for key, value in self.__dict__.items():
+            setattr(result, key, deepcopy(value, memodict)
+                    if key != '_lazy' else dict(value))
+        if self.__dict__.get('_lazy'):
+            _lazy_infos[id(result)] = result
+        return result
+
+    def __getstate__(self):  # noqa: D105
+        self._load_lazy()
+        return dict((key, value) for key, value in self.__dict__.items()
+                    if key != '_lazy')
+
+    def get(self, key, default=None):  # noqa: D102
+        return self[key] if key in self else default
+
+    def pop(self, key, *args):  # noqa: D102
+        self._load_lazy([key])
+        return dict.pop(self, key, *args)
+
+    def setdefault(self, key, default=None):  # noqa: D102
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):  # noqa: D102
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):  # noqa: D102
+        self.__dict__.get('_lazy', {}).clear()
+        dict.clear(self)
+
+    __iter__ = _read_lazy_first('__iter__')
+    __len__ = _read_lazy_first('__len__')
+    keys = _read_lazy_first('keys')
+    values = _read_lazy_first('values')
+    items = _read_lazy_first('items')
+    popitem = _read_lazy_first('popitem')
 
     def normalize_proj(self):
         """(Re-)Normalize projection vectors after subselection.
@@ -636,6 +757,159 @@ def _read_dig_fif(fid, meas_info):
     return dig
 
 
+def _read_events_fif(fid, meas_info):
+    """Read the events lists from a FIFF file."""
+    events = dir_tree_find(meas_info, FIFF.FIFFB_EVENTS)
+    evs = list()
+    for event in events:
+        ev = dict()
+        for k in range(event['nent']):
+            kind = event['directory'][k].kind
+            pos = event['directory'][k].pos
+            if kind == FIFF.FIFF_EVENT_CHANNELS:
+                ev['channels'] = read_tag(fid, pos).data
+            elif kind == FIFF.FIFF_EVENT_LIST:
+                ev['list'] = read_tag(fid, pos).data
+        evs.append(ev)
+    return evs
+
+
+def _read_hpi_results_fif(fid, meas_info):
+    """Read the HPI results from a FIFF file."""
+    hpi_results = dir_tree_find(meas_info, FIFF.FIFFB_HPI_RESULT)
+    hrs = list()
+    for hpi_result in hpi_results:
+        hr = dict()
+        hr['dig_points'] = []
+        for k in range(hpi_result['nent']):
+            kind = hpi_result['directory'][k].kind
+            pos = hpi_result['directory'][k].pos
+            if kind == FIFF.FIFF_DIG_POINT:
+                hr['dig_points'].append(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_HPI_DIGITIZATION_ORDER:
+                hr['order'] = read_tag(fid, pos).data
+            elif kind == FIFF.FIFF_HPI_COILS_USED:
+                hr['used'] = read_tag(fid, pos).data
+            elif kind == FIFF.FIFF_HPI_COIL_MOMENTS:
+                hr['moments'] = read_tag(fid, pos).data
+            elif kind == FIFF.FIFF_HPI_FIT_GOODNESS:
+                hr['goodness'] = read_tag(fid, pos).data
+            elif kind == FIFF.FIFF_HPI_FIT_GOOD_LIMIT:
+                hr['good_limit'] = float(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_HPI_FIT_DIST_LIMIT:
+                hr['dist_limit'] = float(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_HPI_FIT_ACCEPT:
+                hr['accept'] = int(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_COORD_TRANS:
+                hr['coord_trans'] = read_tag(fid, pos).data
+        hrs.append(hr)
+    return hrs
+
+
+def _read_hpi_meas_fif(fid, meas_info):
+    """Read the HPI measurements from a FIFF file."""
+    hpi_meass = dir_tree_find(meas_info, FIFF.FIFFB_HPI_MEAS)
+    hms = list()
+    for hpi_meas in hpi_meass:
+        hm = dict()
+        for k in range(hpi_meas['nent']):
+            kind = hpi_meas['directory'][k].kind
+            pos = hpi_meas['directory'][k].pos
+            if kind == FIFF.FIFF_CREATOR:
+                hm['creator'] = text_type(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_SFREQ:
+                hm['sfreq'] = float(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_NCHAN:
+                hm['nchan'] = int(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_NAVE:
+                hm['nave'] = int(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_HPI_NCOIL:
+                hm['ncoil'] = int(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_FIRST_SAMPLE:
+                hm['first_samp'] = int(read_tag(fid, pos).data)
+            elif kind == FIFF.FIFF_LAST_SAMPLE:
+                hm['last_samp'] = int(read_tag(fid, pos).data)
+        hpi_coils = dir_tree_find(hpi_meas, FIFF.FIFFB_HPI_COIL)
+        hcs = []
+        for hpi_coil in hpi_coils:
+            hc = dict()
+            for k in range(hpi_coil['nent']):
+                kind = hpi_coil['directory'][k].kind
+                pos = hpi_coil['directory'][k].pos
+                if kind == FIFF.FIFF_HPI_COIL_NO:
+                    hc['number'] = int(read_tag(fid, pos).data)
+                elif kind == FIFF.FIFF_EPOCH:
+                    hc['epoch'] = read_tag(fid, pos).data
+                elif kind == FIFF.FIFF_HPI_SLOPES:
+                    hc['slopes'] = read_tag(fid, pos).data
+                elif kind == FIFF.FIFF_HPI_CORR_COEFF:
+                    hc['corr_coeff'] = read_tag(fid, pos).data
+                elif kind == FIFF.FIFF_HPI_COIL_FREQ:
+                    hc['coil_freq'] = read_tag(fid, pos).data
+            hcs.append(hc)
+        hm['hpi_coils'] = hcs
+        hms.append(hm)
+    return hms
+
+
+# The entries of the measurement info that can be read when first accessed
+_lazy_info_keys = ('dig', 'projs', 'events', 'hpi_results', 'hpi_meas',
+                   'proc_history')
+# the infos with entries that have not been read, by id
+_lazy_infos = WeakValueDictionary()
+
+
+def _read_lazy_info(fid, key, meas_info, tree):
+    """Read one of the entries of the measurement info."""
+    if key == 'proc_history':
+        return _read_proc_history(fid, tree)
+    return dict(dig=_read_dig_fif, projs=_read_proj, events=_read_events_fif,
+                hpi_results=_read_hpi_results_fif,
+                hpi_meas=_read_hpi_meas_fif)[key](fid, meas_info)
+
+
+def _file_stamp(fname):
+    """Get the size and the modification time of a file."""
+    stat = os.stat(fname)
+    return stat.st_size, stat.st_mtime
+
+
+class _LazyInfoReader(object):
+    """Read entries of the measurement info from a file when needed."""
+
+    def __init__(self, fname, meas_info, tree):
+        self.fname = op.realpath(fname)
+        self.stamp = _file_stamp(self.fname)
+        self.meas_info = meas_info
+        self.tree = tree
+
+    def read(self, keys):
+        """Read some entries from the file."""
+        if not op.isfile(self.fname) or \
+                _file_stamp(self.fname) != self.stamp:
+            raise RuntimeError('Cannot read %s from %s, the file has changed '
+                               'since the measurement info was read'
+                               % (', '.join(keys), self.fname))
+        with _fiff_get_fid(self.fname) as fid:
+            return [_read_lazy_info(fid, key, self.meas_info, self.tree)
+                    for key in keys]
+
+
+# the infos read by read_info, by file name and stamp, most recent last
+_info_cache = OrderedDict()
+_INFO_CACHE_SIZE = 64
+
+
+def _load_lazy_infos(fname):
+    """Read the lazy entries of the infos of a file that will be written."""
+    fname = op.realpath(fname)
+    for key in [key for key in _info_cache if key[0] == fname]:
+        del _info_cache[key]
+    for info in list(_lazy_infos.values()):
+        if any(reader.fname == fname for reader in info._lazy.values()):
+            info._load_lazy()
+
+
 def _read_dig_points(fname, comments='%', unit='auto'):
     """Read digitizer data from a text file.
 
@@ -828,11 +1102,27 @@ def read_info(fname, verbose=None):
     -------
     info : instance of Info
        Measurement information for the dataset.
+
+    Notes
+    -----
+    The parsed info of the most recently read files is kept in memory, so
+    that reading the info of an unchanged file again returns a copy of it.
+    The returned info is complete and does not depend on the file anymore.
     """
-    f, tree, _ = fiff_open(fname)
-    with f as fid:
-        info = read_meas_info(fid, tree)[0]
-    return info
+    if not isinstance(fname, string_types):
+        f, tree, _ = fiff_open(fname)
+        with f as fid:
+            return read_meas_info(fid, tree)[0]
+    key = (op.realpath(fname),) + _file_stamp(fname)
+    info = _info_cache.pop(key, None)
+    if info is None:
+        f, tree, _ = fiff_open(fname)
+        with f as fid:
+            info = read_meas_info(fid, tree, lazy=True)[0]
+    _info_cache[key] = info
+    while len(_info_cache) > _INFO_CACHE_SIZE:
+        _info_cache.popitem(last=False)
+    return info.copy()
 
 
 def read_bad_channels(fid, node):
@@ -863,7 +1153,7 @@ def read_bad_channels(fid, node):
 
 
 @verbose
-def read_meas_info(fid, tree, clean_bads=False, verbose=None):
+def read_meas_info(fid, tree, clean_bads=False, lazy=False, verbose=None):
     """Read the measurement info.
 
     Parameters
@@ -876,6 +1166,13 @@ def read_meas_info(fid, tree, clean_bads=False, verbose=None):
         If True, clean info['bads'] before running consistency check.
         Should only be needed for old files where we did not check bads
         before saving.
+    lazy : bool
+        If True and ``fid`` is a file on disk, the digitization points, the
+        projectors, the events, the HPI results and measurements and the
+        processing history are only read from the file when they are first
+        accessed.
+
+        .. versionadded:: 0.17
     verbose : bool, str, int, or None
         If not None, override default verbose level (see :func:`mne.verbose`
         and :ref:`Logging documentation <tut_logging>` for more).
@@ -1021,9 +1318,6 @@ def read_meas_info(fid, tree, clean_bads=False, verbose=None):
                           ctf_head_t is None):
                         ctf_head_t = cand
 
-    #   Locate the Polhemus data
-    dig = _read_dig_fif(fid, meas_info)
-
     #   Locate the acquisition information
     acqpars = dir_tree_find(meas_info, FIFF.FIFFB_DACQ_PARS)
     acq_pars = None
@@ -1040,9 +1334,6 @@ def read_meas_info(fid, tree, clean_bads=False, verbose=None):
                 tag = read_tag(fid, pos)
                 acq_stim = tag.data
 
-    #   Load the SSP data
-    projs = _read_proj(fid, meas_info)
-
     #   Load the CTF compensation data
     comps = read_ctf_comp(fid, meas_info, chs)
 
@@ -1057,94 +1348,14 @@ def read_meas_info(fid, tree, clean_bads=False, verbose=None):
     else:
         info = Info(file_id=None)
 
-    #   Locate events list
-    events = dir_tree_find(meas_info, FIFF.FIFFB_EVENTS)
-    evs = list()
-    for event in events:
-        ev = dict()
-        for k in range(event['nent']):
-            kind = event['directory'][k].kind
-            pos = event['directory'][k].pos
-            if kind == FIFF.FIFF_EVENT_CHANNELS:
-                ev['channels'] = read_tag(fid, pos).data
-            elif kind == FIFF.FIFF_EVENT_LIST:
-                ev['list'] = read_tag(fid, pos).data
-        evs.append(ev)
-    info['events'] = evs
-
-    #   Locate HPI result
-    hpi_results = dir_tree_find(meas_info, FIFF.FIFFB_HPI_RESULT)
-    hrs = list()
-    for hpi_result in hpi_results:
-        hr = dict()
-        hr['dig_points'] = []
-        for k in range(hpi_result['nent']):
-            kind = hpi_result['directory'][k].kind
-            pos = hpi_result['directory'][k].pos
-            if kind == FIFF.FIFF_DIG_POINT:
-                hr['dig_points'].append(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_HPI_DIGITIZATION_ORDER:
-                hr['order'] = read_tag(fid, pos).data
-            elif kind == FIFF.FIFF_HPI_COILS_USED:
-                hr['used'] = read_tag(fid, pos).data
-            elif kind == FIFF.FIFF_HPI_COIL_MOMENTS:
-                hr['moments'] = read_tag(fid, pos).data
-            elif kind == FIFF.FIFF_HPI_FIT_GOODNESS:
-                hr['goodness'] = read_tag(fid, pos).data
-            elif kind == FIFF.FIFF_HPI_FIT_GOOD_LIMIT:
-                hr['good_limit'] = float(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_HPI_FIT_DIST_LIMIT:
-                hr['dist_limit'] = float(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_HPI_FIT_ACCEPT:
-                hr['accept'] = int(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_COORD_TRANS:
-                hr['coord_trans'] = read_tag(fid, pos).data
-        hrs.append(hr)
-    info['hpi_results'] = hrs
-
-    #   Locate HPI Measurement
-    hpi_meass = dir_tree_find(meas_info, FIFF.FIFFB_HPI_MEAS)
-    hms = list()
-    for hpi_meas in hpi_meass:
-        hm = dict()
-        for k in range(hpi_meas['nent']):
-            kind = hpi_meas['directory'][k].kind
-            pos = hpi_meas['directory'][k].pos
-            if kind == FIFF.FIFF_CREATOR:
-                hm['creator'] = text_type(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_SFREQ:
-                hm['sfreq'] = float(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_NCHAN:
-                hm['nchan'] = int(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_NAVE:
-                hm['nave'] = int(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_HPI_NCOIL:
-                hm['ncoil'] = int(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_FIRST_SAMPLE:
-                hm['first_samp'] = int(read_tag(fid, pos).data)
-            elif kind == FIFF.FIFF_LAST_SAMPLE:
-                hm['last_samp'] = int(read_tag(fid, pos).data)
-        hpi_coils = dir_tree_find(hpi_meas, FIFF.FIFFB_HPI_COIL)
-        hcs = []
-        for hpi_coil in hpi_coils:
-            hc = dict()
-            for k in range(hpi_coil['nent']):
-                kind = hpi_coil['directory'][k].kind
-                pos = hpi_coil['directory'][k].pos
-                if kind == FIFF.FIFF_HPI_COIL_NO:
-                    hc['number'] = int(read_tag(fid, pos).data)
-                elif kind == FIFF.FIFF_EPOCH:
-                    hc['epoch'] = read_tag(fid, pos).data
-                elif kind == FIFF.FIFF_HPI_SLOPES:
-                    hc['slopes'] = read_tag(fid, pos).data
-                elif kind == FIFF.FIFF_HPI_CORR_COEFF:
-                    hc['corr_coeff'] = read_tag(fid, pos).data
-                elif kind == FIFF.FIFF_HPI_COIL_FREQ:
-                    hc['coil_freq'] = read_tag(fid, pos).data
-            hcs.append(hc)
-        hm['hpi_coils'] = hcs
-        hms.append(hm)
-    info['hpi_meas'] = hms
+    #   Read the Polhemus data, the SSP data, the events, the HPI results and
+    #   measurements and the processing history, now or when first accessed
+    fname = getattr(fid, 'name', None) if lazy else None
+    if isinstance(fname, string_types) and op.isfile(fname):
+        info._set_lazy(_LazyInfoReader(fname, meas_info, tree))
+    else:
+        for key in _lazy_info_keys:
+            info[key] = _read_lazy_info(fid, key, meas_info, tree)
 
     subject_info = dir_tree_find(meas_info, FIFF.FIFFB_SUBJECT)
     si = None
@@ -1214,9 +1425,6 @@ def read_meas_info(fid, tree, clean_bads=False, verbose=None):
             hs['hpi_coils'] = hc
     info['hpi_subsystem'] = hs
 
-    #   Read processing history
-    info['proc_history'] = _read_proc_history(fid, tree)
-
     #  Make the most appropriate selection for the measurement id
     if meas_info['parent_id'] is None:
         if meas_info['id'] is None:
@@ -1264,12 +1472,10 @@ def read_meas_info(fid, tree, clean_bads=False, verbose=None):
         info['dev_ctf_t'] = Transform('meg', 'ctf_head', dev_ctf_trans)
 
     #   All kinds of auxliary stuff
-    info['dig'] = dig
     info['bads'] = bads
     info._update_redundant()
     if clean_bads:
         info['bads'] = [b for b in bads if b in info['ch_names']]
-    info['projs'] = projs
     info['comps'] = comps
     info['acq_pars'] = acq_pars
     info['acq_stim'] = acq_stim
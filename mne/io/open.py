@@ -6,13 +6,13 @@
 
 import os.path as op
 from io import BytesIO
-from gzip import GzipFile
 
 import numpy as np
 
 from .tag import read_tag_info, read_tag, read_big, Tag, _call_dict_names
 from .tree import make_dir_tree, dir_tree_find
 from .constants import FIFF
+from .utils import _GzipIndexFile
 from ..utils import logger, verbose
 from ..externals.six import string_types, iteritems, text_type
 
@@ -22,7 +22,7 @@ def _fiff_get_fid(fname):
     if isinstance(fname, string_types):
         if op.splitext(fname)[1].lower() == '.gz':
             logger.debug('Using gzip')
-            fid = GzipFile(fname, "rb")  # Open in binary mode
+            fid = _GzipIndexFile(fname)
         else:
             logger.debug('Using normal I/O')
             fid = open(fname, "rb")  # Open in binary mode
@@ -100,6 +100,15 @@ def fiff_open(fname, preload=False, verbose=None):
         A list of tags.
     """
     fid = _fiff_get_fid(fname)
+    try:
+        return _fiff_open(fname, fid, preload)
+    except Exception:
+        fid.close()
+        raise
+
+
+def _fiff_open(fname, fid, preload):
+    """Read the directory and the tree of an open FIF file."""
     # do preloading of entire file
     if preload:
         # note that StringIO objects instantiated this way are read-only,
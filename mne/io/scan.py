@@ -0,0 +1,182 @@
+"""Read the summary of many raw files from their headers."""
+
+# License: BSD (3-clause)
+
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+import os
+import os.path as op
+import re
+
+import numpy as np
+
+from .brainvision.brainvision import _scan_brainvision
+from .edf.edf import _scan_edf
+from .fiff.raw import _scan_fif
+from ..externals.six import string_types
+from ..parallel import check_n_jobs
+from ..utils import logger, verbose, warn
+
+
+# The reader of the summary of each format, by file extension
+_scan_formats = OrderedDict([
+    ('.fif', ('fif', _scan_fif)),
+    ('.fif.gz', ('fif', _scan_fif)),
+    ('.edf', ('edf', _scan_edf)),
+    ('.bdf', ('bdf', _scan_edf)),
+    ('.vhdr', ('brainvision', _scan_brainvision)),
+])
+
+
+def _get_scan_format(fname):
+    """Get the format and the reader of the summary of a file."""
+    for ext, value in _scan_formats.items():
+        if fname.lower().endswith(ext):
+            return value
+    return None, None
+
+
+# The names of the raw FIF files (see read_raw_fif), possibly split
+_raw_fif_re = re.compile(r'(raw|raw_sss|raw_tsss)(-[0-9]+)?\.fif(\.gz)?$')
+
+
+def _is_scan_file(fname):
+    """Check if a file found in a directory is a raw file to summarize."""
+    kind = _get_scan_format(fname)[0]
+    if kind == 'fif':  # not the epochs, covariance, forward etc. files
+        return _raw_fif_re.search(fname.lower()) is not None
+    return kind is not None
+
+
+def _scan_file(fname):
+    """Read the summary of a file, and the error raised if it failed."""
+    try:
+        return _get_scan_format(fname)[1](fname), None
+    except Exception as exp:
+        scan = dict(sfreq=np.nan, ch_names=[], n_times=0, meas_date=None,
+                    onset=[], description=[])
+        return scan, '%s: %s' % (type(exp).__name__, exp)
+
+
+def _find_scan_files(paths):
+    """Find the files of a list of files and directories."""
+    if isinstance(paths, string_types):
+        paths = [paths]
+    fnames = list()
+    for path in paths:
+        if not op.isdir(path):
+            if _get_scan_format(path)[0] is None:
+                raise ValueError('Cannot read the header of %s, the supported '
+                                 'extensions are %s'
+                                 % (path, ', '.join(_scan_formats)))
+            fnames.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            fnames.extend(op.join(root, fname) for fname in sorted(files)
+                          if _is_scan_file(fname))
+    return fnames
+
+
+@verbose
+def scan_headers(paths, n_jobs=1, verbose=None):
+    """Read the summary of raw files from their headers.
+
+    Only the headers are read, without building the measurement info, the
+    annotations or the other structures needed to read the data, so that a
+    whole dataset can be summarized quickly.
+
+    Parameters
+    ----------
+    paths : str | list of str
+        The raw files to read (FIF, EDF, BDF or BrainVision ``.vhdr``), and
+        the directories to search recursively for such files. In the
+        directories, only the FIF files named like raw files (ending with
+        ``raw.fif``, ``raw_sss.fif`` or ``raw_tsss.fif``, possibly followed by
+        the index of a split file or gzipped) are read.
+    n_jobs : int
+        The number of files read at once by a pool of threads.
+    verbose : bool, str, int, or None
+        If not None, override default verbose level (see :func:`mne.verbose`
+        and :ref:`Logging documentation <tut_logging>` for more).
+
+    Returns
+    -------
+    summary : OrderedDict
+        The columns of the summary, with one value per file:
+
+        - ``fname``: the file name
+        - ``format``: ``'fif'``, ``'edf'``, ``'bdf'`` or ``'brainvision'``
+        - ``error``: the error raised when reading the header, None if it
+          was read
+        - ``sfreq``: the sampling frequency (array)
+        - ``n_channels``: the number of channels (array)
+        - ``n_times``: the number of samples (array)
+        - ``duration``: the duration in seconds (array)
+        - ``meas_date``: the measurement date in seconds since the epoch,
+          NaN if it is unknown (array)
+        - ``ch_names``: the list of channel names. The files with the same
+          channels share the same list.
+        - ``n_events``: the number of events (array)
+        - ``event_onsets``: the onsets of the events in seconds from the
+          first sample (array)
+        - ``event_descriptions``: the list of descriptions of the events
+
+        It can be passed to :class:`pandas.DataFrame`. The files whose
+        header cannot be read are included with a warning, with NaN
+        sampling frequency, duration and measurement date, and without
+        samples, channels or events.
+
+    Notes
+    -----
+    The channels and the events are those stored in the files: the events
+    are the annotations of FIF files, the time-stamped annotations of EDF
+    and BDF files and the markers of BrainVision files. The stimulus
+    channels that the readers can synthesize from them are not included, and
+    the files of a FIF recording split in several files are summarized
+    separately.
+
+    .. versionadded:: 0.17
+    """
+    fnames = _find_scan_files(paths)
+    n_jobs = min(check_n_jobs(n_jobs), max(len(fnames), 1))
+    logger.info('Reading the headers of %d files' % len(fnames))
+
+    if n_jobs > 1:
+        pool = ThreadPool(n_jobs)
+        try:
+            scans = pool.map(_scan_file, fnames)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        scans = [_scan_file(fname) for fname in fnames]
+    scans, errors = [scan for scan, _ in scans], [err for _, err in scans]
+    for fname, err in zip(fnames, errors):
+        if err is not None:
+            warn('Could not read the header of %s (%s)' % (fname, err))
+
+    ch_names = dict()
+    for scan in scans:  # share the lists of the same channels
+        scan['ch_names'] = ch_names.setdefault(tuple(scan['ch_names']),
+                                               scan['ch_names'])
+    summary = OrderedDict()
+    summary['fname'] = fnames
+    summary['format'] = [_get_scan_format(fname)[0] for fname in fnames]
+    summary['error'] = errors
+    summary['sfreq'] = np.array([scan['sfreq'] for scan in scans], float)
+    summary['n_channels'] = np.array([len(scan['ch_names'])
+                                      for scan in scans], int)
+    summary['n_times'] = np.array([scan['n_times'] for scan in scans], int)
+    summary['duration'] = summary['n_times'] / summary['sfreq']
+    summary['meas_date'] = np.array([np.nan if scan['meas_date'] is None
+                                     else scan['meas_date']
+                                     for scan in scans], float)
+    summary['ch_names'] = [scan['ch_names'] for scan in scans]
+    summary['n_events'] = np.array([len(scan['onset']) for scan in scans],
+                                   int)
+    summary['event_onsets'] = [np.array(scan['onset'], float)
+                               for scan in scans]
+    summary['event_descriptions'] = [list(scan['description'])
+                                     for scan in scans]
+    return summary
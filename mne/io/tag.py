@@ -7,10 +7,12 @@ import gzip
 from functools import partial
 import os
 import struct
+import zlib
 
 import numpy as np
 
 from .constants import FIFF
+from .utils import _GzipIndexFile
 from ..externals.six import text_type
 from ..externals.jdcal import jd2jcal
 
@@ -110,7 +112,7 @@ def read_big(fid, size=None):
     buf_size = 16777216
     if size is None:
         # it's not possible to get .gz uncompressed file size
-        if not isinstance(fid, gzip.GzipFile):
+        if not isinstance(fid, (gzip.GzipFile, _GzipIndexFile)):
             size = os.fstat(fid.fileno()).st_size - fid.tell()
 
     if size is not None:
@@ -179,6 +181,95 @@ def _frombuffer_rows(fid, tag_size, dtype=None, shape=None, rlims=None):
     return out
 
 
+_READ_CHUNK_SIZE = 2 ** 24  # bytes, see read_big
+_MAX_READ_GAP = 2 ** 12  # bytes, gaps up to this size are read through
+
+
+def _readinto(fid, buf):
+    """Fill a buffer from a file, in chunks of limited size."""
+    buf = memoryview(buf)
+    n_read = 0
+    while n_read < len(buf):
+        this_read = fid.readinto(
+            buf[n_read:n_read + min(len(buf) - n_read, _READ_CHUNK_SIZE)])
+        if not this_read:
+            raise ValueError('Read error')
+        n_read += this_read
+
+
+def _read_tags_into(fid, reads, dtype, out):
+    """Read chunks of the data of one or several tags into an array.
+
+    Parameters
+    ----------
+    fid : file
+        Open file to read from.
+    reads : list of tuple
+        The ``(pos, n_items)`` of each chunk, where ``pos`` is the position
+        in the file of the first item.
+    dtype : str | dtype
+        The (big-endian) type of the items in the file.
+    out : ndarray
+        The C-contiguous array to fill with the items of all chunks, in
+        order.
+
+    Notes
+    -----
+    Chunks that follow each other closely in the file (e.g., the data of
+    consecutive tags) are read at once. If ``out`` has the native type
+    corresponding to ``dtype``, the data are read into it directly and the
+    bytes are swapped in place. Otherwise, they are read into a buffer and
+    converted while copying them to ``out``.
+    """
+    dtype = np.dtype(dtype)
+    item_size = dtype.itemsize
+    out = out.reshape(-1)
+    direct = out.dtype == dtype.newbyteorder('=')
+    # split the chunks for a buffer of limited size, and group them in runs
+    max_items = max(_READ_CHUNK_SIZE // item_size, 1)
+    runs = list()
+    offset = 0
+    for pos, n_items in reads:
+        step = max(n_items if direct else max_items, 1)
+        for start in range(0, n_items, step):
+            n_chunk = min(n_items - start, step)
+            chunk = (pos + start * item_size, n_chunk, offset)
+            offset += n_chunk
+            if runs:
+                last = runs[-1][-1]
+                gap = chunk[0] - last[0] - last[1] * item_size
+                size = chunk[0] + n_chunk * item_size - runs[-1][0][0]
+                if 0 <= gap <= _MAX_READ_GAP and size <= _READ_CHUNK_SIZE:
+                    runs[-1].append(chunk)
+                    continue
+            runs.append([chunk])
+    if offset != out.size:
+        raise ValueError('out has %d items, %d requested' % (out.size, offset))
+    out_bytes = out.view(np.uint8)
+    buf = None
+    for run in runs:
+        fid.seek(run[0][0], 0)
+        if direct and len(run) == 1:
+            _, n_items, offset = run[0]
+            _readinto(fid, out_bytes[offset * item_size:
+                                     (offset + n_items) * item_size])
+            continue
+        size = run[-1][0] + run[-1][1] * item_size - run[0][0]
+        if buf is None:
+            buf = np.empty(_READ_CHUNK_SIZE, np.uint8)
+        _readinto(fid, buf[:size])
+        for pos, n_items, offset in run:
+            start = pos - run[0][0]
+            data = buf[start:start + n_items * item_size]
+            if direct:
+                out_bytes[offset * item_size:
+                          (offset + n_items) * item_size] = data
+            else:
+                out[offset:offset + n_items] = data.view(dtype)
+    if direct and not dtype.isnative:
+        out.view(dtype).byteswap(True)
+
+
 def _loc_to_coil_trans(loc):
     """Convert loc vector to coil_trans."""
     coil_trans = np.zeros((4, 4))
@@ -217,6 +308,14 @@ _matrix_coding_dense = 16384      # 4000
 _matrix_coding_CCS = 16400      # 4010
 _matrix_coding_RCS = 16416      # 4020
 _data_type = 65535      # ffff
+_matrix_dtypes = {
+    FIFF.FIFFT_INT: '>i4',
+    FIFF.FIFFT_JULIAN: '>i4',
+    FIFF.FIFFT_FLOAT: '>f4',
+    FIFF.FIFFT_DOUBLE: '>f8',
+    FIFF.FIFFT_COMPLEX_FLOAT: '>c8',
+    FIFF.FIFFT_COMPLEX_DOUBLE: '>c16',
+}
 
 
 def _read_tag_header(fid):
@@ -256,29 +355,12 @@ def _read_matrix(fid, tag, shape, rlims, matrix_coding):
                             'supported at this time')
 
         matrix_type = _data_type & tag.type
-
-        if matrix_type == FIFF.FIFFT_INT:
-            data = np.frombuffer(read_big(fid, 4 * dims.prod()), dtype='>i4')
-        elif matrix_type == FIFF.FIFFT_JULIAN:
-            data = np.frombuffer(read_big(fid, 4 * dims.prod()), dtype='>i4')
-        elif matrix_type == FIFF.FIFFT_FLOAT:
-            data = np.frombuffer(read_big(fid, 4 * dims.prod()), dtype='>f4')
-        elif matrix_type == FIFF.FIFFT_DOUBLE:
-            data = np.frombuffer(read_big(fid, 8 * dims.prod()), dtype='>f8')
-        elif matrix_type == FIFF.FIFFT_COMPLEX_FLOAT:
-            data = np.frombuffer(read_big(fid, 4 * 2 * dims.prod()),
-                                 dtype='>f4')
-            # Note: we need the non-conjugate transpose here
-            data = (data[::2] + 1j * data[1::2])
-        elif matrix_type == FIFF.FIFFT_COMPLEX_DOUBLE:
-            data = np.frombuffer(read_big(fid, 8 * 2 * dims.prod()),
-                                 dtype='>f8')
-            # Note: we need the non-conjugate transpose here
-            data = (data[::2] + 1j * data[1::2])
-        else:
+        if matrix_type not in _matrix_dtypes:
             raise Exception('Cannot handle matrix of type %d yet'
                             % matrix_type)
-        data.shape = dims
+        dtype = np.dtype(_matrix_dtypes[matrix_type])
+        data = np.empty(dims, dtype.newbyteorder('='))
+        _read_tags_into(fid, [(pos, data.size)], dtype, data)
     elif matrix_coding in (_matrix_coding_CCS, _matrix_coding_RCS):
         from scipy import sparse
         # Find dimensions and return to the beginning of tag data
@@ -492,6 +574,80 @@ for key, dtype in _simple_dict.items():
     _call_dict_names[key] = dtype
 
 
+_sample_dtypes = {
+    FIFF.FIFFT_DAU_PACK16: '>i2',
+    FIFF.FIFFT_SHORT: '>i2',
+    FIFF.FIFFT_INT: '>i4',
+    FIFF.FIFFT_FLOAT: '>f4',
+    FIFF.FIFFT_DOUBLE: '>f8',
+    FIFF.FIFFT_COMPLEX_FLOAT: '>c8',
+    FIFF.FIFFT_COMPLEX_DOUBLE: '>c16',
+}
+
+
+def _read_compressed_header(fid, pos):
+    """Read the header of a compressed data buffer.
+
+    Returns
+    -------
+    tag : Tag
+        The FIFF_MNE_COMPRESSED_DATA_BUFFER tag (without data).
+    header : ndarray of int, shape (4,)
+        The type of the samples, the codec, the filter and the size of the
+        uncompressed samples.
+    """
+    fid.seek(pos, 0)
+    tag = _read_tag_header(fid)
+    if tag.kind != FIFF.FIFF_MNE_COMPRESSED_DATA_BUFFER:
+        raise ValueError('Tag at position %d is not a compressed data buffer'
+                         % pos)
+    return tag, np.frombuffer(fid.read(16), '>i4').astype(int)
+
+
+def _read_compressed_data_buffer(fid, pos, shape, rlims=None):
+    """Read a data buffer compressed on its own.
+
+    Parameters
+    ----------
+    fid : file
+        The open FIF file descriptor.
+    pos : int
+        The position of the FIFF_MNE_COMPRESSED_DATA_BUFFER tag.
+    shape : tuple
+        The shape of the samples, (n_times, n_channels).
+    rlims : tuple | None
+        If tuple, the first (inclusive) and last (exclusive) rows to retrieve.
+
+    Returns
+    -------
+    data : ndarray, shape (n_rows, n_channels)
+        The samples.
+    """
+    tag, (data_type, codec, filt, size) = _read_compressed_header(fid, pos)
+    payload = fid.read(tag.size - 16)
+    if codec == FIFF.FIFFV_MNE_COMPRESSION_ZLIB:
+        payload = zlib.decompress(payload)
+    elif codec == FIFF.FIFFV_MNE_COMPRESSION_LZMA:
+        import lzma
+        payload = lzma.decompress(payload)
+    else:
+        raise ValueError('Unknown compression codec %d' % codec)
+    if len(payload) != size:
+        raise ValueError('Corrupted compressed data buffer at position %d'
+                         % pos)
+    dtype = np.dtype(_sample_dtypes[data_type])
+    if filt == FIFF.FIFFV_MNE_FILTER_SHUFFLE:
+        data = np.frombuffer(payload, np.uint8).reshape(dtype.itemsize, -1)
+        data = np.ascontiguousarray(data.T).view(dtype).reshape(shape)
+    else:
+        data = np.frombuffer(payload, dtype).reshape(shape)
+        if filt == FIFF.FIFFV_MNE_FILTER_DELTA:
+            data = np.cumsum(data, axis=0, dtype=dtype.newbyteorder('='))
+    if rlims is not None:
+        data = data[rlims[0]:rlims[1]]
+    return data
+
+
 def read_tag(fid, pos=None, shape=None, rlims=None):
     """Read a Tag from a file at a given position.
 
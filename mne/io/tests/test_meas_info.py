@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 import hashlib
 import os.path as op
+import shutil
 
 import pytest
 import numpy as np
 from numpy.testing import assert_array_equal, assert_allclose
 from scipy import sparse
 
-from mne import Epochs, read_events, pick_info, pick_types
+from mne import Epochs, read_events, pick_info, pick_types, read_evokeds
 from mne.event import make_fixed_length_events
 from mne.datasets import testing
 from mne.io import (read_fiducials, write_fiducials, _coil_trans_to_loc,
@@ -20,12 +21,13 @@ from mne.io.meas_info import (Info, create_info, _write_dig_points,
                               _force_update_info, RAW_INFO_FIELDS,
                               _bad_chans_comp)
 from mne.io import read_raw_ctf
-from mne.utils import _TempDir, run_tests_if_main
+from mne.utils import _TempDir, run_tests_if_main, object_diff
 from mne.channels.montage import read_montage, read_dig_montage
 
 base_dir = op.join(op.dirname(__file__), 'data')
 fiducials_fname = op.join(base_dir, 'fsaverage-fiducials.fif')
 raw_fname = op.join(base_dir, 'test_raw.fif')
+ctf_comp_fname = op.join(base_dir, 'test_ctf_comp_raw.fif')
 chpi_fname = op.join(base_dir, 'test_chpi_raw_sss.fif')
 event_name = op.join(base_dir, 'test-eve.fif')
 kit_data_dir = op.join(op.dirname(__file__), '..', 'kit', 'tests', 'data')
@@ -228,6 +230,67 @@ def test_read_write_info():
     assert m1 == m2
 
 
+def test_read_info_lazy():
+    """Test reading the entries of the info when they are accessed."""
+    tempdir = _TempDir()
+    fname = op.join(tempdir, 'test_raw.fif')
+    shutil.copy(ctf_comp_fname, fname)
+    raw_orig = read_raw_fif(ctf_comp_fname)
+    raw_orig.info._load_lazy()
+    raw = read_raw_fif(fname)
+    info = raw.info
+    assert set(info._lazy) == set(['dig', 'projs', 'events', 'hpi_results',
+                                   'hpi_meas', 'proc_history'])
+    assert len(info['comps']) == len(raw_orig.info['comps'])
+    assert 'dig' in info._lazy
+    assert object_diff(info['dig'], raw_orig.info['dig']) == ''
+    assert 'dig' not in info._lazy
+    assert 'projs' in info._lazy
+    # copies are complete
+    info_copy = info.copy()
+    assert info._lazy == {} and info_copy._lazy == {}
+    assert object_diff(info_copy, raw_orig.info) == ''
+    # writing over the file reads what is left first
+    info = read_raw_fif(fname).info
+    assert 'projs' in info._lazy
+    write_info(fname, info)
+    assert info._lazy == {}
+    info_read = read_info(fname)
+    for key in ('dig', 'projs', 'comps', 'chs'):
+        assert object_diff(info_read[key], raw_orig.info[key]) == ''
+    # but the file cannot change under a lazy info
+    shutil.copy(ctf_comp_fname, fname)
+    info = read_raw_fif(fname).info
+    with open(fname, 'ab') as fid:
+        fid.write(b'\0')
+    pytest.raises(RuntimeError, info.__getitem__, 'dig')
+
+    # the infos returned by read_info do not depend on the file
+    shutil.copy(ctf_comp_fname, fname)
+    info = read_info(fname)
+    assert not info.__dict__.get('_lazy')
+    assert object_diff(read_info(fname), info) == ''
+    with open(fname, 'ab') as fid:
+        fid.write(b'\0')
+    assert object_diff(info, raw_orig.info) == ''
+    shutil.copy(ctf_comp_fname, fname)
+    info = read_info(fname)  # from the cache
+    shutil.move(fname, op.join(tempdir, 'moved_raw.fif'))
+    assert object_diff(info, raw_orig.info) == ''
+
+    # the data derived from a raw instance do not depend on its file
+    shutil.copy(ctf_comp_fname, fname)
+    raw = read_raw_fif(fname)
+    assert 'dig' in raw.info._lazy
+    evoked = Epochs(raw, make_fixed_length_events(raw, duration=0.1),
+                    tmin=0., tmax=0.05, baseline=None).average()
+    shutil.move(fname, op.join(tempdir, 'moved_raw.fif'))
+    evoked_fname = op.join(tempdir, 'test-ave.fif')
+    evoked.save(evoked_fname)
+    assert object_diff(read_evokeds(evoked_fname)[0].info['dig'],
+                       evoked.info['dig']) == ''
+
+
 def test_io_dig_points():
     """Test Writing for dig files."""
     tempdir = _TempDir()
@@ -1,16 +1,24 @@
 # Generic tests that all raw classes should run
+from io import BytesIO
 from os import path as op
 import math
+import threading
 
 import pytest
 import numpy as np
 from numpy.testing import (assert_allclose, assert_array_almost_equal,
                            assert_equal, assert_array_equal)
 
-from mne import concatenate_raws, create_info
+import mne
+from mne import concatenate_raws, create_info, Annotations
 from mne.datasets import testing
-from mne.io import read_raw_fif, RawArray
-from mne.utils import _TempDir
+from mne.io import read_raw_fif, read_raw_edf, RawArray
+from mne.io.base import _encode_raw_buffer
+from mne.io.constants import FIFF
+from mne.io.utils import _read_segments_file, _mmap_segments_file
+from mne.io.write import (write_dau_pack16, write_int, write_float,
+                          write_double)
+from mne.utils import _TempDir, catch_logging
 
 
 def _test_raw_reader(reader, test_preloading=True, **kwargs):
@@ -153,3 +161,120 @@ def test_annotation_property_deprecation_warning():
     assert len(w) is 0
     with pytest.warns(DeprecationWarning, match='by assignment is deprecated'):
         raw.annotations = None
+
+
+def test_read_segments_file(tmpdir):
+    """Test reading segments of multiplexed files."""
+    rng = np.random.RandomState(0)
+    samples = rng.randint(-1000, 1000, (100, 5)).astype('>i2')
+    fname = str(tmpdir.join('test.dat'))
+    with open(fname, 'wb') as fid:
+        fid.write(b'header')
+        samples.tofile(fid)
+    assert_array_equal(_mmap_segments_file(fname, 10, 20, '>i2', 5, 6),
+                       samples[10:20].T)
+
+    class _Raw(object):
+        _filenames = [fname]
+        info = dict(nchan=6)
+
+    trigger = np.arange(100.)
+    want = np.concatenate((samples.T, trigger[np.newaxis]))
+    cals = np.arange(1., 7.)[:, np.newaxis]
+    for idx in (slice(None), slice(1, 3), np.array([0, 4]),
+                np.array([2, 5]), np.array([5])):
+        data = np.zeros((len(np.arange(6)[idx]), 30))
+        _read_segments_file(_Raw, data, idx, 0, 50, 80, cals[idx], None,
+                            dtype='>i2', n_channels=5, offset=6,
+                            trigger_ch=trigger)
+        assert_array_equal(data, (want * cals)[idx, 50:80])
+        # without calibration, the samples are copied from the memory map
+        data = np.zeros((len(np.arange(6)[idx]), 30), np.int16)
+        _read_segments_file(_Raw, data, idx, 0, 50, 80,
+                            np.ones_like(cals[idx]), None, dtype='>i2',
+                            n_channels=5, offset=6, trigger_ch=trigger)
+        assert_array_equal(data, want[idx, 50:80])
+    mult = rng.randn(2, 6)
+    data = np.zeros((2, 30))
+    _read_segments_file(_Raw, data, np.array([0, 1]), 0, 50, 80, None, mult,
+                        dtype='>i2', n_channels=5, offset=6,
+                        trigger_ch=trigger)
+    assert_allclose(data, np.dot(mult, want[:, 50:80]))
+    with pytest.raises(RuntimeError, match='Incorrect number of samples'):
+        _read_segments_file(_Raw, data, np.array([0, 1]), 0, 90, 120, None,
+                            mult, dtype='>i2', n_channels=5, offset=6,
+                            trigger_ch=trigger)
+
+
+def test_read_segment_threads(monkeypatch):
+    """Test reading the files of a raw instance with a pool of threads."""
+    edf_fname = op.join(op.dirname(__file__), '..', 'edf', 'tests', 'data',
+                        'test.edf')
+    raws = [read_raw_edf(edf_fname, stim_channel=None, verbose='error')
+            .crop(tmin, tmax) for tmin, tmax in ((0, 2), (1, 3), (0.5, 5))]
+    raw = concatenate_raws(raws)
+    assert len(raw._filenames) == 3
+    monkeypatch.setenv('MNE_IO_N_THREADS', '1')
+    want = raw[:, :][0]
+    monkeypatch.setenv('MNE_IO_N_THREADS', '3')
+    with catch_logging() as log:
+        data = raw._read_segment(verbose='debug')
+    assert 'Reading 3 files using 3 threads' in log.getvalue()
+    assert_array_equal(data, want)
+    for start, stop in ((0, 1025), (1000, 2200), (500, 800), (1023, 3000)):
+        assert_array_equal(raw[10:20, start:stop][0], want[10:20, start:stop])
+    raw.load_data()
+    assert_array_equal(raw._data, want)
+
+
+@pytest.mark.parametrize('fmt', ('short', 'int', 'single', 'double'))
+def test_write_raw_buffers(tmpdir, monkeypatch, fmt):
+    """Test encoding and writing data buffers in blocks."""
+    rng = np.random.RandomState(0)
+    info = create_info(7, 1000., 'eeg')
+    raw = RawArray(rng.randn(7, 3000) * 1000, info)
+    raw.set_annotations(Annotations([1.], [0.5], 'bad_acq_skip'))
+    # the tags are identical to the ones written one at a time
+    cals = rng.rand(7)
+    fid = BytesIO()
+    write_function = dict(short=write_dau_pack16, int=write_int,
+                          single=write_float, double=write_double)[fmt]
+    write_function(fid, FIFF.FIFF_DATA_BUFFER, raw._data / cals[:, None])
+    assert _encode_raw_buffer(raw._data, cals, fmt).tostring() == \
+        fid.getvalue()
+
+    fnames = list()
+    for block_size, n_threads in ((2 ** 25, '1'), (1000, '1'), (1000, '2'),
+                                  (20000, '2')):
+        monkeypatch.setattr(mne.io.base, '_WRITE_BLOCK_SIZE', block_size)
+        monkeypatch.setenv('MNE_IO_N_THREADS', n_threads)
+        fnames.append(str(tmpdir.join('test_%d_%s_raw.fif'
+                                      % (block_size, n_threads))))
+        raw.save(fnames[-1], fmt=fmt, buffer_size_sec=0.25)
+    raw_read = read_raw_fif(fnames[0])
+    want = raw.get_data()
+    want[:, 1000:1500] = 0.  # acquisition skip
+    atol = dict(short=1, int=1).get(fmt, 0)
+    assert_allclose(raw_read.get_data(), want, atol=atol, rtol=1e-6)
+    for fname in fnames[1:]:
+        assert_array_equal(read_raw_fif(fname).get_data(),
+                           raw_read.get_data())
+
+
+def test_write_raw_buffers_error(tmpdir, monkeypatch):
+    """Test that the writing threads are stopped when reading fails."""
+    info = create_info(3, 1000., 'eeg')
+    raw = RawArray(np.zeros((3, 3000)), info)
+    read_raw_buffer = mne.io.base._read_raw_buffer
+
+    def _read_raw_buffer(raw, picks, first, last, transform):
+        if first >= 1000:
+            raise RuntimeError('Reading failed')
+        return read_raw_buffer(raw, picks, first, last, transform)
+
+    monkeypatch.setattr(mne.io.base, '_read_raw_buffer', _read_raw_buffer)
+    monkeypatch.setenv('MNE_IO_N_THREADS', '2')
+    n_threads = threading.active_count()
+    with pytest.raises(RuntimeError, match='Reading failed'):
+        raw.save(str(tmpdir.join('test_raw.fif')), buffer_size_sec=0.25)
+    assert threading.active_count() == n_threads
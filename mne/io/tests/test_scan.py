@@ -0,0 +1,140 @@
+# License: BSD (3-clause)
+
+import os
+import os.path as op
+import shutil
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+import pytest
+
+from mne import Annotations
+from mne.annotations import _sync_onset
+from mne.io import (read_raw_fif, read_raw_edf, read_raw_brainvision,
+                    scan_headers)
+from mne.utils import _TempDir, run_tests_if_main
+
+io_dir = op.join(op.dirname(__file__), '..')
+ctf_comp_fname = op.join(io_dir, 'tests', 'data', 'test_ctf_comp_raw.fif')
+edf_fname = op.join(io_dir, 'edf', 'tests', 'data', 'test.edf')
+bdf_fname = op.join(io_dir, 'edf', 'tests', 'data', 'test.bdf')
+vhdr_dir = op.join(io_dir, 'brainvision', 'tests', 'data')
+fiducials_fname = op.join(io_dir, 'tests', 'data', 'fsaverage-fiducials.fif')
+eve_fname = op.join(io_dir, 'tests', 'data', 'test_raw-eve.fif')
+cov_fname = op.join(io_dir, 'tests', 'data', 'test-cov.fif')
+
+
+def test_scan_headers():
+    """Test reading the summary of raw files from their headers."""
+    tempdir = _TempDir()
+    raw = read_raw_fif(ctf_comp_fname).crop(0.1, None).load_data()
+    raw.info['meas_date'] = (1500000000, 0)
+    raw.set_annotations(Annotations([0.2, 0.3], [0.1, 0.], ['a', 'b'],
+                                    orig_time=1500000000.05))
+    fif_fname = op.join(tempdir, 'test_raw.fif.gz')
+    raw.save(fif_fname)
+    subject_dir = op.join(tempdir, 'sub')
+    os.mkdir(subject_dir)
+    for fname in (edf_fname, bdf_fname):
+        shutil.copy(fname, subject_dir)
+    for ext in ('.vhdr', '.vmrk', '.eeg'):
+        shutil.copy(op.join(vhdr_dir, 'test' + ext), subject_dir)
+    open(op.join(subject_dir, 'notes.txt'), 'w').close()
+    # the other FIF files of a directory are not read
+    for fname in (fiducials_fname, eve_fname, cov_fname):
+        shutil.copy(fname, subject_dir)
+
+    summary = scan_headers(tempdir)
+    assert list(summary.keys()) == [
+        'fname', 'format', 'error', 'sfreq', 'n_channels', 'n_times',
+        'duration', 'meas_date', 'ch_names', 'n_events', 'event_onsets',
+        'event_descriptions']
+    assert summary['fname'] == [fif_fname] + [
+        op.join(subject_dir, fname)
+        for fname in ('test.bdf', 'test.edf', 'test.vhdr')]
+    assert summary['format'] == ['fif', 'bdf', 'edf', 'brainvision']
+    assert summary['error'] == [None] * 4
+
+    # compare with the raw readers
+    raw = read_raw_fif(fif_fname)
+    raws = [raw, read_raw_edf(bdf_fname, stim_channel=None)]
+    with pytest.warns(RuntimeWarning, match='truncated'):
+        raws.append(read_raw_edf(edf_fname, stim_channel=None))
+    with pytest.warns(RuntimeWarning, match='will be dropped'):
+        raws.append(read_raw_brainvision(op.join(subject_dir, 'test.vhdr')))
+    for ii, this_raw in enumerate(raws):
+        assert summary['sfreq'][ii] == this_raw.info['sfreq']
+        assert summary['n_times'][ii] == this_raw.n_times
+    assert_allclose(summary['duration'], summary['n_times'] / summary['sfreq'])
+    assert summary['ch_names'][0] == raw.ch_names
+    assert summary['ch_names'][1] == raws[1].ch_names
+    assert summary['ch_names'][2] == raws[2].ch_names
+    # the stimulus channel is synthesized by the reader
+    assert summary['ch_names'][3] == raws[3].ch_names[:-1]
+    assert_array_equal(summary['n_channels'], [len(ch_names) for ch_names
+                                               in summary['ch_names']])
+    assert summary['meas_date'][0] == 1500000000.
+    assert summary['meas_date'][2] == raws[2].info['meas_date']
+    meas_date = raws[3].info['meas_date']
+    assert summary['meas_date'][3] == meas_date[0] + meas_date[1] / 1e6
+
+    # events
+    assert_array_equal(summary['n_events'], [2, 0, 5, 13])
+    assert_allclose(summary['event_onsets'][0],
+                    _sync_onset(raw, raw.annotations.onset), atol=1e-6)
+    assert summary['event_descriptions'][0] == ['a', 'b']
+    assert_allclose(summary['event_onsets'][2],
+                    [event[0] for event in raws[2].find_edf_events()])
+    events = raws[3]._get_brainvision_events()
+    stimuli = [ii for ii, description
+               in enumerate(summary['event_descriptions'][3])
+               if description.startswith('Stimulus/')]
+    assert_allclose(summary['event_onsets'][3][stimuli],
+                    events[:, 0] / raws[3].info['sfreq'])
+    assert summary['event_descriptions'][3][stimuli[0]] == 'Stimulus/S253'
+
+    # with threads, and the same channels in several files
+    summary_threads = scan_headers([subject_dir, edf_fname], n_jobs=2)
+    assert summary_threads['fname'][:3] == summary['fname'][1:]
+    assert_array_equal(summary_threads['n_times'][:3], summary['n_times'][1:])
+    assert summary_threads['ch_names'][1] is summary_threads['ch_names'][3]
+    pytest.raises(ValueError, scan_headers,
+                  op.join(subject_dir, 'notes.txt'))
+    assert len(scan_headers([])['fname']) == 0
+    # unless they are given explicitly
+    with pytest.warns(RuntimeWarning, match='Could not read the header'):
+        summary_fid = scan_headers(op.join(subject_dir,
+                                           'fsaverage-fiducials.fif'))
+    assert 'measurement info' in summary_fid['error'][0]
+
+    # the files that cannot be read do not prevent reading the others
+    bad_dir = op.join(tempdir, 'bad')
+    os.mkdir(bad_dir)
+    with open(ctf_comp_fname, 'rb') as fid:
+        data = fid.read()
+    with open(op.join(bad_dir, 'bad_raw.fif'), 'wb') as fid:
+        fid.write(data[:100])  # truncated
+    with open(op.join(bad_dir, 'bad.edf'), 'wb') as fid:
+        fid.write(b'not an EDF file')
+    shutil.copy(edf_fname, bad_dir)
+    for n_jobs in (1, 2):
+        with pytest.warns(RuntimeWarning, match='Could not read') as w:
+            summary_bad = scan_headers(bad_dir, n_jobs=n_jobs)
+        assert len(w) == 2
+        assert summary_bad['fname'] == [
+            op.join(bad_dir, fname)
+            for fname in ('bad.edf', 'bad_raw.fif', 'test.edf')]
+        assert [err is None
+                for err in summary_bad['error']] == [False, False, True]
+        assert_array_equal(summary_bad['sfreq'][:2], [np.nan, np.nan])
+        assert_array_equal(summary_bad['duration'][:2], [np.nan, np.nan])
+        assert_array_equal(summary_bad['meas_date'][:2], [np.nan, np.nan])
+        assert_array_equal(summary_bad['n_times'],
+                           [0, 0, summary['n_times'][2]])
+        assert_array_equal(summary_bad['n_channels'][:2], [0, 0])
+        assert summary_bad['ch_names'][:2] == [[], []]
+        assert_array_equal(summary_bad['n_events'], [0, 0, 5])
+        assert summary_bad['event_descriptions'][:2] == [[], []]
+
+
+run_tests_if_main()
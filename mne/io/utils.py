@@ -8,10 +8,17 @@
 #
 # License: BSD (3-clause)
 
-import numpy as np
+from bisect import bisect_right
+from collections import OrderedDict
+from gzip import GzipFile
 import os
+import os.path as op
+import zlib
+
+import numpy as np
 
 from ..externals.six import b
+from ..utils import logger
 from .constants import FIFF
 
 
@@ -148,39 +155,81 @@ def _file_size(fname):
         return f.tell()
 
 
+def _mmap_segments_file(fname, start, stop, dtype='<i2', n_channels=1,
+                        offset=0):
+    """Memory-map a segment of a multiplexed file.
+
+    Parameters
+    ----------
+    fname : str
+        The file name.
+    start : int
+        First time sample of the segment.
+    stop : int
+        Last time sample of the segment (exclusive).
+    dtype : str | dtype
+        The data type of the samples.
+    n_channels : int
+        The number of interleaved channels.
+    offset : int
+        The offset of the first sample in bytes.
+
+    Returns
+    -------
+    segment : ndarray, shape (n_channels, stop - start)
+        A read-only view of the samples, without any copy or calibration.
+        Only the pages of the file that are used are actually read.
+    """
+    dtype = np.dtype(dtype)
+    # data_offset and count are in bytes and data samples
+    # (channels x time points) respectively
+    data_offset = n_channels * start * dtype.itemsize + offset
+    count = (stop - start) * n_channels
+    n_avail = max(_file_size(fname) - data_offset, 0) // dtype.itemsize
+    if n_avail < count:
+        raise RuntimeError('Incorrect number of samples (%s != %s), '
+                           'please report this error to MNE-Python '
+                           'developers' % (n_avail, count))
+    if count == 0:  # mmap cannot map an empty region
+        return np.empty((n_channels, 0), dtype)
+    return np.memmap(fname, dtype, mode='r', offset=data_offset,
+                     shape=(stop - start, n_channels)).T
+
+
 def _read_segments_file(raw, data, idx, fi, start, stop, cals, mult,
                         dtype='<i2', n_channels=None, offset=0,
                         trigger_ch=None):
     """Read a chunk of raw data."""
     n_channels = raw.info['nchan'] if n_channels is None else n_channels
-
-    n_bytes = np.dtype(dtype).itemsize
-    # data_offset and data_left count data samples (channels x time points),
-    # not bytes.
-    data_offset = n_channels * start * n_bytes + offset
-    data_left = (stop - start) * n_channels
-
-    # Read up to 100 MB of data at a time, block_size is in data samples
-    block_size = ((int(100e6) // n_bytes) // n_channels) * n_channels
-    block_size = min(data_left, block_size)
-    with open(raw._filenames[fi], 'rb', buffering=0) as fid:
-        fid.seek(data_offset)
-        # extract data in chunks
-        for sample_start in np.arange(0, data_left, block_size) // n_channels:
-            count = min(block_size, data_left - sample_start * n_channels)
-            block = np.fromfile(fid, dtype, count)
-            if block.size != count:
-                raise RuntimeError('Incorrect number of samples (%s != %s), '
-                                   'please report this error to MNE-Python '
-                                   'developers' % (block.size, count))
-            block = block.reshape(n_channels, -1, order='F')
-            n_samples = block.shape[1]  # = count // n_channels
-            sample_stop = sample_start + n_samples
-            if trigger_ch is not None:
-                stim_ch = trigger_ch[start:stop][sample_start:sample_stop]
-                block = np.vstack((block, stim_ch))
-            data_view = data[:, sample_start:sample_stop]
-            _mult_cal_one(data_view, block, idx, cals, mult)
+    segment = _mmap_segments_file(raw._filenames[fi], start, stop, dtype,
+                                  n_channels, offset)
+    if mult is None and cals is not None and (np.asarray(cals) == 1).all():
+        cals = None  # copy the samples from the memory map as they are
+    if trigger_ch is not None:
+        trigger_ch = trigger_ch[start:stop]
+    n_rows = n_channels + (trigger_ch is not None)
+    # without mult, only the requested channels are read
+    rows = np.arange(n_rows)[idx] if mult is None else np.arange(n_rows)
+    from_file = rows < n_channels
+    if from_file.all() and isinstance(idx, slice) and mult is None:
+        rows = idx  # cheaper than fancy indexing
+
+    # Convert up to 100 MB of data at a time, block_size is in time samples
+    block_size = max(int(100e6) // (len(from_file) * data.itemsize), 1)
+    for sample_start in range(0, stop - start, block_size):
+        sample_stop = min(sample_start + block_size, stop - start)
+        sl = slice(sample_start, sample_stop)
+        block = data[:, sl] if mult is None else np.empty(
+            (n_rows, sample_stop - sample_start), data.dtype)
+        if from_file.all():
+            block[:] = segment[rows, sl]
+        else:
+            block[from_file] = segment[rows[from_file], sl]
+            block[~from_file] = trigger_ch[sl]
+        if mult is not None:
+            _mult_cal_one(data[:, sl], block, idx, cals, mult)
+        elif cals is not None:
+            block *= cals
 
 
 def read_str(fid, count=1):
@@ -249,3 +298,234 @@ def _synthesize_stim_channel(events, n_samples):
     for onset, duration, trigger in events:
         stim_channel[onset:onset + duration] = trigger
     return stim_channel
+
+
+# Gzip files with seek points.
+#
+# Decompression of a gzip stream can only be restarted at a position where
+# the state of the decompressor is known. When writing, we fully flush the
+# compressor at regular intervals (which also resets its dictionary), so that
+# a new raw deflate decompressor can start at these positions, and we store
+# the positions in a sidecar index file. Other gzip files are scanned once and
+# copies of the decompressor are kept in memory at regular intervals instead.
+
+_GZIP_INDEX_SPACING = 2 ** 20  # uncompressed bytes between flush points
+_GZIP_SCAN_SPACING = 2 ** 22  # uncompressed bytes between scan points
+_GZIP_CHUNK_SIZE = 2 ** 16  # compressed bytes read at once
+_GZIP_SCAN_CACHE_SIZE = 4
+_gzip_scan_cache = OrderedDict()
+
+
+def _gzip_index_fname(fname):
+    """Get the name of the sidecar index of a gzip file."""
+    return fname + '.idx'
+
+
+def _gzip_file_id(fid):
+    """Get the size and the CRC32/ISIZE trailer of an open gzip file."""
+    fid.seek(0, os.SEEK_END)
+    size = fid.tell()
+    fid.seek(max(size - 8, 0))
+    trailer = fid.read(8).rjust(8, b'\0')
+    return size, int(np.frombuffer(trailer, '>i8')[0])
+
+
+def _gzip_isize(file_id):
+    """Get the uncompressed size (modulo 2 ** 32) from the trailer."""
+    return int(np.array([file_id[1]], '>i8').view('<u4')[1])
+
+
+class _GzipIndexWriter(GzipFile):
+    """Write a gzip file with seek points at regular intervals.
+
+    The compressor is fully flushed every ``_GZIP_INDEX_SPACING``
+    uncompressed bytes, and the uncompressed and compressed positions of
+    these points are written to a sidecar index file when closing.
+    """
+
+    def __init__(self, fname, compresslevel=2):
+        GzipFile.__init__(self, fname, 'wb', compresslevel=compresslevel)
+        self._fname = fname
+        self._points = [(0, self.fileobj.tell())]
+
+    def write(self, data):
+        """Write data, flushing the compressor at the seek points."""
+        data = memoryview(np.frombuffer(data, np.uint8))
+        start = 0
+        while start < len(data):
+            stop = min(len(data), start + _GZIP_INDEX_SPACING -
+                       (self.offset - self._points[-1][0]))
+            GzipFile.write(self, data[start:stop])
+            start = stop
+            if self.offset - self._points[-1][0] >= _GZIP_INDEX_SPACING:
+                self.flush(zlib.Z_FULL_FLUSH)
+                self._points.append((self.offset, self.fileobj.tell()))
+        return len(data)
+
+    def close(self):
+        """Close the file and write the index."""
+        if self.fileobj is None:
+            return
+        GzipFile.close(self)
+        index_fname = _gzip_index_fname(self._fname)
+        if len(self._points) > 1:
+            with open(self._fname, 'rb') as fid:
+                file_id = _gzip_file_id(fid)
+            np.array([file_id] + self._points, '>i8').tofile(index_fname)
+        elif op.isfile(index_fname):  # small file, no index needed
+            os.remove(index_fname)
+
+
+def _scan_gzip(fid):
+    """Scan a gzip file and copy the decompressor at regular intervals."""
+    fid.seek(0)
+    dobj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    points = [(0, 0, dobj.copy())]
+    n_in = n_out = 0
+    while True:
+        data = fid.read(_GZIP_CHUNK_SIZE)
+        if not data:
+            break
+        n_in += len(data)
+        while data:
+            n_out += len(dobj.decompress(data))
+            data = dobj.unused_data
+            if data:  # next member
+                dobj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if n_out - points[-1][0] >= _GZIP_SCAN_SPACING:
+            points.append((n_out, n_in, dobj.copy()))
+    return points, n_out
+
+
+def _get_gzip_points(fname, fid):
+    """Get the seek points of a gzip file."""
+    file_id = _gzip_file_id(fid)
+    index_fname = _gzip_index_fname(fname)
+    if op.isfile(index_fname):
+        index = np.fromfile(index_fname, '>i8')
+        if len(index) >= 4 and len(index) % 2 == 0 and \
+                tuple(index[:2]) == file_id:
+            logger.debug('Using gzip index %s' % index_fname)
+            points = [(int(uoff), int(coff), None)
+                      for uoff, coff in index[2:].reshape(-1, 2)]
+            return points, _gzip_isize(file_id), True
+        logger.debug('Ignoring out-of-date gzip index %s' % index_fname)
+    key = (op.realpath(fname), os.stat(fname).st_mtime) + file_id
+    if key not in _gzip_scan_cache:
+        logger.debug('Scanning gzip file %s' % fname)
+        _gzip_scan_cache[key] = _scan_gzip(fid)
+        while len(_gzip_scan_cache) > _GZIP_SCAN_CACHE_SIZE:
+            _gzip_scan_cache.popitem(last=False)
+    return _gzip_scan_cache[key] + (False,)
+
+
+class _GzipIndexFile(object):
+    """Read a gzip file with random access using its seek points.
+
+    Seeking is free, and reading restarts decompression at the closest seek
+    point before the position when it is not reached by reading forward.
+    """
+
+    def __init__(self, fname):
+        self.name = fname
+        self._fid = open(fname, 'rb')
+        try:
+            self._points, self._size, self._raw = _get_gzip_points(
+                fname, self._fid)
+        except Exception:
+            self._fid.close()
+            raise
+        self._uoffs = [point[0] for point in self._points]
+        self._offset = 0
+        self._restart(*self._points[0])
+
+    def __enter__(self):  # noqa: D105
+        return self
+
+    def __exit__(self, *args):  # noqa: D105
+        self.close()
+
+    @property
+    def closed(self):
+        """Whether the file is closed."""
+        return self._fid.closed
+
+    def close(self):
+        """Close the file."""
+        self._fid.close()
+
+    def tell(self):
+        """Get the uncompressed position."""
+        return self._offset
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """Set the uncompressed position."""
+        if whence == os.SEEK_CUR:
+            offset += self._offset
+        elif whence == os.SEEK_END:
+            offset += self._size
+        self._offset = offset
+        return offset
+
+    def read(self, size=-1):
+        """Read uncompressed data."""
+        if size is None or size < 0:
+            size = max(self._size - self._offset, 0)
+        stop = self._buf_pos + len(self._buf)
+        ii = bisect_right(self._uoffs, self._offset) - 1
+        if self._offset < self._buf_pos or self._uoffs[ii] > stop:
+            self._restart(*self._points[ii])
+            stop = self._buf_pos
+        while stop < self._offset:  # skip data before the position
+            self._buf_pos, self._buf = stop, self._decompress()
+            if not self._buf:
+                break
+            stop += len(self._buf)
+        end = self._offset + size
+        if stop < end:
+            chunks = [self._buf[self._offset - self._buf_pos:]]
+            self._buf_pos = self._offset
+            while stop < end:
+                data = self._decompress()
+                if not data:
+                    break
+                chunks.append(data)
+                stop += len(data)
+            self._buf = b''.join(chunks)
+        start = self._offset - self._buf_pos
+        data = self._buf[start:start + size]
+        self._offset += len(data)
+        return data
+
+    def readinto(self, buf):
+        """Read uncompressed data into a buffer."""
+        data = self.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    def _restart(self, uoff, coff, dobj):
+        self._fid.seek(coff)
+        self._dobj = (zlib.decompressobj(-zlib.MAX_WBITS) if dobj is None
+                      else dobj.copy())
+        self._buf_pos = uoff
+        self._buf = b''
+        self._done = False
+
+    def _decompress(self):
+        while not self._done:
+            data = self._fid.read(_GZIP_CHUNK_SIZE)
+            if not data:
+                self._done = True
+            out = list()
+            while data:
+                out.append(self._dobj.decompress(data))
+                data = self._dobj.unused_data
+                if data:
+                    if self._raw:  # only the trailer is left
+                        self._done = True
+                        break
+                    self._dobj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            out = b''.join(out)
+            if out:
+                return out
+        return b''
@@ -3,16 +3,17 @@
 #
 # License: BSD (3-clause)
 
-from gzip import GzipFile
 import os.path as op
 import re
 import time
 import uuid
+import zlib
 
 import numpy as np
 from scipy import linalg, sparse
 
 from .constants import FIFF
+from .utils import _GzipIndexWriter
 from ..utils import logger
 from ..externals.jdcal import jcal2jd
 from ..externals.six import string_types, b
@@ -40,6 +41,60 @@ def _write(fid, data, kind, data_size, FIFFT_TYPE, dtype):
     fid.write(np.array(data, dtype=dtype).tostring())
 
 
+def _get_lzma():
+    """Get the lzma module."""
+    try:
+        import lzma
+    except ImportError:
+        raise ImportError('lzma compression requires the lzma module '
+                          '(Python 3)')
+    return lzma
+
+
+def _compress_data_buffer(data, data_type, compression):
+    """Compress the samples of a data buffer on their own.
+
+    Parameters
+    ----------
+    data : ndarray, shape (n_times, n_channels)
+        The samples as stored in a FIFF_DATA_BUFFER (big-endian).
+    data_type : int
+        The FIFF type of the samples.
+    compression : str
+        The codec, 'zlib' (fast) or 'lzma' (smaller).
+
+    Returns
+    -------
+    payload : bytes
+        The content of the FIFF_MNE_COMPRESSED_DATA_BUFFER tag: the type,
+        codec, filter and uncompressed size of the data, and the compressed
+        data.
+    """
+    codecs = dict(zlib=FIFF.FIFFV_MNE_COMPRESSION_ZLIB,
+                  lzma=FIFF.FIFFV_MNE_COMPRESSION_LZMA)
+    if compression not in codecs:
+        raise ValueError('compression must be None, "zlib" or "lzma", got %r'
+                         % (compression,))
+    if data.dtype.kind == 'i':
+        # successive samples are close, store their differences (wrapping
+        # around like the integers do)
+        filt = FIFF.FIFFV_MNE_FILTER_DELTA
+        filtered = data.copy()
+        filtered[1:] = data[1:] - data[:-1]
+    else:
+        # group the bytes by significance, the exponents compress well
+        filt = FIFF.FIFFV_MNE_FILTER_SHUFFLE
+        filtered = np.ascontiguousarray(data).view(np.uint8).reshape(
+            -1, data.dtype.itemsize).T
+    if compression == 'zlib':
+        payload = zlib.compress(filtered.tostring(), 1)
+    else:
+        payload = _get_lzma().compress(filtered.tostring(), preset=1)
+    header = np.array([data_type, codecs[compression], filt, data.nbytes],
+                      '>i4')
+    return header.tostring() + payload
+
+
 def _get_split_size(split_size):
     """Convert human-readable bytes to machine-readable bytes."""
     if isinstance(split_size, string_types):
@@ -261,11 +316,15 @@ def start_file(fname, id_=None):
         ID to use for the FIFF_FILE_ID.
     """
     if isinstance(fname, string_types):
+        # infos read from this file might still need to read from it
+        from .meas_info import _load_lazy_infos
+        _load_lazy_infos(fname)
         if op.splitext(fname)[1].lower() == '.gz':
             logger.debug('Writing using gzip')
             # defaults to compression level 9, which is barely smaller but much
-            # slower. 2 offers a good compromise.
-            fid = GzipFile(fname, "wb", compresslevel=2)
+            # slower. 2 offers a good compromise. The file has seek points for
+            # random access when reading.
+            fid = _GzipIndexWriter(fname, compresslevel=2)
         else:
             logger.debug('Writing using normal I/O')
             fid = open(fname, "wb")
@@ -9,10 +9,12 @@
 from inspect import isfunction
 from collections import namedtuple
 from copy import deepcopy
+from functools import partial
 from numbers import Integral
 from time import time
 
 import os
+import os.path as op
 import json
 
 import numpy as np
@@ -21,7 +23,7 @@ from scipy import linalg
 from .ecg import (qrs_detector, _get_ecg_channel_index, _make_ecg,
                   create_ecg_epochs)
 from .eog import _find_eog_events, _get_eog_channel_index
-from .infomax_ import infomax
+from .infomax_ import infomax, _ChunkedBlocks
 
 from ..cov import compute_whitener
 from .. import Covariance, Evoked
@@ -35,7 +37,9 @@ from ..io.open import fiff_open
 from ..io.tag import read_tag
 from ..io.meas_info import write_meas_info, read_meas_info
 from ..io.constants import Bunch, FIFF
-from ..io.base import BaseRaw
+from ..io.base import BaseRaw, _write_raw
+from ..io.fiff.raw import read_raw_fif
+from ..annotations import _annotations_starts_stops
 from ..epochs import BaseEpochs
 from ..viz import (plot_ica_components, plot_ica_scores,
                    plot_ica_sources, plot_ica_overlay)
@@ -43,12 +47,13 @@ from ..viz.ica import plot_ica_properties
 from ..viz.topomap import _plot_corrmap
 
 from ..channels.channels import _contains_ch_type, ContainsMixin
-from ..io.write import start_file, end_file, write_id
+from ..io.write import start_file, end_file, write_id, _get_split_size
 from ..utils import (check_version, logger, check_fname, verbose,
                      _reject_data_segments, check_random_state,
                      compute_corr, _get_inst_data, _ensure_int,
                      copy_function_doc_to_method_doc, _pl, warn,
-                     _check_preload, _check_compensation_grade)
+                     _check_preload, _check_compensation_grade,
+                     _check_fname)
 
 from ..fixes import _get_args
 from ..filter import filter_data
@@ -327,7 +332,7 @@ class ICA(ContainsMixin):
     @verbose
     def fit(self, inst, picks=None, start=None, stop=None, decim=None,
             reject=None, flat=None, tstep=2.0, reject_by_annotation=True,
-            verbose=None):
+            chunk_duration=None, verbose=None):
         """Run the ICA decomposition on raw data.
 
         Caveat! If supplying a noise covariance keep track of the projections
@@ -382,6 +387,18 @@ class ICA(ContainsMixin):
 
             .. versionadded:: 0.14.0
 
+        chunk_duration : float | None
+            If not None, the data are read in chunks of about this duration
+            (in seconds) instead of being loaded all at once, so that the
+            memory used does not depend on the length of the recording. The
+            PCA is then computed from the covariance accumulated over the
+            chunks, and Infomax is fit using random blocks of samples drawn
+            from one chunk at a time. Only the ``'infomax'`` and
+            ``'extended-infomax'`` methods are supported, and ``reject`` and
+            ``flat`` cannot be used. Defaults to None.
+
+            .. versionadded:: 0.17
+
         verbose : bool, str, int, or None
             If not None, override default verbose level (see
             :func:`mne.verbose` and :ref:`Logging documentation <tut_logging>`
@@ -392,21 +409,35 @@ class ICA(ContainsMixin):
         self : instance of ICA
             Returns the modified instance.
         """
+        if chunk_duration is not None:
+            if self.method not in ('infomax', 'extended-infomax'):
+                raise ValueError('chunk_duration can only be used with the '
+                                 '"infomax" and "extended-infomax" methods, '
+                                 'got method="%s"' % (self.method,))
+            if reject is not None or flat is not None:
+                raise ValueError('reject and flat cannot be used together '
+                                 'with chunk_duration')
+            chunk_duration = float(chunk_duration)
+            if chunk_duration <= 0:
+                raise ValueError('chunk_duration must be positive, got %s'
+                                 % (chunk_duration,))
         if isinstance(inst, (BaseRaw, BaseEpochs)):
             _check_for_unsupported_ica_channels(picks, inst.info)
             t_start = time()
             if isinstance(inst, BaseRaw):
                 self._fit_raw(inst, picks, start, stop, decim, reject, flat,
-                              tstep, reject_by_annotation, verbose)
+                              tstep, reject_by_annotation, verbose,
+                              chunk_duration)
             elif isinstance(inst, BaseEpochs):
-                self._fit_epochs(inst, picks, decim, verbose)
+                self._fit_epochs(inst, picks, decim, verbose, chunk_duration)
         else:
             raise ValueError('Data input must be of Raw or Epochs type')
 
-        # sort ICA components by explained variance
-        var = _ica_explained_variance(self, inst)
-        var_ord = var.argsort()[::-1]
-        _sort_components(self, var_ord, copy=False)
+        if chunk_duration is None:  # _fit_chunks sorts on its own
+            # sort ICA components by explained variance
+            var = _ica_explained_variance(self, inst)
+            var_ord = var.argsort()[::-1]
+            _sort_components(self, var_ord, copy=False)
         t_stop = time()
         logger.info("Fitting ICA took {:.1f}s.".format(t_stop - t_start))
         return self
@@ -425,7 +456,7 @@ class ICA(ContainsMixin):
             del self.drop_inds_
 
     def _fit_raw(self, raw, picks, start, stop, decim, reject, flat, tstep,
-                 reject_by_annotation, verbose):
+                 reject_by_annotation, verbose, chunk_duration=None):
         """Aux method."""
         if self.current_fit != 'unfitted':
             self._reset()
@@ -449,6 +480,35 @@ class ICA(ContainsMixin):
         start, stop = _check_start_stop(raw, start, stop)
 
         reject_by_annotation = 'omit' if reject_by_annotation else None
+        if chunk_duration is not None:
+            n_chunk = max(int(round(chunk_duration * raw.info['sfreq'])), 1)
+            start = 0 if start is None else start
+            stop = len(raw.times) if stop is None else stop
+            chunk_starts = np.arange(start, stop, n_chunk)
+            if decim is not None:
+                # number of samples kept before each chunk, to decimate the
+                # chunks with the same phase as the concatenated data
+                used = np.ones(stop - start, bool)
+                if reject_by_annotation is not None:
+                    onsets, ends = _annotations_starts_stops(raw, ['BAD'])
+                    for onset, end in zip(onsets, ends):
+                        used[max(onset - start, 0):max(end - start, 0)] = \
+                            False
+                n_used = np.concatenate([[0], np.cumsum(used)])
+                n_used = n_used[chunk_starts - start]
+
+            def read_chunk(ci):
+                chunk_start = chunk_starts[ci]
+                data = raw.get_data(picks, chunk_start,
+                                    min(chunk_start + n_chunk, stop),
+                                    reject_by_annotation)
+                if decim is not None:
+                    data = data[:, -n_used[ci] % decim::decim]
+                return data
+
+            return self._fit_chunks(read_chunk, len(chunk_starts), info,
+                                    picks, 'raw')
+
         # this will be a copy
         data = raw.get_data(picks, start, stop, reject_by_annotation)
 
@@ -470,7 +530,8 @@ class ICA(ContainsMixin):
 
         return self
 
-    def _fit_epochs(self, epochs, picks, decim, verbose):
+    def _fit_epochs(self, epochs, picks, decim, verbose,
+                    chunk_duration=None):
         """Aux method."""
         if self.current_fit != 'unfitted':
             self._reset()
@@ -492,6 +553,24 @@ class ICA(ContainsMixin):
             self.max_pca_components = len(picks)
             logger.info('Inferring max_pca_components from picks')
 
+        if chunk_duration is not None:
+            n_chunk = max(int(round(chunk_duration * epochs.info['sfreq'] /
+                                    len(epochs.times))), 1)
+
+            def read_chunk(ci):
+                # bad epochs are dropped consistently on every read
+                data = epochs[ci * n_chunk:(ci + 1) * n_chunk].get_data()
+                data = data[:, picks]
+                if decim is not None:
+                    data = data[:, :, ::decim]
+                if len(data) == 0:  # all epochs of the chunk are bad
+                    return np.empty((len(picks), 0))
+                return np.hstack(data)
+
+            n_chunks = int(np.ceil(len(epochs.events) / float(n_chunk)))
+            return self._fit_chunks(read_chunk, n_chunks, info, picks,
+                                    'epochs')
+
         # this should be a copy (picks a list of int)
         data = epochs.get_data()[:, picks]
         # this will be a view
@@ -517,25 +596,8 @@ class ICA(ContainsMixin):
             # Scale (z-score) the data by channel type
             info = pick_info(info, picks)
             pre_whitener = np.empty([len(data), 1])
-            for ch_type in _DATA_CH_TYPES_SPLIT + ['eog']:
-                if _contains_ch_type(info, ch_type):
-                    if ch_type == 'seeg':
-                        this_picks = pick_types(info, meg=False, seeg=True)
-                    elif ch_type == 'ecog':
-                        this_picks = pick_types(info, meg=False, ecog=True)
-                    elif ch_type == 'eeg':
-                        this_picks = pick_types(info, meg=False, eeg=True)
-                    elif ch_type in ('mag', 'grad'):
-                        this_picks = pick_types(info, meg=ch_type)
-                    elif ch_type == 'eog':
-                        this_picks = pick_types(info, meg=False, eog=True)
-                    elif ch_type in ('hbo', 'hbr'):
-                        this_picks = pick_types(info, meg=False, fnirs=ch_type)
-                    else:
-                        raise RuntimeError('Should not be reached.'
-                                           'Unsupported channel {0}'
-                                           .format(ch_type))
-                    pre_whitener[this_picks] = np.std(data[this_picks])
+            for this_picks in _get_ch_type_picks(info):
+                pre_whitener[this_picks] = np.std(data[this_picks])
             data /= pre_whitener
         elif not has_pre_whitener and self.noise_cov is not None:
             pre_whitener, _ = compute_whitener(self.noise_cov, info, picks)
@@ -562,9 +624,119 @@ class ICA(ContainsMixin):
                       svd_solver='full')
 
         data = pca.fit_transform(data.T)
+        sel = self._set_pca(pca.mean_, pca.components_,
+                            pca.explained_variance_,
+                            pca.explained_variance_ratio_)
+        if not check_version('sklearn', '0.16'):
+            # sklearn < 0.16 did not apply whitening to the components, so we
+            # need to do this manually
+            self.pca_components_ *= np.sqrt(
+                self.pca_explained_variance_[:, None])
+        del pca
+
+        # take care of ICA
+        if self.method == 'fastica':
+            from sklearn.decomposition import FastICA
+            ica = FastICA(whiten=False, random_state=random_state,
+                          **self.fit_params)
+            ica.fit(data[:, sel])
+            unmixing_matrix = ica.components_
+        elif self.method in ('infomax', 'extended-infomax'):
+            unmixing_matrix = infomax(data[:, sel], random_state=random_state,
+                                      **self.fit_params)
+        elif self.method == 'picard':
+            from picard import picard
+            _, W, _ = picard(data[:, sel].T, whiten=False,
+                             random_state=random_state, **self.fit_params)
+            del _
+            unmixing_matrix = W
+        self._set_unmixing(unmixing_matrix, sel, fit_type)
+
+    def _fit_chunks(self, read_chunk, n_chunks, info, picks, fit_type):
+        """Fit PCA and Infomax reading the data chunk by chunk.
+
+        ``read_chunk(ci)`` returns the data of chunk ``ci``, with shape
+        (n_channels, n_times).
+        """
+        # accumulate the sum and the cross-products of the data
+        n_samples = 0
+        data_sum = np.zeros(len(picks))
+        data_prod = np.zeros((len(picks), len(picks)))
+        for ci in range(n_chunks):
+            data = read_chunk(ci)
+            n_samples += data.shape[1]
+            data_sum += data.sum(axis=1)
+            data_prod += np.dot(data, data.T)
+        del data
+        if n_samples < 2:
+            raise RuntimeError('Not enough samples to fit ICA (got %d)'
+                               % (n_samples,))
+        self.n_samples_ = n_samples
+
+        # pre-whitening, like _pre_whiten does on the full data
+        if self.noise_cov is None:
+            pre_whitener = np.empty([len(picks), 1])
+            diag = np.diag(data_prod)
+            for this_picks in _get_ch_type_picks(pick_info(info, picks)):
+                n_values = float(n_samples * len(this_picks))
+                pre_whitener[this_picks] = np.sqrt(
+                    diag[this_picks].sum() / n_values -
+                    (data_sum[this_picks].sum() / n_values) ** 2)
+            whitener = np.diag(1. / pre_whitener[:, 0])
+        else:
+            pre_whitener, _ = compute_whitener(self.noise_cov, info, picks)
+            whitener = pre_whitener
+        self.pre_whitener_ = pre_whitener
+
+        # PCA from the scatter matrix of the pre-whitened data
+        mean = np.dot(whitener, data_sum) / n_samples
+        scatter = np.dot(np.dot(whitener, data_prod), whitener.T)
+        scatter -= n_samples * np.outer(mean, mean)
+        del data_sum, data_prod
+        eigval, eigvec = linalg.eigh(scatter)
+        order = eigval.argsort()[::-1]
+        exp_var = eigval[order] / (n_samples - 1)
+        components = eigvec[:, order].T
+        # deterministic signs: largest absolute loading is positive
+        components *= np.sign(components[np.arange(len(components)),
+                                         np.abs(components).argmax(axis=1)])[
+            :, np.newaxis]
+        n_pca = self.max_pca_components
+        sel = self._set_pca(mean, components[:n_pca], exp_var[:n_pca],
+                            exp_var[:n_pca] / exp_var.sum())
+
+        # Infomax on blocks drawn from PCA-whitened chunks
+        proj = (self.pca_components_[sel] /
+                np.sqrt(self.pca_explained_variance_[sel])[:, np.newaxis])
+        offset = np.dot(proj, mean)
+        proj = np.dot(proj, whitener)
+
+        def read_whitened(ci):
+            data = np.dot(proj, read_chunk(ci))
+            data -= offset[:, np.newaxis]
+            return data.T
+
+        data = _ChunkedBlocks(read_whitened, n_chunks,
+                              (n_samples, sel.stop))
+        unmixing_matrix = infomax(
+            data, random_state=check_random_state(self.random_state),
+            **self.fit_params)
+        self._set_unmixing(unmixing_matrix, sel, fit_type)
+
+        # sort ICA components by the variance they explain in the fit data
+        unmix = np.dot(self.unmixing_matrix_,
+                       self.pca_components_[:self.n_components_])
+        source_sq = np.einsum('ij,jk,ik->i', unmix, scatter, unmix)
+        var = np.sum(self.mixing_matrix_ ** 2, axis=0) * source_sq / (
+            self.n_components_ * n_samples - 1)
+        _sort_components(self, var.argsort()[::-1], copy=False)
+        return self
 
+    def _set_pca(self, mean, components, explained_variance,
+                 explained_variance_ratio):
+        """Store the PCA and select the number of ICA components."""
         if isinstance(self.n_components, float):
-            n_components_ = np.sum(pca.explained_variance_ratio_.cumsum() <=
+            n_components_ = np.sum(explained_variance_ratio.cumsum() <=
                                    self.n_components)
             if n_components_ < 1:
                 raise RuntimeError('One PCA component captures most of the '
@@ -581,43 +753,27 @@ class ICA(ContainsMixin):
                             self.n_components)
             else:  # None case
                 logger.info('Using all PCA components: %i'
-                            % len(pca.components_))
-                sel = slice(len(pca.components_))
+                            % len(components))
+                sel = slice(len(components))
 
         # the things to store for PCA
-        self.pca_mean_ = pca.mean_
-        self.pca_components_ = pca.components_
-        self.pca_explained_variance_ = exp_var = pca.explained_variance_
-        if not check_version('sklearn', '0.16'):
-            # sklearn < 0.16 did not apply whitening to the components, so we
-            # need to do this manually
-            self.pca_components_ *= np.sqrt(exp_var[:, None])
-        del pca
+        self.pca_mean_ = mean
+        self.pca_components_ = components
+        self.pca_explained_variance_ = explained_variance
         # update number of components
         self.n_components_ = sel.stop
         self._update_ica_names()
         if self.n_pca_components is not None:
             if self.n_pca_components > len(self.pca_components_):
                 self.n_pca_components = len(self.pca_components_)
-
-        # take care of ICA
-        if self.method == 'fastica':
-            from sklearn.decomposition import FastICA
-            ica = FastICA(whiten=False, random_state=random_state,
-                          **self.fit_params)
-            ica.fit(data[:, sel])
-            self.unmixing_matrix_ = ica.components_
-        elif self.method in ('infomax', 'extended-infomax'):
-            self.unmixing_matrix_ = infomax(data[:, sel],
-                                            random_state=random_state,
-                                            **self.fit_params)
-        elif self.method == 'picard':
-            from picard import picard
-            _, W, _ = picard(data[:, sel].T, whiten=False,
-                             random_state=random_state, **self.fit_params)
-            del _
-            self.unmixing_matrix_ = W
-        self.unmixing_matrix_ /= np.sqrt(exp_var[sel])[None, :]  # whitening
+        return sel
+
+    def _set_unmixing(self, unmixing_matrix, sel, fit_type):
+        """Store the unmixing matrix of the PCA-whitened data."""
+        self.unmixing_matrix_ = unmixing_matrix
+        # whitening
+        self.unmixing_matrix_ /= np.sqrt(
+            self.pca_explained_variance_[sel])[None, :]
         self.mixing_matrix_ = linalg.pinv(self.unmixing_matrix_)
         self.current_fit = fit_type
 
@@ -636,12 +792,8 @@ class ICA(ContainsMixin):
         sources = np.dot(self.unmixing_matrix_, pca_data)
         return sources
 
-    def _transform_raw(self, raw, start, stop, reject_by_annotation=False):
-        """Transform raw data."""
-        if not hasattr(self, 'mixing_matrix_'):
-            raise RuntimeError('No fit available. Please fit ICA.')
-        start, stop = _check_start_stop(raw, start, stop)
-
+    def _check_raw_picks(self, raw):
+        """Pick the fitted channels of a Raw instance."""
         picks = pick_types(raw.info, include=self.ch_names, exclude='bads',
                            meg=False, ref_meg=False)
         if len(picks) != len(self.ch_names):
@@ -650,6 +802,14 @@ class ICA(ContainsMixin):
                                'provide Raw compatible with '
                                'ica.ch_names' % (len(self.ch_names),
                                                  len(picks)))
+        return picks
+
+    def _transform_raw(self, raw, start, stop, reject_by_annotation=False):
+        """Transform raw data."""
+        if not hasattr(self, 'mixing_matrix_'):
+            raise RuntimeError('No fit available. Please fit ICA.')
+        start, stop = _check_start_stop(raw, start, stop)
+        picks = self._check_raw_picks(raw)
 
         if reject_by_annotation:
             data = raw.get_data(picks, start, stop, 'omit')
@@ -729,7 +889,8 @@ class ICA(ContainsMixin):
         return np.dot(self.mixing_matrix_[:, :self.n_components_].T,
                       self.pca_components_[:self.n_components_]).T
 
-    def get_sources(self, inst, add_channels=None, start=None, stop=None):
+    def get_sources(self, inst, add_channels=None, start=None, stop=None,
+                    fname=None, overwrite=False, n_jobs=1):
         """Estimate sources given the unmixing matrix.
 
         This method will return the sources in the container format passed.
@@ -752,16 +913,40 @@ class ICA(ContainsMixin):
         stop : int | float | None
             Last sample to not include. If float, data will be interpreted as
             time in seconds. If None, the entire data will be used.
+        fname : str | None
+            If not None, ``inst`` must be a Raw instance, which does not need
+            to be preloaded. Its data are read buffer by buffer, transformed
+            and written to this FIF file, which is returned as a new Raw
+            instance that is not preloaded.
+
+            .. versionadded:: 0.17
+        overwrite : bool
+            If True, the file ``fname`` is overwritten if it exists.
+
+            .. versionadded:: 0.17
+        n_jobs : int
+            Number of buffers to read and transform at once by a pool of
+            threads when ``fname`` is not None.
+
+            .. versionadded:: 0.17
 
         Returns
         -------
         sources : instance of Raw, Epochs or Evoked
             The ICA sources time series.
         """
+        if fname is not None and not isinstance(inst, BaseRaw):
+            raise ValueError('fname can only be used with Raw data')
         if isinstance(inst, BaseRaw):
             _check_compensation_grade(self, inst, 'ICA', 'Raw',
                                       ch_names=self.ch_names)
-            sources = self._sources_as_raw(inst, add_channels, start, stop)
+            if fname is not None:
+                sources = self._sources_to_file(inst, fname, add_channels,
+                                                start, stop, overwrite,
+                                                n_jobs)
+            else:
+                sources = self._sources_as_raw(inst, add_channels, start,
+                                               stop)
         elif isinstance(inst, BaseEpochs):
             _check_compensation_grade(self, inst, 'ICA', 'Epochs',
                                       ch_names=self.ch_names)
@@ -813,6 +998,24 @@ class ICA(ContainsMixin):
 
         return out
 
+    def _sources_to_file(self, raw, fname, add_channels, start, stop,
+                         overwrite, n_jobs):
+        """Aux method."""
+        if not hasattr(self, 'mixing_matrix_'):
+            raise RuntimeError('No fit available. Please fit ICA.')
+        picks = self._check_raw_picks(raw)
+        unmixing, offset = self._get_sources_matrix()
+        add_picks = list()
+        if add_channels is not None:
+            add_picks = pick_channels(raw.ch_names, add_channels)
+        info = raw.info.copy()
+        info['comps'] = []
+        self._export_info(info, raw, add_channels)
+        transform = partial(_sources_buffer, picks=picks, unmixing=unmixing,
+                            offset=offset, add_picks=add_picks)
+        return _write_transformed_raw(fname, raw, info, transform, start,
+                                      stop, overwrite, n_jobs)
+
     def _sources_as_epochs(self, epochs, add_channels, concatenate):
         """Aux method."""
         out = epochs.copy()
@@ -1207,7 +1410,7 @@ class ICA(ContainsMixin):
         return self.labels_['eog'], scores
 
     def apply(self, inst, include=None, exclude=None, n_pca_components=None,
-              start=None, stop=None):
+              start=None, stop=None, fname=None, overwrite=False, n_jobs=1):
         """Remove selected components from the signal.
 
         Given the unmixing matrix, transform data,
@@ -1236,15 +1439,39 @@ class ICA(ContainsMixin):
         stop : int | float | None
             Last sample to not include. If float, data will be interpreted as
             time in seconds. If None, data will be used to the last sample.
+        fname : str | None
+            If not None, ``inst`` must be a Raw instance, which does not need
+            to be preloaded and is left unchanged. Its data between ``start``
+            and ``stop`` are read buffer by buffer, cleaned with a single
+            matrix product and written to this FIF file, which is returned as
+            a new Raw instance that is not preloaded.
+
+            .. versionadded:: 0.17
+        overwrite : bool
+            If True, the file ``fname`` is overwritten if it exists.
+
+            .. versionadded:: 0.17
+        n_jobs : int
+            Number of buffers to read and clean at once by a pool of threads
+            when ``fname`` is not None.
+
+            .. versionadded:: 0.17
 
         Returns
         -------
         out : instance of Raw, Epochs or Evoked
             The processed data.
         """
+        if fname is not None and not isinstance(inst, BaseRaw):
+            raise ValueError('fname can only be used with Raw data')
         if isinstance(inst, BaseRaw):
             _check_compensation_grade(self, inst, 'ICA', 'Raw',
                                       ch_names=self.ch_names)
+            if fname is not None:
+                return self._apply_raw_to_file(
+                    raw=inst, fname=fname, include=include, exclude=exclude,
+                    n_pca_components=n_pca_components, start=start,
+                    stop=stop, overwrite=overwrite, n_jobs=n_jobs)
             out = self._apply_raw(raw=inst, include=include,
                                   exclude=exclude,
                                   n_pca_components=n_pca_components,
@@ -1293,6 +1520,21 @@ class ICA(ContainsMixin):
         raw[picks, start:stop] = data
         return raw
 
+    def _apply_raw_to_file(self, raw, fname, include, exclude,
+                           n_pca_components, start, stop, overwrite, n_jobs):
+        """Aux method."""
+        exclude = self._check_exclude(exclude)
+
+        if n_pca_components is not None:
+            self.n_pca_components = n_pca_components
+
+        picks = self._check_raw_picks(raw)
+        cleaning, offset = self._get_cleaning_matrix(include, exclude)
+        transform = partial(_clean_buffer, picks=picks, cleaning=cleaning,
+                            offset=offset)
+        return _write_transformed_raw(fname, raw, raw.info, transform, start,
+                                      stop, overwrite, n_jobs)
+
     def _apply_epochs(self, epochs, include, exclude, n_pca_components):
         """Aux method."""
         _check_preload(epochs, "ica.apply")
@@ -1354,6 +1596,27 @@ class ICA(ContainsMixin):
 
     def _pick_sources(self, data, include, exclude):
         """Aux function."""
+        proj_mat = self._get_proj_mat(include, exclude)
+
+        # Apply first PCA
+        if self.pca_mean_ is not None:
+            data -= self.pca_mean_[:, None]
+
+        data = np.dot(proj_mat, data)
+
+        if self.pca_mean_ is not None:
+            data += self.pca_mean_[:, None]
+
+        # restore scaling
+        if self.noise_cov is None:  # revert standardization
+            data *= self.pre_whitener_
+        else:
+            data = np.dot(linalg.pinv(self.pre_whitener_, cond=1e-14), data)
+
+        return data
+
+    def _get_proj_mat(self, include, exclude):
+        """Get the projector removing the components from whitened data."""
         if exclude is None:
             exclude = self.exclude
         else:
@@ -1368,10 +1631,6 @@ class ICA(ContainsMixin):
         n_components = self.n_components_
         logger.info('Transforming to ICA space (%i components)' % n_components)
 
-        # Apply first PCA
-        if self.pca_mean_ is not None:
-            data -= self.pca_mean_[:, None]
-
         sel_keep = np.arange(n_components)
         if include not in (None, []):
             sel_keep = np.unique(include)
@@ -1393,20 +1652,44 @@ class ICA(ContainsMixin):
             sel_keep = np.concatenate(
                 (sel_keep, range(n_components, _n_pca_comp)))
 
-        proj_mat = np.dot(mixing[:, sel_keep], unmixing[sel_keep, :])
+        return np.dot(mixing[:, sel_keep], unmixing[sel_keep, :])
 
-        data = np.dot(proj_mat, data)
+    def _get_cleaning_matrix(self, include, exclude):
+        """Get the cleaning operator for unwhitened data.
 
+        Whitening, removal of the components and unwhitening are combined
+        into a single affine map, the cleaned data being
+        ``np.dot(cleaning, data) + offset[:, np.newaxis]``.
+        """
+        proj_mat = self._get_proj_mat(include, exclude)
+        if self.noise_cov is None:
+            cleaning = self.pre_whitener_ * proj_mat / self.pre_whitener_.T
+            unwhitener = self.pre_whitener_
+        else:
+            unwhitener = linalg.pinv(self.pre_whitener_, cond=1e-14)
+            cleaning = np.dot(np.dot(unwhitener, proj_mat),
+                              self.pre_whitener_)
+        offset = np.zeros(len(cleaning))
         if self.pca_mean_ is not None:
-            data += self.pca_mean_[:, None]
-
-        # restore scaling
-        if self.noise_cov is None:  # revert standardization
-            data *= self.pre_whitener_
+            offset = self.pca_mean_ - np.dot(proj_mat, self.pca_mean_)
+            if self.noise_cov is None:
+                offset *= unwhitener[:, 0]
+            else:
+                offset = np.dot(unwhitener, offset)
+        return cleaning, offset
+
+    def _get_sources_matrix(self):
+        """Get the affine map from unwhitened data to the sources."""
+        unmixing = np.dot(self.unmixing_matrix_,
+                          self.pca_components_[:self.n_components_])
+        offset = np.zeros(len(unmixing))
+        if self.pca_mean_ is not None:
+            offset = -np.dot(unmixing, self.pca_mean_)
+        if self.noise_cov is None:
+            unmixing = unmixing / self.pre_whitener_.T
         else:
-            data = np.dot(linalg.pinv(self.pre_whitener_, cond=1e-14), data)
-
-        return data
+            unmixing = np.dot(unmixing, self.pre_whitener_)
+        return unmixing, offset
 
     @verbose
     def save(self, fname):
@@ -1622,6 +1905,63 @@ class ICA(ContainsMixin):
         return _n_pca_comp
 
 
+def _get_ch_type_picks(info):
+    """Get the picks of each channel type that is scaled separately."""
+    all_picks = list()
+    for ch_type in _DATA_CH_TYPES_SPLIT + ['eog']:
+        if _contains_ch_type(info, ch_type):
+            if ch_type == 'seeg':
+                this_picks = pick_types(info, meg=False, seeg=True)
+            elif ch_type == 'ecog':
+                this_picks = pick_types(info, meg=False, ecog=True)
+            elif ch_type == 'eeg':
+                this_picks = pick_types(info, meg=False, eeg=True)
+            elif ch_type in ('mag', 'grad'):
+                this_picks = pick_types(info, meg=ch_type)
+            elif ch_type == 'eog':
+                this_picks = pick_types(info, meg=False, eog=True)
+            elif ch_type in ('hbo', 'hbr'):
+                this_picks = pick_types(info, meg=False, fnirs=ch_type)
+            else:
+                raise RuntimeError('Should not be reached.'
+                                   'Unsupported channel {0}'
+                                   .format(ch_type))
+            all_picks.append(this_picks)
+    return all_picks
+
+
+def _clean_buffer(data, picks, cleaning, offset):
+    """Remove ICA components from a buffer of raw data."""
+    data[picks] = np.dot(cleaning, data[picks]) + offset[:, np.newaxis]
+    return data
+
+
+def _sources_buffer(data, picks, unmixing, offset, add_picks):
+    """Compute the ICA sources of a buffer of raw data."""
+    sources = np.dot(unmixing, data[picks]) + offset[:, np.newaxis]
+    return np.concatenate([sources, data[add_picks]])
+
+
+def _write_transformed_raw(fname, raw, info, transform, start, stop,
+                           overwrite, n_jobs):
+    """Write transformed raw buffers to a new FIF file and read it."""
+    check_fname(fname, 'raw', ('raw.fif', 'raw_sss.fif', 'raw_tsss.fif',
+                               'raw.fif.gz', 'raw_sss.fif.gz',
+                               'raw_tsss.fif.gz'))
+    fname = op.realpath(fname)
+    if fname in raw._filenames:
+        raise ValueError('You cannot save data to the same file.'
+                         ' Please use a different filename.')
+    _check_fname(fname, overwrite)
+    start, stop = _check_start_stop(raw, start, stop)
+    start = 0 if start is None else start
+    stop = len(raw.times) if stop is None else min(stop, len(raw.times))
+    _write_raw(fname, raw, info, None, 'single', FIFF.FIFFT_FLOAT, True,
+               start, stop, raw._get_buffer_size(), None, False,
+               _get_split_size('2GB'), 0, None, transform, n_jobs)
+    return read_raw_fif(fname)
+
+
 def _check_start_stop(raw, start, stop):
     """Aux function."""
     out = list()
@@ -5,6 +5,7 @@
 # License: BSD (3-clause)
 
 import math
+from time import time
 
 import numpy as np
 
@@ -16,7 +17,7 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
             anneal_deg=60., anneal_step=0.9, extended=True, n_subgauss=1,
             kurt_size=6000, ext_blocks=1, max_iter=200, random_state=None,
             blowup=1e4, blowup_fac=0.5, n_small_angle=20, use_bias=True,
-            verbose=None):
+            dtype=np.float64, callback=None, verbose=None):
     """Run (extended) Infomax ICA decomposition on raw data.
 
     Parameters
@@ -82,6 +83,21 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
     use_bias : bool
         This quantity indicates if the bias should be computed.
         Defaults to True.
+    dtype : str | np.dtype
+        The floating point type used for the products with the data blocks,
+        which dominate the computation time. Can be ``'float64'`` (default)
+        or ``'float32'``, which is faster and uses less memory. The unmixing
+        matrix is always accumulated in double precision.
+
+        .. versionadded:: 0.17
+    callback : callable | None
+        If not None, it is called after each step (pass over the data) with
+        a dict containing the ``'step'`` number, its duration ``'time'``
+        (in seconds), the weight change ``'change'``, the ``'angle'``
+        (in degrees) between the two last weight changes and the learning
+        rate ``'l_rate'``. This can be used to monitor convergence.
+
+        .. versionadded:: 0.17
     verbose : bool, str, int, or None
         If not None, override default verbosity level (see :func:`mne.verbose`
         and :ref:`Logging documentation <tut_logging>` for more).
@@ -100,7 +116,6 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
            analysis using an extended infomax algorithm for mixed subgaussian
            and supergaussian sources. Neural Computation, 11(2), 417-441, 1999.
     """
-    from scipy.stats import kurtosis
     rng = check_random_state(random_state)
 
     # define some default parameters
@@ -115,7 +130,16 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
     signcount_threshold = 25
     signcount_step = 2
 
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError('dtype must be float32 or float64, got %s' % dtype)
+    if callback is not None and not callable(callback):
+        raise TypeError('callback must be callable or None, got %s'
+                        % (type(callback),))
+
     # check data shape
+    if not hasattr(data, 'iter_blocks'):
+        data = _ArrayBlocks(data)
     n_samples, n_features = data.shape
     n_features_square = n_features ** 2
 
@@ -129,10 +153,6 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
 
     logger.info('Computing%sInfomax ICA' % ' Extended ' if extended else ' ')
 
-    # collect parameters
-    nblock = n_samples // block
-    lastt = (nblock - 1) * block + 1
-
     # initialize training
     if weights is None:
         weights = np.identity(n_features, dtype=np.float64)
@@ -140,8 +160,21 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
         weights = weights.T
 
     BI = block * np.identity(n_features, dtype=np.float64)
-    bias = np.zeros((n_features, 1), dtype=np.float64)
-    onesrow = np.ones((1, block), dtype=np.float64)
+    bias = np.zeros(n_features, dtype=np.float64)
+    # buffers reused for all blocks: the products with the data blocks are
+    # computed in dtype, the weights are accumulated in float64
+    x = np.empty((block, n_features), dtype)
+    u = np.empty((block, n_features), dtype)
+    y = np.empty((block, n_features), dtype)
+    uy = np.empty((n_features, n_features), dtype)
+    uu = np.empty((n_features, n_features), dtype)
+    dweights = np.empty((n_features, n_features))
+    wtmp = np.empty((n_features, n_features))
+    if dtype == np.float64:
+        weights_c, bias_c = weights, bias
+    else:
+        weights_c = np.empty((n_features, n_features), dtype)
+        bias_c = np.empty(n_features, dtype)
     startweights = weights.copy()
     oldweights = startweights.copy()
     step = 0
@@ -165,38 +198,51 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
     # trainings loop
     olddelta, oldchange = 1., 0.
     while step < max_iter:
-
-        # shuffle data at each step
-        permute = random_permutation(n_samples, rng)
+        t_step = time()
 
         # ICA training block
-        # loop across block samples
-        for t in range(0, lastt, block):
-            u = np.dot(data[permute[t:t + block], :], weights)
-            u += np.dot(bias, onesrow).T
+        # loop across blocks of shuffled samples
+        for data_block in data.iter_blocks(block, rng):
+            if data_block.dtype != dtype:
+                x[:] = data_block
+                data_block = x
+            if weights_c is not weights:
+                weights_c[:] = weights
+                bias_c[:] = bias
+            np.dot(data_block, weights_c, out=u)
+            u += bias_c
 
             if extended:
-                # extended ICA update
-                y = np.tanh(u)
-                weights += l_rate * np.dot(weights,
-                                           BI -
-                                           signs[None, :] * np.dot(u.T, y) -
-                                           np.dot(u.T, u))
+                # extended ICA update:
+                # BI - signs[None, :] * dot(u.T, y) - dot(u.T, u)
+                np.tanh(u, out=y)
+                np.dot(u.T, y, out=uy)
+                uy *= signs
+                np.dot(u.T, u, out=uu)
+                uy += uu
+                np.subtract(BI, uy, out=dweights)
                 if use_bias:
-                    bias += l_rate * np.reshape(np.sum(y, axis=0,
-                                                dtype=np.float64) * -2.0,
-                                                (n_features, 1))
+                    bias -= (2.0 * l_rate) * np.sum(y, axis=0,
+                                                    dtype=np.float64)
 
             else:
-                # logistic ICA weights update
-                y = 1.0 / (1.0 + np.exp(-u))
-                weights += l_rate * np.dot(weights,
-                                           BI + np.dot(u.T, (1.0 - 2.0 * y)))
+                # logistic ICA weights update:
+                # BI + dot(u.T, 1 - 2 y) with y = 1 / (1 + exp(-u))
+                np.negative(u, out=y)
+                with np.errstate(over='ignore'):  # exp(inf) -> y = 0 is fine
+                    np.exp(y, out=y)
+                y += 1.0
+                np.reciprocal(y, out=y)
+                y *= -2.0
+                y += 1.0
+                np.dot(u.T, y, out=uy)
+                np.add(BI, uy, out=dweights)
 
                 if use_bias:
-                    bias += l_rate * np.reshape(np.sum((1.0 - 2.0 * y), axis=0,
-                                                dtype=np.float64),
-                                                (n_features, 1))
+                    bias += l_rate * np.sum(y, axis=0, dtype=np.float64)
+            np.dot(weights, dweights, out=wtmp)
+            wtmp *= l_rate
+            weights += wtmp
 
             # check change limit
             max_weight_val = np.max(np.abs(weights))
@@ -210,15 +256,14 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
             # ICA kurtosis estimation
             if extended:
                 if ext_blocks > 0 and blockno % ext_blocks == 0:
-                    if kurt_size < n_samples:
-                        rp = np.floor(rng.uniform(0, 1, kurt_size) *
-                                      (n_samples - 1))
-                        tpartact = np.dot(data[rp.astype(int), :], weights).T
-                    else:
-                        tpartact = np.dot(data, weights).T
+                    tpartact = data.sample(kurt_size, rng)
+                    if weights_c is not weights:
+                        weights_c[:] = weights
+                    tpartact = np.dot(tpartact.astype(dtype, copy=False),
+                                      weights_c)
 
                     # estimate kurtosis
-                    kurt = kurtosis(tpartact, axis=1, fisher=True)
+                    kurt = _kurtosis(tpartact)
 
                     if extmomentum != 0:
                         kurt = (extmomentum * old_kurt +
@@ -256,6 +301,9 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
                 logger.info(
                     'step %d - lrate %5f, wchange %8.8f, angledelta %4.1f deg'
                     % (step, l_rate, change, angledelta))
+            if callback is not None:
+                callback(dict(step=step, time=time() - t_step, change=change,
+                              angle=angledelta, l_rate=l_rate))
 
             # anneal learning rate
             oldweights = weights.copy()
@@ -290,7 +338,9 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
             weights = startweights.copy()
             oldweights = startweights.copy()
             olddelta = np.zeros((1, n_features_square), dtype=np.float64)
-            bias = np.zeros((n_features, 1), dtype=np.float64)
+            bias = np.zeros(n_features, dtype=np.float64)
+            if dtype == np.float64:
+                weights_c, bias_c = weights, bias
 
             ext_blocks = initial_ext_blocks
 
@@ -311,3 +361,81 @@ def infomax(data, weights=None, l_rate=None, block=None, w_change=1e-12,
 
     # prepare return values
     return weights.T
+
+
+def _kurtosis(x):
+    """Compute the (biased, Fisher) kurtosis of the columns of x in place.
+
+    This is equivalent to ``scipy.stats.kurtosis(x, axis=0)``.
+    """
+    x -= np.mean(x, axis=0)
+    x *= x
+    m2 = np.mean(x, axis=0, dtype=np.float64)
+    x *= x
+    m4 = np.mean(x, axis=0, dtype=np.float64)
+    zero = m2 == 0
+    m2[zero] = 1.
+    return np.where(zero, 0., m4 / (m2 * m2)) - 3.
+
+
+class _ArrayBlocks(object):
+    """Draw blocks of samples for infomax from an in-memory array.
+
+    Other objects with the same interface can be passed to :func:`infomax`
+    to fit data that do not fit in memory.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.shape = data.shape
+
+    def iter_blocks(self, block, rng):
+        """Iterate over the blocks of one pass over shuffled samples."""
+        n_samples = self.shape[0]
+        # shuffle data at each step
+        permute = random_permutation(n_samples, rng)
+        lastt = (n_samples // block - 1) * block + 1
+        out = np.empty((block, self.shape[1]), self.data.dtype)
+        for t in range(0, lastt, block):
+            # the same array is reused (and overwritten) for each block
+            np.take(self.data, permute[t:t + block], axis=0, out=out)
+            yield out
+
+    def sample(self, n_samples, rng):
+        """Draw random samples (used for kurtosis estimation)."""
+        if n_samples < self.shape[0]:
+            rp = np.floor(rng.uniform(0, 1, n_samples) * (self.shape[0] - 1))
+            return self.data[rp.astype(int), :]
+        return self.data
+
+
+class _ChunkedBlocks(object):
+    """Draw blocks of samples for infomax from data read in chunks.
+
+    Each pass reads the chunks in random order and shuffles the samples
+    within each chunk, so that only one chunk is in memory at a time.
+    """
+
+    def __init__(self, read_chunk, n_chunks, shape):
+        self.read_chunk = read_chunk  # returns (n_samples, n_features)
+        self.n_chunks = n_chunks
+        self.shape = shape
+        self._current = None
+
+    def iter_blocks(self, block, rng):
+        """Iterate over the blocks of one pass over shuffled samples."""
+        rest = np.empty((0, self.shape[1]))
+        for ci in rng.permutation(self.n_chunks):
+            data = np.concatenate([rest, self.read_chunk(ci)])
+            data = data[rng.permutation(len(data))]
+            self._current = data
+            n_use = (len(data) // block) * block
+            for t in range(0, n_use, block):
+                yield data[t:t + block]
+            rest = data[n_use:]
+
+    def sample(self, n_samples, rng):
+        """Draw random samples of the current chunk."""
+        n_current = len(self._current)
+        rp = np.floor(rng.uniform(0, 1, n_samples) * (n_current - 1))
+        return self._current[rp.astype(int)]
@@ -6,6 +6,7 @@
 
 # License: BSD (3-clause)
 
+from collections import OrderedDict
 from functools import partial
 from math import factorial
 from os import path as op
@@ -26,10 +27,13 @@ from ..io.constants import FIFF
 from ..io.meas_info import _simplify_info
 from ..io.proc_history import _read_ctc
 from ..io.write import _generate_meas_id, DATE_NONE
-from ..io import _loc_to_coil_trans, BaseRaw
+from ..io import _loc_to_coil_trans, BaseRaw, read_raw_fif
+from ..io.utils import _mult_cal_one
 from ..io.pick import pick_types, pick_info
-from ..utils import verbose, logger, _clean_names, warn, _time_mask, _pl
+from ..utils import (verbose, logger, _clean_names, warn, _time_mask, _pl,
+                     _check_fname, object_hash, get_config)
 from ..fixes import _get_args, _safe_svd, _get_sph_harm, einsum
+from ..parallel import parallel_func
 from ..externals.six import string_types
 from ..channels.channels import _get_T1T2_mag_inds
 
@@ -45,7 +49,8 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
                    st_correlation=0.98, coord_frame='head', destination=None,
                    regularize='in', ignore_ref=False, bad_condition='error',
                    head_pos=None, st_fixed=True, st_only=False, mag_scale=100.,
-                   verbose=None):
+                   fname=None, overwrite=False, mc_tolerance=(0., 0.),
+                   n_jobs=1, verbose=None):
     u"""Apply Maxwell filter to data using multipole moments.
 
     .. warning:: Automatic bad channel detection is not currently implemented.
@@ -149,6 +154,49 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
 
         .. versionadded:: 0.13
 
+    fname : str | None
+        If not None, process the data in a streaming fashion: each
+        ``st_duration`` window (or 10-second chunk when ``st_duration`` is
+        None) is read from ``raw`` on demand, which thus does not need to be
+        preloaded, and the filtered data are written directly to this FIF
+        file (see :meth:`mne.io.Raw.save`). Peak memory usage is then
+        proportional to the window length rather than to the duration of
+        the recording. If None (default), the data are loaded and
+        processed in memory.
+
+        .. versionadded:: 0.17
+
+    overwrite : bool
+        If True, overwrite ``fname`` if it already exists. Only used when
+        ``fname`` is not None.
+
+        .. versionadded:: 0.17
+
+    mc_tolerance : tuple of float
+        The translation (in meters) and rotation (in degrees) tolerances
+        used to reuse SSS decompositions across head positions. Positions
+        are quantized with these step sizes, and the decomposition
+        computed for the first position falling into a given bin is
+        reused for all later positions in the same bin. The decompositions
+        are only kept between calls with identical processing parameters
+        (e.g., other runs of the same subject) when the
+        ``MNE_MAXWELL_DECOMP_CACHE_SIZE`` config (see :func:`mne.set_config`)
+        is set to the maximum number of decompositions to keep. The default ``(0., 0.)`` only reuses
+        decompositions for identical positions. Larger values (e.g.,
+        ``(0.0005, 0.1)``) can substantially reduce the computation time
+        of movement compensation for subjects who move little.
+
+        .. versionadded:: 0.17
+
+    n_jobs : int
+        The number of jobs to run in parallel when doing tSSS. Batches of
+        ``n_jobs`` windows are read and prepared sequentially, then their
+        temporal projectors are computed in parallel, so memory usage grows
+        with ``n_jobs`` times the window length. Has no effect when
+        ``st_duration`` is None.
+
+        .. versionadded:: 0.17
+
     verbose : bool, str, int, or None
         If not None, override default verbose level (see :func:`mne.verbose`
         and :ref:`Logging documentation <tut_logging>` for more).
@@ -156,7 +204,8 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
     Returns
     -------
     raw_sss : instance of mne.io.Raw
-        The raw data with Maxwell filtering applied.
+        The raw data with Maxwell filtering applied. If ``fname`` is not
+        None, this is the (not preloaded) raw instance read from ``fname``.
 
     See Also
     --------
@@ -294,6 +343,10 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
             bad_condition not in ['error', 'warning', 'ignore']:
         raise ValueError('bad_condition must be "error", "warning", or '
                          '"ignore", not %s' % bad_condition)
+    mc_tolerance = np.array(mc_tolerance, float)
+    if mc_tolerance.shape != (2,) or (mc_tolerance < 0).any():
+        raise ValueError('mc_tolerance must be two non-negative floats, got '
+                         '%s' % (mc_tolerance,))
     if raw.info['dev_head_t'] is None and coord_frame == 'head':
         raise RuntimeError('coord_frame cannot be "head" because '
                            'info["dev_head_t"] is None; if this is an '
@@ -306,13 +359,22 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
     _check_info(raw.info, sss=not st_only, tsss=st_duration is not None,
                 calibration=not st_only and calibration is not None,
                 ctc=not st_only and cross_talk is not None)
+    if fname is not None:
+        _check_fname(fname, overwrite)
+        if op.realpath(fname) in raw._filenames:
+            raise ValueError('fname must differ from the file name(s) of the '
+                             'raw data being filtered')
 
     # Now we can actually get moving
 
     logger.info('Maxwell filtering raw data')
     add_channels = (head_pos[0] is not None) and not st_only
-    raw_sss, pos_picks = _copy_preload_add_channels(
-        raw, add_channels=add_channels)
+    if fname is None:
+        raw_sss, pos_picks = _copy_preload_add_channels(
+            raw, add_channels=add_channels)
+    else:
+        raw_sss = _RawMaxwellStream(raw, add_channels=add_channels)
+        pos_picks = raw_sss._pos_picks
     del raw
     if not st_only:
         # remove MEG projectors, they won't apply now
@@ -438,78 +500,150 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
             np.zeros(3)])
     else:
         this_pos_quat = None
-    _get_this_decomp_trans = partial(
-        _get_decomp, all_coils=all_coils,
-        cal=calibration, regularize=regularize,
+    decomp_kwargs = dict(
+        all_coils=all_coils, cal=calibration, regularize=regularize,
         exp=exp, ignore_ref=ignore_ref, coil_scale=coil_scale,
         grad_picks=grad_picks, mag_picks=mag_picks, good_picks=good_picks,
         mag_or_fine=mag_or_fine, bad_condition=bad_condition,
         mag_scale=mag_scale)
+    decomp_cache = _get_decomp_cache()
+    _get_this_decomp_trans = partial(
+        _get_cached_decomp, cache=decomp_cache,
+        params_key=_decomp_params_key(decomp_kwargs), tolerance=mc_tolerance,
+        **decomp_kwargs)
+    n_computed, n_reused = decomp_cache.n_computed, decomp_cache.n_reused
     S_decomp, pS_decomp, reg_moments, n_use_in = _get_this_decomp_trans(
         info['dev_head_t'], t=0.)
     reg_moments_0 = reg_moments.copy()
-    # Loop through buffer windows of data
-    n_sig = int(np.floor(np.log10(max(len(read_lims), 0)))) + 1
     logger.info('    Processing %s data chunk%s of (at least) %0.1f sec'
                 % (len(read_lims) - 1, _pl(read_lims),
                    st_duration / info['sfreq']))
-    for ii, (start, stop) in enumerate(zip(read_lims[:-1], read_lims[1:])):
-        rel_times = raw_sss.times[start:stop]
-        t_str = '%8.3f - %8.3f sec' % tuple(rel_times[[0, -1]])
-        t_str += ('(#%d/%d)'
-                  % (ii + 1, len(read_lims) - 1)).rjust(2 * n_sig + 5)
-
-        # Get original data
-        orig_data = raw_sss._data[meg_picks[good_picks], start:stop]
-        # This could just be np.empty if not st_only, but shouldn't be slow
-        # this way so might as well just always take the original data
-        out_meg_data = raw_sss._data[meg_picks, start:stop]
-        # Apply cross-talk correction
-        if cross_talk is not None:
-            orig_data = ctc.dot(orig_data)
-        out_pos_data = np.empty((len(pos_picks), stop - start))
-
-        # Figure out which positions to use
-        t_s_s_q_a = _trans_starts_stops_quats(head_pos, start, stop,
-                                              this_pos_quat)
-        n_positions = len(t_s_s_q_a[0])
-
-        # Set up post-tSSS or do pre-tSSS
-        if st_correlation is not None:
-            # If doing tSSS before movecomp...
-            resid = orig_data.copy()  # to be safe let's operate on a copy
-            if st_when == 'after':
-                orig_in_data = np.empty((len(meg_picks), stop - start))
-            else:  # 'before'
-                avg_trans = t_s_s_q_a[-1]
-                if avg_trans is not None:
-                    # if doing movecomp
-                    S_decomp_st, pS_decomp_st, _, n_use_in_st = \
-                        _get_this_decomp_trans(avg_trans, t=rel_times[0])
-                else:
-                    S_decomp_st, pS_decomp_st = S_decomp, pS_decomp
-                    n_use_in_st = n_use_in
-                orig_in_data = np.dot(np.dot(S_decomp_st[:, :n_use_in_st],
-                                             pS_decomp_st[:n_use_in_st]),
-                                      resid)
-                resid -= np.dot(np.dot(S_decomp_st[:, n_use_in_st:],
-                                       pS_decomp_st[n_use_in_st:]), resid)
-                resid -= orig_in_data
-                # Here we operate on our actual data
-                proc = out_meg_data if st_only else orig_data
-                _do_tSSS(proc, orig_in_data, resid, st_correlation,
-                         n_positions, t_str)
-
-        if not st_only or st_when == 'after':
+    windows = _iter_maxwell_windows(
+        raw_sss, read_lims, meg_picks, good_picks, pos_picks,
+        ctc if cross_talk is not None else None, head_pos, this_pos_quat,
+        st_correlation, st_when, st_only, S_recon,
+        (S_decomp, pS_decomp, reg_moments, n_use_in),
+        _get_this_decomp_trans, n_jobs)
+    if fname is None:
+        for _ in windows:
+            pass
+        _log_decomp_use(decomp_cache, n_computed, n_reused)
+
+    # Update info
+    if not st_only:
+        info['dev_head_t'] = recon_trans  # set the reconstruction transform
+    _update_sss_info(raw_sss, orig_origin, int_order, ext_order,
+                     len(good_picks), orig_coord_frame, sss_ctc, sss_cal,
+                     max_st, reg_moments_0, st_only)
+    if fname is not None:
+        # Writing pulls the windows through the processing one at a time
+        raw_sss._windows = windows
+        raw_sss.save(fname, buffer_size_sec=st_duration / info['sfreq'],
+                     overwrite=overwrite, verbose=False)
+        _log_decomp_use(decomp_cache, n_computed, n_reused)
+        raw_sss = read_raw_fif(fname, verbose=False)
+    logger.info('[done]')
+    return raw_sss
+
+
+def _iter_maxwell_windows(raw_sss, read_lims, meg_picks, good_picks,
+                          pos_picks, ctc, head_pos, this_pos_quat,
+                          st_correlation, st_when, st_only, S_recon, decomp,
+                          get_decomp, n_jobs):
+    """Maxwell filter the data one window at a time.
+
+    Yields the window limits and the processed data of all channels. For
+    preloaded data this data array is a view of ``raw_sss._data`` that is
+    processed in place, otherwise it is read on demand. When doing tSSS,
+    windows are processed in batches of ``n_jobs`` whose temporal projectors
+    are computed in parallel.
+    """
+    S_decomp, pS_decomp, reg_moments, n_use_in = decomp
+    if st_correlation is not None:
+        parallel, p_fun, n_jobs = parallel_func(_overlap_projector, n_jobs)
+    else:
+        parallel = p_fun = None
+        n_jobs = 1
+    # Loop through buffer windows of data
+    n_sig = int(np.floor(np.log10(max(len(read_lims), 0)))) + 1
+    lims = list(zip(read_lims[:-1], read_lims[1:]))
+    for bi in range(0, len(lims), n_jobs):
+        windows = list()
+        for ii, (start, stop) in enumerate(lims[bi:bi + n_jobs], bi):
+            rel_times = raw_sss.times[start:stop]
+            t_str = '%8.3f - %8.3f sec' % tuple(rel_times[[0, -1]])
+            t_str += ('(#%d/%d)'
+                      % (ii + 1, len(read_lims) - 1)).rjust(2 * n_sig + 5)
+
+            # Get original data
+            if raw_sss.preload:
+                data = raw_sss._data[:, start:stop]
+            else:
+                data = raw_sss._read_source(start, stop)
+            orig_data = data[meg_picks[good_picks]]
+            # This could just be np.empty if not st_only, but shouldn't be
+            # slow this way so might as well just always take the original
+            # data
+            out_meg_data = data[meg_picks]
+            # Apply cross-talk correction
+            if ctc is not None:
+                orig_data = ctc.dot(orig_data)
+            out_pos_data = np.empty((len(pos_picks), stop - start))
+
+            # Figure out which positions to use
+            t_s_s_q_a = _trans_starts_stops_quats(head_pos, start, stop,
+                                                  this_pos_quat)
+            if not st_only or st_when == 'after':
+                this_pos_quat = t_s_s_q_a[3][-1]  # used by movecomp below
+            window = dict(start=start, stop=stop, rel_times=rel_times,
+                          t_str=t_str, data=data, orig_data=orig_data,
+                          out_meg_data=out_meg_data, out_pos_data=out_pos_data,
+                          t_s_s_q_a=t_s_s_q_a,
+                          n_positions=len(t_s_s_q_a[0]))
+
+            # Set up post-tSSS or do pre-tSSS
+            if st_correlation is not None:
+                # If doing tSSS before movecomp...
+                resid = orig_data.copy()  # to be safe let's operate on a copy
+                if st_when == 'after':
+                    orig_in_data = np.empty((len(meg_picks), stop - start))
+                else:  # 'before'
+                    avg_trans = t_s_s_q_a[-1]
+                    if avg_trans is not None:
+                        # if doing movecomp
+                        S_decomp_st, pS_decomp_st, _, n_use_in_st = \
+                            get_decomp(avg_trans, t=rel_times[0])
+                    else:
+                        S_decomp_st, pS_decomp_st = S_decomp, pS_decomp
+                        n_use_in_st = n_use_in
+                    orig_in_data = np.dot(
+                        np.dot(S_decomp_st[:, :n_use_in_st],
+                               pS_decomp_st[:n_use_in_st]), resid)
+                    resid -= np.dot(np.dot(S_decomp_st[:, n_use_in_st:],
+                                           pS_decomp_st[n_use_in_st:]), resid)
+                    resid -= orig_in_data
+                    # Here we operate on our actual data
+                    window['proc'] = out_meg_data if st_only else orig_data
+                window.update(orig_in_data=orig_in_data, resid=resid)
+            windows.append(window)
+
+        if st_when == 'before':
+            _do_tSSS(windows, st_correlation, parallel, p_fun)
+
+        for window in windows:
+            if st_only and st_when != 'after':
+                continue
+            orig_data = window['orig_data']
+            rel_times = window['rel_times']
             # Do movement compensation on the data
-            for trans, rel_start, rel_stop, this_pos_quat in \
-                    zip(*t_s_s_q_a[:4]):
+            for trans, rel_start, rel_stop, pos_quat in \
+                    zip(*window['t_s_s_q_a'][:4]):
                 # Recalculate bases if necessary (trans will be None iff the
                 # first position in this interval is the same as last of the
                 # previous interval)
                 if trans is not None:
                     S_decomp, pS_decomp, reg_moments, n_use_in = \
-                        _get_this_decomp_trans(trans, t=rel_times[rel_start])
+                        get_decomp(trans, t=rel_times[rel_start])
 
                 # Determine multipole moments for this interval
                 mm_in = np.dot(pS_decomp[:n_use_in],
@@ -517,43 +651,42 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
 
                 # Our output data
                 if not st_only:
-                    out_meg_data[:, rel_start:rel_stop] = \
+                    window['out_meg_data'][:, rel_start:rel_stop] = \
                         np.dot(S_recon.take(reg_moments[:n_use_in], axis=1),
                                mm_in)
                 if len(pos_picks) > 0:
-                    out_pos_data[:, rel_start:rel_stop] = \
-                        this_pos_quat[:, np.newaxis]
+                    window['out_pos_data'][:, rel_start:rel_stop] = \
+                        pos_quat[:, np.newaxis]
 
                 # Transform orig_data to store just the residual
                 if st_when == 'after':
                     # Reconstruct data using original location from external
                     # and internal spaces and compute residual
-                    rel_resid_data = resid[:, rel_start:rel_stop]
-                    orig_in_data[:, rel_start:rel_stop] = \
+                    rel_resid_data = window['resid'][:, rel_start:rel_stop]
+                    window['orig_in_data'][:, rel_start:rel_stop] = \
                         np.dot(S_decomp[:, :n_use_in], mm_in)
                     rel_resid_data -= np.dot(np.dot(S_decomp[:, n_use_in:],
                                                     pS_decomp[n_use_in:]),
                                              rel_resid_data)
-                    rel_resid_data -= orig_in_data[:, rel_start:rel_stop]
+                    rel_resid_data -= \
+                        window['orig_in_data'][:, rel_start:rel_stop]
 
         # If doing tSSS at the end
         if st_when == 'after':
-            _do_tSSS(out_meg_data, orig_in_data, resid, st_correlation,
-                     n_positions, t_str)
-        elif st_when == 'never' and head_pos[0] is not None:
-            logger.info('        Used % 2d head position%s for %s'
-                        % (n_positions, _pl(n_positions), t_str))
-        raw_sss._data[meg_picks, start:stop] = out_meg_data
-        raw_sss._data[pos_picks, start:stop] = out_pos_data
-
-    # Update info
-    if not st_only:
-        info['dev_head_t'] = recon_trans  # set the reconstruction transform
-    _update_sss_info(raw_sss, orig_origin, int_order, ext_order,
-                     len(good_picks), orig_coord_frame, sss_ctc, sss_cal,
-                     max_st, reg_moments_0, st_only)
-    logger.info('[done]')
-    return raw_sss
+            for window in windows:
+                window['proc'] = window['out_meg_data']
+            _do_tSSS(windows, st_correlation, parallel, p_fun)
+        for window in windows:
+            n_positions = window['n_positions']
+            if st_when == 'never' and head_pos[0] is not None:
+                logger.info('        Used % 2d head position%s for %s'
+                            % (n_positions, _pl(n_positions),
+                               window['t_str']))
+            data = window['data']
+            data[meg_picks] = window['out_meg_data']
+            data[pos_picks] = window['out_pos_data']
+            yield window['start'], window['stop'], data
+        del windows
 
 
 def _get_coil_scale(meg_picks, mag_picks, grad_picks, mag_scale, info):
@@ -709,29 +842,104 @@ def _trans_starts_stops_quats(pos, start, stop, this_pos_data):
     return trans, rel_starts, rel_stops, quats, avg_trans
 
 
-def _do_tSSS(clean_data, orig_in_data, resid, st_correlation,
-             n_positions, t_str):
-    """Compute and apply SSP-like projection vectors based on min corr."""
-    np.asarray_chkfinite(resid)
-    t_proj = _overlap_projector(orig_in_data, resid, st_correlation)
-    # Apply projector according to Eq. 12 in [2]_
-    msg = ('        Projecting %2d intersecting tSSS component%s '
-           'for %s' % (t_proj.shape[1], _pl(t_proj.shape[1], ' '), t_str))
-    if n_positions > 1:
-        msg += ' (across %2d position%s)' % (n_positions,
-                                             _pl(n_positions, ' '))
-    logger.info(msg)
-    clean_data -= np.dot(np.dot(clean_data, t_proj), t_proj.T)
+def _do_tSSS(windows, st_correlation, parallel, p_fun):
+    """Compute and apply SSP-like projection vectors based on min corr.
+
+    The projectors of all windows are computed in parallel and applied to
+    ``window['proc']`` inplace.
+    """
+    for window in windows:
+        np.asarray_chkfinite(window['resid'])
+    t_projs = parallel(p_fun(window['orig_in_data'], window['resid'],
+                             st_correlation) for window in windows)
+    for window, t_proj in zip(windows, t_projs):
+        # Apply projector according to Eq. 12 in [2]_
+        n_positions = window['n_positions']
+        msg = ('        Projecting %2d intersecting tSSS component%s '
+               'for %s' % (t_proj.shape[1], _pl(t_proj.shape[1], ' '),
+                           window['t_str']))
+        if n_positions > 1:
+            msg += ' (across %2d position%s)' % (n_positions,
+                                                 _pl(n_positions, ' '))
+        logger.info(msg)
+        clean_data = window['proc']
+        clean_data -= np.dot(np.dot(clean_data, t_proj), t_proj.T)
+        del window['orig_in_data'], window['resid']
+
+
+_pos_kinds = [FIFF.FIFFV_QUAT_1, FIFF.FIFFV_QUAT_2, FIFF.FIFFV_QUAT_3,
+              FIFF.FIFFV_QUAT_4, FIFF.FIFFV_QUAT_5, FIFF.FIFFV_QUAT_6,
+              FIFF.FIFFV_HPI_G, FIFF.FIFFV_HPI_ERR, FIFF.FIFFV_HPI_MOV]
+
+
+def _add_pos_chs(info):
+    """Add cHPI pos channels to info inplace and return their picks."""
+    off = len(info['ch_names'])
+    chpi_chs = [
+        dict(ch_name='CHPI%03d' % (ii + 1), logno=ii + 1,
+             scanno=off + ii + 1, unit_mul=-1, range=1., unit=-1,
+             kind=_pos_kinds[ii], coord_frame=FIFF.FIFFV_COORD_UNKNOWN,
+             cal=1e-4, coil_type=FIFF.FWD_COIL_UNKNOWN, loc=np.zeros(12))
+        for ii in range(len(_pos_kinds))]
+    info['chs'].extend(chpi_chs)
+    info._update_redundant()
+    info._check_consistency()
+    return np.arange(off, off + len(chpi_chs))
+
+
+class _RawMaxwellStream(BaseRaw):
+    """Raw whose data are Maxwell filtered window by window when read.
+
+    The windows are produced by :func:`_iter_maxwell_windows` (set as
+    ``_windows`` once processing is set up) and must be consumed in order,
+    which is what :meth:`mne.io.Raw.save` does. Only the windows overlapping
+    the most recent read are kept in memory.
+    """
+
+    def __init__(self, raw, add_channels):
+        info = raw.info.copy()
+        pos_picks = _add_pos_chs(info) if add_channels \
+            else np.array([], int)
+        super(_RawMaxwellStream, self).__init__(
+            info, preload=False, first_samps=[raw.first_samp],
+            last_samps=[raw.last_samp], orig_format='double',
+            buffer_size_sec=raw.buffer_size_sec, verbose=raw.verbose)
+        self.set_annotations(raw.annotations, emit_warning=False)
+        self._source = raw
+        self._pos_picks = pos_picks
+        self._windows = None
+        self._cached = list()
+
+    def _read_source(self, start, stop):
+        """Read unprocessed data from the source raw."""
+        data = np.zeros((self.info['nchan'], stop - start))
+        data[:len(self._source.ch_names)] = \
+            self._source._read_segment(start, stop)
+        return data
+
+    def _read_segment_file(self, data, idx, fi, start, stop, cals, mult):
+        """Read a segment of data from the processed windows."""
+        start -= self.first_samp
+        stop -= self.first_samp
+        while len(self._cached) == 0 or self._cached[-1][1] < stop:
+            self._cached.append(next(self._windows))
+        self._cached = [win for win in self._cached if win[1] > start]
+        if self._cached[0][0] > start:
+            raise RuntimeError('Streamed Maxwell filtered data can only be '
+                               'read sequentially')
+        one = np.concatenate(
+            [win_data[:, max(start - win_start, 0):stop - win_start]
+             for win_start, win_stop, win_data in self._cached
+             if win_start < stop], axis=1)
+        one /= self._cals[:, np.newaxis]
+        _mult_cal_one(data, one, idx, cals, mult)
 
 
 def _copy_preload_add_channels(raw, add_channels):
     """Load data for processing and (maybe) add cHPI pos channels."""
     raw = raw.copy()
     if add_channels:
-        kinds = [FIFF.FIFFV_QUAT_1, FIFF.FIFFV_QUAT_2, FIFF.FIFFV_QUAT_3,
-                 FIFF.FIFFV_QUAT_4, FIFF.FIFFV_QUAT_5, FIFF.FIFFV_QUAT_6,
-                 FIFF.FIFFV_HPI_G, FIFF.FIFFV_HPI_ERR, FIFF.FIFFV_HPI_MOV]
-        out_shape = (len(raw.ch_names) + len(kinds), len(raw.times))
+        out_shape = (len(raw.ch_names) + len(_pos_kinds), len(raw.times))
         out_data = np.zeros(out_shape, np.float64)
         msg = '    Appending head position result channels and '
         if raw.preload:
@@ -743,20 +951,8 @@ def _copy_preload_add_channels(raw, add_channels):
             raw._preload_data(out_data[:len(raw.ch_names)], verbose=False)
             raw._data = out_data
         assert raw.preload is True
-        off = len(raw.ch_names)
-        chpi_chs = [
-            dict(ch_name='CHPI%03d' % (ii + 1), logno=ii + 1,
-                 scanno=off + ii + 1, unit_mul=-1, range=1., unit=-1,
-                 kind=kinds[ii], coord_frame=FIFF.FIFFV_COORD_UNKNOWN,
-                 cal=1e-4, coil_type=FIFF.FWD_COIL_UNKNOWN, loc=np.zeros(12))
-            for ii in range(len(kinds))]
-        raw.info['chs'].extend(chpi_chs)
-        raw.info._update_redundant()
-        raw.info._check_consistency()
+        pos_picks = _add_pos_chs(raw.info)
         assert raw._data.shape == (raw.info['nchan'], len(raw.times))
-        # Return the pos picks
-        pos_picks = np.arange(len(raw.ch_names) - len(chpi_chs),
-                              len(raw.ch_names))
         return raw, pos_picks
     else:
         if not raw.preload:
@@ -802,6 +998,125 @@ def _check_pos(pos, head_frame, raw, st_fixed, sfreq):
     return pos
 
 
+class _DecompCache(object):
+    """LRU cache of SSS decompositions for quantized head positions.
+
+    Parameters
+    ----------
+    max_size : int
+        The maximum number of decompositions to keep.
+
+    Attributes
+    ----------
+    n_computed : int
+        The number of decompositions computed so far.
+    n_reused : int
+        The number of times a cached decomposition was reused.
+    """
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.n_computed = self.n_reused = 0
+        self._decomps = OrderedDict()
+
+    def get(self, get_decomp, trans, t, params_key, tolerance):
+        """Get the decomposition for a given device->head transform.
+
+        Returns the decomposition and whether it was reused.
+        """
+        key = (params_key, _quantize_trans(trans, tolerance))
+        decomp = self._decomps.pop(key, None)
+        reused = decomp is not None
+        if reused:
+            self.n_reused += 1
+        else:
+            decomp = get_decomp(trans, t=t)
+            for x in decomp[:3]:
+                x.setflags(write=False)
+            self.n_computed += 1
+            if len(self._decomps) >= self.max_size:
+                self._decomps.popitem(last=False)
+        self._decomps[key] = decomp
+        return decomp, reused
+
+    def clear(self):
+        """Remove all cached decompositions."""
+        self._decomps.clear()
+
+
+# Only used when the decompositions are kept between calls, see
+# _get_decomp_cache
+_decomp_cache = _DecompCache()
+
+
+def _get_decomp_cache():
+    """Get the cache of SSS decompositions for a call to maxwell_filter.
+
+    By default, the decompositions are only reused within a call. Setting
+    the MNE_MAXWELL_DECOMP_CACHE_SIZE config to a positive number keeps that
+    many decompositions between calls, e.g. for several runs of a subject.
+    """
+    max_size = int(get_config('MNE_MAXWELL_DECOMP_CACHE_SIZE', 0))
+    if max_size <= 0:
+        _decomp_cache.clear()
+        return _DecompCache()
+    _decomp_cache.max_size = max_size
+    while len(_decomp_cache._decomps) > max_size:
+        _decomp_cache._decomps.popitem(last=False)
+    return _decomp_cache
+
+
+def _quantize_trans(trans, tolerance):
+    """Get a hashable key for a device->head transform."""
+    if isinstance(trans, Transform):
+        trans = trans['trans']
+    trans = np.asarray(trans, float)
+    if not tolerance.any():
+        return trans.tobytes()
+    quat = rot_to_quat(trans[:3, :3])
+    pos = trans[:3, 3]
+    if tolerance[0] > 0:
+        pos = np.round(pos / tolerance[0])
+    if tolerance[1] > 0:
+        # the quaternion components are the sines of the half angles
+        quat = np.round(quat / np.sin(np.deg2rad(tolerance[1]) / 2.))
+    # adding zero turns -0. into 0.
+    return (np.concatenate([quat, pos]) + 0.).tobytes()
+
+
+def _decomp_params_key(decomp_kwargs):
+    """Hash the processing parameters that determine a decomposition."""
+    params = dict((key, val) for key, val in decomp_kwargs.items()
+                  if key not in ('all_coils', 'cal'))
+    params['all_coils'] = decomp_kwargs['all_coils'][:5]  # not slice_map
+    cal = decomp_kwargs['cal']
+    if cal is not None:
+        params['cal'] = dict(
+            grad_imbalances=cal['grad_imbalances'], mag_cals=cal['mag_cals'],
+            grad_coilsets=[coils[:5] for coils in cal['grad_coilsets']])
+    return object_hash(params)
+
+
+def _get_cached_decomp(trans, t, cache, params_key, tolerance,
+                       **decomp_kwargs):
+    """Get a decomposition from the cache, computing it if necessary."""
+    decomp, reused = cache.get(
+        partial(_get_decomp, **decomp_kwargs), trans, t, params_key,
+        tolerance)
+    if reused:  # log the regularization as if it had been computed
+        _log_reg_moments(decomp_kwargs['regularize'], decomp_kwargs['exp'],
+                         decomp[2], decomp[3], t)
+    return decomp
+
+
+def _log_decomp_use(decomp_cache, n_computed, n_reused):
+    """Log how many decompositions were computed and reused."""
+    n_computed = decomp_cache.n_computed - n_computed
+    n_reused = decomp_cache.n_reused - n_reused
+    logger.info('    Computed %d SSS decomposition%s, reused %d'
+                % (n_computed, _pl(n_computed), n_reused))
+
+
 def _get_decomp(trans, all_coils, cal, regularize, exp, ignore_ref,
                 coil_scale, grad_picks, mag_picks, good_picks, mag_or_fine,
                 bad_condition, t, mag_scale):
@@ -859,7 +1174,6 @@ def _regularize(regularize, exp, S_decomp, mag_or_fine, t, verbose=None):
     # (homogeneous field) components
     int_order, ext_order = exp['int_order'], exp['ext_order']
     n_in, n_out = _get_n_moments([int_order, ext_order])
-    t_str = '%8.3f' % t
     if regularize is not None:  # regularize='in'
         in_removes, out_removes = _regularize_in(
             int_order, ext_order, S_decomp, mag_or_fine)
@@ -870,16 +1184,23 @@ def _regularize(regularize, exp, S_decomp, mag_or_fine, t, verbose=None):
     reg_out_moments = np.setdiff1d(np.arange(n_in, n_in + n_out),
                                    out_removes)
     n_use_in = len(reg_in_moments)
-    n_use_out = len(reg_out_moments)
     reg_moments = np.concatenate((reg_in_moments, reg_out_moments))
     S_decomp = S_decomp.take(reg_moments, axis=1)
     pS_decomp, sing = _col_norm_pinv(S_decomp.copy())
+    _log_reg_moments(regularize, exp, reg_moments, n_use_in, t)
+    return S_decomp, pS_decomp, sing, reg_moments, n_use_in
+
+
+def _log_reg_moments(regularize, exp, reg_moments, n_use_in, t):
+    """Log the number of harmonic components used."""
+    n_in, n_out = _get_n_moments([exp['int_order'], exp['ext_order']])
+    n_use_out = len(reg_moments) - n_use_in
+    t_str = '%8.3f' % t
     if regularize is not None or n_use_out != n_out:
         logger.info('        Using %s/%s harmonic components for %s  '
                     '(%s/%s in, %s/%s out)'
                     % (n_use_in + n_use_out, n_in + n_out, t_str,
                        n_use_in, n_in, n_use_out, n_out))
-    return S_decomp, pS_decomp, sing, reg_moments, n_use_in
 
 
 def _get_mf_picks(info, int_order, ext_order, ignore_ref=False):
@@ -17,7 +17,7 @@ from scipy import stats
 from itertools import product
 
 from mne import (Epochs, read_events, pick_types, create_info, EpochsArray,
-                 EvokedArray, Annotations)
+                 EvokedArray, Annotations, compute_raw_covariance)
 from mne.cov import read_cov
 from mne.preprocessing import (ICA, ica_find_ecg_events, ica_find_eog_events,
                                read_ica, run_ica)
@@ -145,6 +145,101 @@ def test_ica_simple(method):
     assert amari_distance < 0.1
 
 
+@requires_sklearn
+def test_ica_chunked():
+    """Test fitting ICA reading the data in chunks."""
+    n_components = 3
+    n_samples = 6000
+    rng = np.random.RandomState(0)
+    S = rng.laplace(size=(n_components, n_samples))
+    A = rng.randn(5, n_components)
+    data = 1e-6 * (np.dot(A, S) + 1e-3 * rng.randn(5, n_samples))
+    raw = RawArray(data, create_info(5, 1000., 'eeg'))
+    raw.set_annotations(Annotations([1.], [0.5], ['bad']))
+    kwargs = dict(n_components=n_components, method='extended-infomax',
+                  random_state=0)
+    for decim in (None, 3):
+        ica = ICA(**kwargs).fit(raw, decim=decim)
+        ica_chunk = ICA(**kwargs).fit(raw, decim=decim, chunk_duration=0.7)
+        # the PCA is the same
+        assert ica_chunk.n_samples_ == ica.n_samples_
+        assert_allclose(ica_chunk.pre_whitener_, ica.pre_whitener_,
+                        rtol=1e-7)
+        assert_allclose(ica_chunk.pca_mean_, ica.pca_mean_, atol=1e-7)
+        assert_allclose(ica_chunk.pca_explained_variance_,
+                        ica.pca_explained_variance_, rtol=1e-7)
+        assert_allclose(np.abs(np.sum(ica_chunk.pca_components_ *
+                                      ica.pca_components_, axis=1)), 1.,
+                        rtol=1e-5)
+        # and the sources are recovered
+        transform = np.dot(np.dot(ica_chunk.unmixing_matrix_,
+                                  ica_chunk.pca_components_[:n_components]),
+                           A / ica_chunk.pre_whitener_)
+        amari_distance = np.mean(np.sum(np.abs(transform), axis=1) /
+                                 np.max(np.abs(transform), axis=1) - 1.)
+        assert amari_distance < 0.1
+    epochs = Epochs(raw, make_fixed_length_events(raw, duration=0.5),
+                    tmin=0, tmax=0.4, baseline=None, preload=False)
+    ica = ICA(**kwargs).fit(epochs)
+    ica_chunk = ICA(**kwargs).fit(epochs, chunk_duration=1.)
+    assert ica_chunk.current_fit == 'epochs'
+    assert ica_chunk.n_samples_ == ica.n_samples_
+    assert_allclose(ica_chunk.pca_explained_variance_,
+                    ica.pca_explained_variance_, rtol=1e-7)
+    with pytest.raises(ValueError, match='only be used with'):
+        ICA(n_components=n_components).fit(raw, chunk_duration=1.)
+    with pytest.raises(ValueError, match='cannot be used together'):
+        ICA(**kwargs).fit(raw, reject=dict(eeg=1e-3), chunk_duration=1.)
+    with pytest.raises(ValueError, match='must be positive'):
+        ICA(**kwargs).fit(raw, chunk_duration=0.)
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_ica_apply_to_file(n_jobs):
+    """Test applying ICA to non-preloaded raw data written to disk."""
+    tempdir = _TempDir()
+    rng = np.random.RandomState(0)
+    data = 1e-6 * np.dot(rng.randn(6, 4), rng.laplace(size=(4, 3000)))
+    info = create_info(['MEG %03d' % ii for ii in range(6)] + ['STI 014'],
+                       1000., ['mag'] * 6 + ['stim'])
+    data = np.concatenate([data, np.zeros((1, 3000))])
+    raw = RawArray(data, info)
+    raw.info['bads'] = ['MEG 005']
+    raw.save(op.join(tempdir, 'in_raw.fif'), buffer_size_sec=0.3)
+    raw_disk = read_raw_fif(op.join(tempdir, 'in_raw.fif'))
+    raw = raw_disk.copy().load_data()  # same precision as the file
+    for noise_cov in (None, compute_raw_covariance(raw)):
+        ica = ICA(n_components=3, max_pca_components=4, noise_cov=noise_cov,
+                  method='infomax', random_state=0).fit(raw)
+        ica.exclude = [1]
+        fname = op.join(tempdir, 'clean_raw.fif')
+        raw_clean = ica.apply(raw_disk, fname=fname, n_pca_components=4,
+                              n_jobs=n_jobs, overwrite=True)
+        assert not raw_disk.preload and not raw_clean.preload
+        assert raw_clean.ch_names == raw.ch_names
+        raw_ref = ica.apply(raw.copy(), n_pca_components=4)
+        assert_allclose(raw_clean.get_data(), raw_ref.get_data(),
+                        rtol=1e-6, atol=1e-12)
+        sources = ica.get_sources(raw_disk, add_channels=['MEG 000'],
+                                  start=100, stop=2100, n_jobs=n_jobs,
+                                  fname=op.join(tempdir, 'src_raw.fif'),
+                                  overwrite=True)
+        sources_ref = ica.get_sources(raw, add_channels=['MEG 000'],
+                                      start=100, stop=2100)
+        assert sources.ch_names == sources_ref.ch_names
+        assert sources.first_samp == sources_ref.first_samp
+        assert_allclose(sources.get_data(), sources_ref.get_data(),
+                        rtol=1e-6, atol=1e-6)
+    with pytest.raises(IOError, match='exists'):
+        ica.apply(raw_disk, fname=fname)
+    with pytest.raises(ValueError, match='same file'):
+        ica.apply(raw_disk, fname=op.join(tempdir, 'in_raw.fif'))
+    epochs = Epochs(raw, make_fixed_length_events(raw), tmin=0, tmax=0.5,
+                    baseline=None)
+    with pytest.raises(ValueError, match='only be used with Raw'):
+        ica.apply(epochs, fname=fname)
+
+
 @requires_sklearn
 @pytest.mark.parametrize("method", ["fastica", "picard"])
 def test_ica_rank_reduction(method):
@@ -6,6 +6,7 @@
 
 import numpy as np
 from numpy.testing import assert_almost_equal
+import pytest
 
 from scipy import stats
 from scipy import linalg
@@ -129,6 +130,42 @@ def test_infomax_weights_ini():
     assert_almost_equal(w2, weights)
 
 
+def test_infomax_dtype_callback():
+    """Test infomax in single precision and its callback."""
+    rng = np.random.RandomState(0)
+    S = rng.laplace(size=(3, 5000))
+    S[0] = rng.uniform(-1, 1, 5000)  # one sub-gaussian source
+    A = rng.randn(3, 3)
+    X = np.dot(A, S).T
+    X -= X.mean(axis=0)
+    eigval, eigvec = linalg.eigh(np.cov(X.T))
+    whitener = np.dot(eigvec / np.sqrt(eigval), eigvec.T)
+    X = np.dot(X, whitener)  # whitener is symmetric
+    A = np.dot(whitener, A)
+    for extended in (True, False):
+        steps = list()
+        w64 = infomax(X, extended=extended, random_state=0,
+                      callback=steps.append)
+        assert len(steps) > 0
+        # (steps restart from 1 if the weights blow up)
+        assert steps[0]['step'] == 1
+        assert steps[-1]['step'] <= len(steps)
+        for key in ('time', 'change', 'angle', 'l_rate'):
+            assert all(np.isfinite(s[key]) for s in steps)
+        assert steps[-1]['change'] < steps[0]['change']
+        w32 = infomax(X, extended=extended, random_state=0, dtype='float32')
+        assert w32.dtype == np.float64
+        for w in (w64, w32):
+            transform = np.abs(np.dot(w, A))
+            amari_distance = np.mean(np.sum(transform, axis=1) /
+                                     np.max(transform, axis=1) - 1.)
+            assert amari_distance < 0.1
+    with pytest.raises(ValueError, match='float32 or float64'):
+        infomax(X, dtype=int)
+    with pytest.raises(TypeError, match='callable'):
+        infomax(X, callback='foo')
+
+
 @requires_sklearn
 def test_non_square_infomax():
     """Test non-square infomax."""
@@ -3,6 +3,7 @@
 # License: BSD (3-clause)
 
 import os.path as op
+import re
 import numpy as np
 
 from numpy.testing import assert_equal, assert_allclose, assert_array_equal
@@ -10,7 +11,7 @@ import pytest
 from scipy import sparse
 
 from mne import compute_raw_covariance, pick_types
-from mne.chpi import read_head_pos, filter_chpi
+from mne.chpi import read_head_pos, filter_chpi, rot_to_quat
 from mne.forward import _prep_meg_channels
 from mne.cov import _estimate_rank_meeg_cov
 from mne.datasets import testing
@@ -19,7 +20,7 @@ from mne.io import (read_raw_fif, proc_history, read_info, read_raw_bti,
 from mne.preprocessing.maxwell import (
     maxwell_filter, _get_n_moments, _sss_basis_basic, _sh_complex_to_real,
     _sh_real_to_complex, _sh_negate, _bases_complex_to_real, _trans_sss_basis,
-    _bases_real_to_complex, _prep_mf_coils)
+    _bases_real_to_complex, _prep_mf_coils, _decomp_cache)
 from mne.fixes import _get_sph_harm
 from mne.tests.common import assert_meg_snr
 from mne.utils import (_TempDir, run_tests_if_main, catch_logging,
@@ -200,6 +201,94 @@ def test_movement_compensation():
                    chpi_med_tol=5)
 
 
+def _decomp_counts(log):
+    """Get the numbers of computed and reused SSS decompositions."""
+    return tuple(int(x) for x in re.search(
+        'Computed ([0-9]+) SSS decompositions?, reused ([0-9]+)',
+        log.getvalue()).groups())
+
+
+def test_movement_compensation_decomp_count(monkeypatch):
+    """Test counting the SSS decompositions with synthetic head positions."""
+    kit_dir = op.join(io_dir, 'kit', 'tests', 'data')
+    raw = read_raw_kit(op.join(kit_dir, 'test.sqd'),
+                       op.join(kit_dir, 'test_mrk.sqd'),
+                       op.join(kit_dir, 'test_elp.txt'),
+                       op.join(kit_dir, 'test_hsp.txt'))
+    trans = raw.info['dev_head_t']['trans']
+    head_pos = np.zeros((4, 10))
+    head_pos[:, 0] = [0., 0.5, 1., 1.5]
+    head_pos[:, 1:4] = rot_to_quat(trans[:3, :3])
+    head_pos[:, 4:7] = trans[:3, 3]
+    head_pos[1:, 4] += [0.0002, 0.0004, 0.0004]  # the last two are the same
+    kwargs = dict(origin=(0., 0., 0.04), ignore_ref=True, head_pos=head_pos,
+                  verbose=True)
+    monkeypatch.delenv('MNE_MAXWELL_DECOMP_CACHE_SIZE', raising=False)
+    with catch_logging() as log:
+        maxwell_filter(raw, **kwargs)
+    n_computed, n_reused = _decomp_counts(log)
+    assert n_computed > 2
+    assert n_reused >= 1
+    with catch_logging() as log:
+        maxwell_filter(raw, st_duration=1., **kwargs)
+    assert _decomp_counts(log)[0] >= n_computed
+    with catch_logging() as log:
+        maxwell_filter(raw, mc_tolerance=(0.001, 0.), **kwargs)
+    assert _decomp_counts(log)[0] < n_computed
+    # the decompositions are only kept between calls if asked for
+    with catch_logging() as log:
+        maxwell_filter(raw, **kwargs)
+    assert _decomp_counts(log) == (n_computed, n_reused)
+    monkeypatch.setenv('MNE_MAXWELL_DECOMP_CACHE_SIZE', '100')
+    maxwell_filter(raw, **kwargs)
+    with catch_logging() as log:
+        maxwell_filter(raw, **kwargs)
+    assert _decomp_counts(log) == (0, n_computed + n_reused)
+    monkeypatch.setenv('MNE_MAXWELL_DECOMP_CACHE_SIZE', '0')
+    maxwell_filter(raw, **kwargs)
+    assert len(_decomp_cache._decomps) == 0
+
+
+@pytest.mark.slowtest
+@testing.requires_testing_data
+def test_movement_compensation_decomp_cache(monkeypatch):
+    """Test reuse of SSS decompositions across head positions."""
+    raw = read_crop(raw_fname, (0, 4)).load_data()
+    head_pos = read_head_pos(pos_fname)
+    kwargs = dict(head_pos=head_pos, origin=mf_head_origin, regularize=None,
+                  bad_condition='ignore', verbose=True)
+
+    monkeypatch.delenv('MNE_MAXWELL_DECOMP_CACHE_SIZE', raising=False)
+    with catch_logging() as log:
+        raw_sss = maxwell_filter(raw, **kwargs)
+    n_exact = _decomp_counts(log)[0]
+    assert n_exact > 1
+    # by default nothing is kept between calls
+    assert len(_decomp_cache._decomps) == 0
+    with catch_logging() as log:
+        maxwell_filter(raw, **kwargs)
+    assert _decomp_counts(log)[0] == n_exact
+    # unless asked for, then a second run only uses cached decompositions
+    monkeypatch.setenv('MNE_MAXWELL_DECOMP_CACHE_SIZE', '100')
+    maxwell_filter(raw, **kwargs)
+    assert len(_decomp_cache._decomps) == n_exact
+    with catch_logging() as log:
+        raw_sss_2 = maxwell_filter(raw, **kwargs)
+    assert _decomp_counts(log)[0] == 0
+    assert_array_equal(raw_sss_2[:][0], raw_sss[:][0])
+    monkeypatch.setenv('MNE_MAXWELL_DECOMP_CACHE_SIZE', '0')
+    # quantized positions need fewer decompositions at little cost
+    with catch_logging() as log:
+        raw_sss_tol = maxwell_filter(raw, mc_tolerance=(0.001, 0.5),
+                                     **kwargs)
+    assert len(_decomp_cache._decomps) == 0
+    assert _decomp_counts(log)[0] < n_exact
+    assert_meg_snr(raw_sss_tol, raw_sss, 5., 10.)
+    for mc_tolerance in ((0.001,), (-1, 0.)):
+        pytest.raises(ValueError, maxwell_filter, raw,
+                      mc_tolerance=mc_tolerance, **kwargs)
+
+
 @pytest.mark.slowtest
 def test_other_systems():
     """Test Maxwell filtering on KIT, BTI, and CTF files."""
@@ -489,6 +578,35 @@ def test_maxwell_filter_additional():
     assert_equal(cov_sss_rank, _get_n_moments(int_order))
 
 
+@pytest.mark.slowtest
+@testing.requires_testing_data
+def test_maxwell_filter_stream():
+    """Test streaming Maxwell filtering from and to disk."""
+    tempdir = _TempDir()
+    raw = read_crop(raw_fname, (0., 4.))
+    head_pos = read_head_pos(pos_fname)
+    kwargs = dict(origin=mf_head_origin, regularize=None,
+                  bad_condition='ignore')
+    for extra in (dict(), dict(st_duration=1.5, head_pos=head_pos),
+                  dict(st_duration=1., st_only=True)):
+        fname = op.join(tempdir, 'test_raw_sss.fif')
+        raw_sss = maxwell_filter(raw, **dict(kwargs, **extra))
+        raw_stream = maxwell_filter(raw, fname=fname, **dict(kwargs, **extra))
+        assert not raw.preload
+        assert not raw_stream.preload
+        assert raw_stream.ch_names == raw_sss.ch_names
+        assert_equal(
+            raw_stream.info['proc_history'][0]['max_info']['sss_info'],
+            raw_sss.info['proc_history'][0]['max_info']['sss_info'])
+        # Some numerical imprecision since save uses 'single' fmt
+        assert_allclose(raw_stream[:][0], raw_sss[:][0],
+                        rtol=1e-6, atol=1e-20)
+        pytest.raises(IOError, maxwell_filter, raw, fname=fname,
+                      **dict(kwargs, **extra))
+        maxwell_filter(raw, fname=fname, overwrite=True,
+                       **dict(kwargs, **extra))
+
+
 @pytest.mark.slowtest
 @testing.requires_testing_data
 def test_bads_reconstruction():
@@ -540,6 +658,11 @@ def test_spatiotemporal():
         assert (len(py_st) > 0)
         assert_equal(py_st['buflen'], st_duration)
         assert_equal(py_st['subspcorr'], 0.98)
+        # windows processed in parallel give identical results
+        raw_tsss_par = maxwell_filter(
+            raw, st_duration=st_duration, n_jobs=2, **kwargs)
+        assert_allclose(raw_tsss_par[:][0], raw_tsss[:][0], rtol=1e-10,
+                        atol=1e-20)
 
     # Degenerate cases
     pytest.raises(ValueError, maxwell_filter, raw, st_duration=10.,
@@ -11,7 +11,7 @@ import pytest
 
 from mne import (Epochs, read_events, pick_types, compute_raw_covariance,
                  create_info, EpochsArray)
-from mne.io import read_raw_fif
+from mne.io import read_raw_fif, RawArray
 from mne.utils import requires_sklearn, run_tests_if_main
 from mne.preprocessing import maxwell_filter
 from mne.preprocessing.xdawn import Xdawn, _XdawnTransformer
@@ -193,6 +193,37 @@ def test_xdawn_regularization():
     xd.fit(epochs)
 
 
+def test_xdawn_overlap():
+    """Test Xdawn recovery of overlapping evoked responses."""
+    rng = np.random.RandomState(0)
+    sfreq, n_times, n_events = 100., 30, 200
+    evoked = rng.randn(2, 3, n_times)
+    onsets = 50 + np.cumsum(rng.randint(5, 40, n_events))
+    events = np.c_[onsets, np.zeros(n_events, int),
+                   rng.randint(1, 3, n_events)]
+    # sum of the overlapping responses, cut back into epochs
+    signal = np.zeros((3, onsets[-1] + n_times))
+    for onset, kind in events[:, [0, 2]]:
+        signal[:, onset:onset + n_times] += evoked[kind - 1]
+    data = np.array([signal[:, onset:onset + n_times] for onset in onsets])
+    epochs = EpochsArray(data, create_info(3, sfreq, 'eeg'), events,
+                         event_id=dict(a=1, b=2))
+    epochs = epochs[rng.permutation(n_events)]  # shuffled epochs
+    for reg in (None, 0.1, 'oas'):
+        xd = Xdawn(correct_overlap=True, reg=reg)
+        xd.fit(epochs)
+        assert xd.correct_overlap_
+        assert_array_almost_equal(xd.evokeds_['a'].data, evoked[0])
+        assert_array_almost_equal(xd.evokeds_['b'].data, evoked[1])
+        # batched apply of all components is the identity
+        xd.n_components = 3
+        out = xd.apply(epochs)['a']
+        assert_array_almost_equal(out.get_data(), epochs.get_data())
+        raw = RawArray(signal, epochs.info)
+        out = xd.apply(raw)['b']
+        assert_array_almost_equal(out.get_data(), signal)
+
+
 @requires_sklearn
 def test_XdawnTransformer():
     """Test _XdawnTransformer."""
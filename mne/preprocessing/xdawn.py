@@ -5,28 +5,31 @@
 # License: BSD (3-clause)
 
 import numpy as np
-from scipy import linalg
+from scipy import linalg, sparse
 
 from .. import EvokedArray, Evoked
-from ..cov import Covariance, _regularized_covariance
+from ..cov import (Covariance, _regularized_covariance, _apply_scaling_cov,
+                   _undo_scaling_cov, _get_shrinkage, _shrink_covs)
 from ..decoding import TransformerMixin, BaseEstimator
+from ..defaults import _handle_default
 from ..epochs import BaseEpochs
 from ..io import BaseRaw
-from ..io.pick import _pick_data_channels, pick_info
+from ..io.meas_info import create_info
+from ..io.pick import _pick_data_channels, pick_info, _picks_by_type
 from ..utils import logger
 from ..externals.six import iteritems, itervalues
 
+# Number of values processed at once when applying Xdawn to Raw
+_APPLY_BATCH_SIZE = 2 ** 22
+
 
 def _construct_signal_from_epochs(epochs, events, sfreq, tmin):
     """Reconstruct pseudo continuous signal from epochs."""
     n_epochs, n_channels, n_times = epochs.shape
     tmax = tmin + n_times / float(sfreq)
-    start = (np.min(events[:, 0]) + int(tmin * sfreq))
-    stop = (np.max(events[:, 0]) + int(tmax * sfreq) + 1)
-
-    n_samples = stop - start
-    n_epochs, n_channels, n_times = epochs.shape
-    events_pos = events[:, 0] - events[0, 0]
+    events_pos = events[:, 0] - np.min(events[:, 0])
+    n_samples = (np.max(events_pos) + int(tmax * sfreq) -
+                 int(tmin * sfreq) + 1)
 
     raw = np.zeros((n_channels, n_samples))
     for idx in range(n_epochs):
@@ -57,47 +60,93 @@ def _least_square_evoked(epochs_data, events, tmin, sfreq):
     -------
     evokeds : array, shape (n_class, n_components, n_times)
         An concatenated array of evoked data for each event type.
-    toeplitz : array, shape (n_class * n_components, n_channels)
-        An concatenated array of toeplitz matrix for each event type.
+    toeplitz : list of sparse matrix, shape (n_times, n_samples)
+        The sparse toeplitz matrix of each event type, which maps its evoked
+        response onto the pseudo continuous signal.
     """
     n_epochs, n_channels, n_times = epochs_data.shape
     tmax = tmin + n_times / float(sfreq)
 
-    # Deal with shuffled epochs
-    events = events.copy()
-    events[:, 0] -= events[0, 0] + int(tmin * sfreq)
-
     # Construct raw signal
     raw = _construct_signal_from_epochs(epochs_data, events, sfreq, tmin)
 
     # Compute the independent evoked responses per condition, while correcting
-    # for event overlaps.
+    # for event overlaps. The design matrix has one row per class and lag and
+    # a single non-zero per event and lag, so it is kept sparse.
     n_min, n_max = int(tmin * sfreq), int(tmax * sfreq)
     window = n_max - n_min
     n_samples = raw.shape[1]
-    toeplitz = list()
+    onsets = events[:, 0] - np.min(events[:, 0])
     classes = np.unique(events[:, 2])
+    lags = np.arange(window)
+    rows, cols = list(), list()
     for ii, this_class in enumerate(classes):
         # select events by type
-        sel = events[:, 2] == this_class
-
-        # build toeplitz matrix
-        trig = np.zeros((n_samples, 1))
-        ix_trig = (events[sel, 0]) + n_min
-        trig[ix_trig] = 1
-        toeplitz.append(linalg.toeplitz(trig[0:window], trig))
-
-    # Concatenate toeplitz
-    toeplitz = np.array(toeplitz)
-    X = np.concatenate(toeplitz)
+        ix_trig = onsets[events[:, 2] == this_class]
+        rows.append(np.tile(ii * window + lags, len(ix_trig)))
+        cols.append((ix_trig[:, np.newaxis] + lags).ravel())
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    X = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                          shape=(len(classes) * window, n_samples))
+    toeplitz = [X[ii * window:(ii + 1) * window]
+                for ii in range(len(classes))]
 
     # least square estimation
-    predictor = np.dot(linalg.pinv(np.dot(X, X.T)), X)
-    evokeds = np.dot(predictor, raw.T)
-    evokeds = np.transpose(np.vsplit(evokeds, len(classes)), (0, 2, 1))
+    evokeds = np.dot(linalg.pinv(X.dot(X.T).toarray()), X.dot(raw.T))
+    evokeds = evokeds.reshape(len(classes), window, n_channels)
+    evokeds = evokeds.transpose(0, 2, 1)
     return evokeds, toeplitz
 
 
+def _epochs_covariance(epochs_data):
+    """Compute the empirical covariance of concatenated epochs, one at a time.
+
+    This is equivalent to the empirical covariance of ``np.hstack(epochs)``
+    (assumed centered) without making the concatenated copy.
+    """
+    n_epochs, n_channels, n_times = epochs_data.shape
+    cov = np.zeros((n_channels, n_channels))
+    for epoch in epochs_data:
+        cov += np.dot(epoch, epoch.T)
+    cov /= n_epochs * n_times
+    return cov
+
+
+def _shrink_covariance(cov, shrinkage, info):
+    """Shrink an empirical covariance as _regularized_covariance would."""
+    if not 0 <= shrinkage <= 1:
+        raise ValueError('shrinkage must be between 0 and 1, got %s'
+                         % (shrinkage,))
+    if shrinkage == 0.:
+        return cov
+    # the shrinkage target depends on the channel type scalings
+    info = create_info(len(cov), 1000., 'eeg') if info is None else info
+    picks_list = _picks_by_type(info)
+    scalings = _handle_default('scalings_cov_rank', None)
+    cov = cov.copy()
+    _apply_scaling_cov(cov, picks_list, scalings)
+    cov = _shrink_covs(cov, shrinkage)
+    _undo_scaling_cov(cov, picks_list, scalings)
+    return cov
+
+
+def _evoked_covariance(evo, toeplitz, reg, method_params, info):
+    """Compute the covariance of the prototype response."""
+    shrinkage = _get_shrinkage(reg, method_params)
+    if shrinkage is None:
+        if toeplitz is not None:
+            evo = toeplitz.T.dot(evo.T).T
+        return _regularized_covariance(evo, reg, method_params, info)
+    # The prototype signal is only needed through its products, which are
+    # obtained from the (window, window) gram matrix of the design.
+    if toeplitz is None:
+        evo_cov = np.dot(evo, evo.T) / evo.shape[1]
+    else:
+        gram = toeplitz.dot(toeplitz.T).toarray()
+        evo_cov = np.dot(np.dot(evo, gram), evo.T) / toeplitz.shape[1]
+    return _shrink_covariance(evo_cov, shrinkage, info)
+
+
 def _fit_xdawn(epochs_data, y, n_components, reg=None, signal_cov=None,
                events=None, tmin=0., sfreq=1., method_params=None, info=None):
     """Fit filters and coefs using Xdawn Algorithm.
@@ -149,8 +198,13 @@ def _fit_xdawn(epochs_data, y, n_components, reg=None, signal_cov=None,
 
     # Retrieve or compute whitening covariance
     if signal_cov is None:
-        signal_cov = _regularized_covariance(
-            np.hstack(epochs_data), reg, method_params, info)
+        shrinkage = _get_shrinkage(reg, method_params)
+        if shrinkage is None:
+            signal_cov = _regularized_covariance(
+                np.hstack(epochs_data), reg, method_params, info)
+        else:
+            signal_cov = _shrink_covariance(
+                _epochs_covariance(epochs_data), shrinkage, info)
     elif isinstance(signal_cov, Covariance):
         signal_cov = signal_cov.data
     if not isinstance(signal_cov, np.ndarray) or (
@@ -168,14 +222,13 @@ def _fit_xdawn(epochs_data, y, n_components, reg=None, signal_cov=None,
         for c in classes:
             # Prototyped response for each class
             evokeds.append(np.mean(epochs_data[y == c, :, :], axis=0))
-            toeplitzs.append(1.)
+            toeplitzs.append(None)
 
     filters = list()
     patterns = list()
     for evo, toeplitz in zip(evokeds, toeplitzs):
         # Estimate covariance matrix of the prototype response
-        evo = np.dot(evo, toeplitz)
-        evo_cov = _regularized_covariance(evo, reg, method_params, info)
+        evo_cov = _evoked_covariance(evo, toeplitz, reg, method_params, info)
 
         # Fit spatial filters
         try:
@@ -570,14 +623,13 @@ class Xdawn(_XdawnTransformer):
             raise ValueError('Raw data must be preloaded to apply Xdawn')
 
         raws = dict()
+        n_batch = max(_APPLY_BATCH_SIZE // len(picks), 1)
         for eid in event_id:
-            data = raw[picks, :][0]
-
-            data = self._pick_sources(data, include, exclude, eid)
-
+            proj = self._get_projector(include, exclude, eid)
             raw_r = raw.copy()
-
-            raw_r[picks, :] = data
+            for start in range(0, raw_r._data.shape[1], n_batch):
+                sl = slice(start, start + n_batch)
+                raw_r._data[picks, sl] = np.dot(proj, raw_r._data[picks, sl])
             raws[eid] = raw_r
         return raws
 
@@ -588,14 +640,12 @@ class Xdawn(_XdawnTransformer):
 
         # special case where epochs come picked but fit was 'unpicked'.
         epochs_dict = dict()
-        data = np.hstack(epochs.get_data()[:, picks])
-
         for eid in event_id:
-
-            data_r = self._pick_sources(data, include, exclude, eid)
-            data_r = np.array(np.split(data_r, len(epochs.events), 1))
-            epochs_r = epochs.copy().load_data()
-            epochs_r._data[:, picks, :] = data_r
+            proj = self._get_projector(include, exclude, eid)
+            epochs_r = epochs.copy()
+            # one epoch at a time to avoid copying the whole data
+            for epoch in epochs_r._data:
+                epoch[picks] = np.dot(proj, epoch[picks])
             epochs_dict[eid] = epochs_r
 
         return epochs_dict
@@ -615,26 +665,25 @@ class Xdawn(_XdawnTransformer):
 
         return evokeds
 
-    def _pick_sources(self, data, include, exclude, eid):
-        """Aux method."""
+    def _get_projector(self, include, exclude, eid):
+        """Get the matrix zeroing out the selected components of the data."""
         logger.info('Transforming to Xdawn space')
-
-        # Apply unmixing
-        sources = np.dot(self.filters_[eid].T, data)
-
+        keep = np.ones(len(self.filters_[eid]), dtype=np.bool)
         if include not in (None, list()):
-            mask = np.ones(len(sources), dtype=np.bool)
-            mask[np.unique(include)] = False
-            sources[mask] = 0.
-            logger.info('Zeroing out %i Xdawn components' % mask.sum())
+            keep[:] = False
+            keep[np.unique(include)] = True
+            logger.info('Zeroing out %i Xdawn components' % (~keep).sum())
         elif exclude not in (None, list()):
             exclude_ = np.unique(exclude)
-            sources[exclude_] = 0.
+            keep[exclude_] = False
             logger.info('Zeroing out %i Xdawn components' % len(exclude_))
         logger.info('Inverse transforming to sensor space')
-        data = np.dot(self.patterns_[eid], sources)
+        return np.dot(self.patterns_[eid][:, keep],
+                      self.filters_[eid][:, keep].T)
 
-        return data
+    def _pick_sources(self, data, include, exclude, eid):
+        """Aux method."""
+        return np.dot(self._get_projector(include, exclude, eid), data)
 
     def inverse_transform(self):
         """Not implemented, see Xdawn.apply() instead."""
@@ -8,16 +8,22 @@
 
 from inspect import isgenerator
 from collections import namedtuple
+from math import ceil
 
 import numpy as np
 from scipy import linalg, sparse
 
 from ..externals.six import string_types
 from ..source_estimate import SourceEstimate
-from ..epochs import BaseEpochs
+from ..epochs import BaseEpochs, _is_good
 from ..evoked import Evoked, EvokedArray
-from ..utils import logger, _reject_data_segments, warn
-from ..io.pick import pick_types, pick_info
+from ..utils import logger, warn, object_hash
+from ..io.pick import pick_types, pick_info, channel_indices_by_type
+
+# Number of values read at once by linear_regression_raw
+_CHUNK_SIZE = 2 ** 22
+# Cholesky factorization of the last predictor matrix
+_gram_cache = dict()
 
 
 def linear_regression(inst, design_matrix, names=None):
@@ -229,7 +235,11 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
         X is of shape (n_times, n_predictors * time_window_length).
         y is of shape (n_channels, n_times).
         If str, must be ``'cholesky'``, in which case the solver used is
-        ``linalg.solve(dot(X.T, X), dot(X.T, y))``.
+        ``linalg.solve(dot(X.T, X), dot(X.T, y))``. The Cholesky factorization
+        of ``dot(X.T, X)`` is reused by subsequent calls with the same
+        predictors (events, time windows, covariates and rejected segments),
+        and ``dot(X.T, y)`` is accumulated while reading the data in chunks,
+        so that the full data are never loaded at once.
 
     Returns
     -------
@@ -247,34 +257,33 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
     if isinstance(solver, string_types):
         if solver not in {"cholesky"}:
             raise ValueError("No such solver: {0}".format(solver))
-        if solver == 'cholesky':
-            def solver(X, y):
-                a = (X.T * X).toarray()  # dot product of sparse matrices
-                return linalg.solve(a, X.T * y, sym_pos=True,
-                                    overwrite_a=True, overwrite_b=True).T
-    elif callable(solver):
-        pass
-    else:
+    elif not callable(solver):
         raise TypeError("The solver must be a str or a callable.")
 
-    # build data
-    data, info, events = _prepare_rerp_data(raw, events, picks=picks,
-                                            decim=decim)
+    # check events and channels
+    picks, info, events = _prepare_rerp_data(raw, events, picks=picks,
+                                             decim=decim)
+    n_samples = len(range(0, raw.n_times, decim))
 
     if event_id is None:
         event_id = dict((str(v), v) for v in set(events[:, 2]))
 
     # build predictors
     X, conds, cond_length, tmin_s, tmax_s = _prepare_rerp_preds(
-        n_samples=data.shape[1], sfreq=info["sfreq"], events=events,
+        n_samples=n_samples, sfreq=info["sfreq"], events=events,
         event_id=event_id, tmin=tmin, tmax=tmax, covariates=covariates)
 
     # remove "empty" and contaminated data points
-    X, data = _clean_rerp_input(X, data, reject, flat, decim, info, tstep)
+    X, has_val = _clean_rerp_input(X, raw, picks, reject, flat, decim, info,
+                                   tstep)
 
     # solve linear system
-    coefs = solver(X, data.T)
-    if coefs.shape[0] != data.shape[0]:
+    if solver == 'cholesky':
+        coefs = _solve_rerp_cholesky(X, raw, picks, decim, has_val)
+    else:
+        data = _read_rerp_data(raw, picks, decim, 0, n_samples)
+        coefs = solver(X, data[:, has_val].T)
+    if coefs.shape[0] != len(picks):
         raise ValueError("solver output has unexcepted shape. Supply a "
                          "function that returns coefficients in the form "
                          "(n_targets, n_features), where targets == channels.")
@@ -286,14 +295,12 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
 
 
 def _prepare_rerp_data(raw, events, picks=None, decim=1):
-    """Prepare events and data, primarily for `linear_regression_raw`."""
+    """Prepare events and channels, primarily for `linear_regression_raw`."""
     if picks is None:
         picks = pick_types(raw.info, meg=True, eeg=True, ref_meg=True)
     info = pick_info(raw.info, picks)
     decim = int(decim)
     info["sfreq"] /= decim
-    data, times = raw[:]
-    data = data[picks, ::decim]
     if len(set(events[:, 0])) < len(events[:, 0]):
         raise ValueError("`events` contains duplicate time points. Make "
                          "sure all entries in the first column of `events` "
@@ -309,7 +316,18 @@ def _prepare_rerp_data(raw, events, picks=None, decim=1):
                          "different events, drop close events, or choose a "
                          "different decimation factor.")
 
-    return data, info, events
+    return picks, info, events
+
+
+def _read_rerp_data(raw, picks, decim, start, stop):
+    """Read the decimated data between two decimated samples."""
+    return raw[picks, start * decim:min(stop * decim, raw.n_times)][0][
+        :, ::decim]
+
+
+def _rerp_chunk_size(n_channels, step=1):
+    """Get a number of samples multiple of step to read at once."""
+    return step * max(_CHUNK_SIZE // (n_channels * step), 1)
 
 
 def _prepare_rerp_preds(n_samples, sfreq, events, event_id=None, tmin=-.1,
@@ -369,19 +387,71 @@ def _prepare_rerp_preds(n_samples, sfreq, events, event_id=None, tmin=-.1,
     return sparse.hstack(xs), conds, cond_length, tmin_s, tmax_s
 
 
-def _clean_rerp_input(X, data, reject, flat, decim, info, tstep):
-    """Remove empty and contaminated points from data & predictor matrices."""
+def _clean_rerp_input(X, raw, picks, reject, flat, decim, info, tstep):
+    """Remove empty and contaminated points from the predictor matrix.
+
+    Returns the predictor matrix restricted to the remaining data points,
+    and their indices.
+    """
     # find only those positions where at least one predictor isn't 0
     has_val = np.unique(X.nonzero()[0])
 
-    # reject positions based on extreme steps in the data
+    # reject positions based on extreme steps in the data, one (decimated)
+    # chunk at a time as in _reject_data_segments
     if reject is not None:
-        _, inds = _reject_data_segments(data, reject, flat, decim=None,
-                                        info=info, tstep=tstep)
-        for t0, t1 in inds:
-            has_val = np.setdiff1d(has_val, range(t0, t1))
-
-    return X.tocsr()[has_val], data[:, has_val]
+        idx_by_type = channel_indices_by_type(info)
+        step = int(ceil(tstep * info['sfreq']))
+        n_chunk = _rerp_chunk_size(len(picks), step)
+        drop = np.zeros(X.shape[0], bool)
+        n_good = 0
+        for start in range(0, X.shape[0], n_chunk):
+            data = _read_rerp_data(raw, picks, decim, start, start + n_chunk)
+            for first in range(0, data.shape[1] - step + 1, step):
+                if _is_good(data[:, first:first + step], info['ch_names'],
+                            idx_by_type, reject, flat,
+                            ignore_chs=info['bads']):
+                    n_good += 1
+                else:
+                    first += start
+                    logger.info("Artifact detected in [%d, %d]"
+                                % (first, first + step))
+                    drop[first:first + step] = True
+        if n_good == 0:
+            raise RuntimeError('No clean segment found. Please '
+                               'consider updating your rejection '
+                               'thresholds.')
+        has_val = has_val[~drop[has_val]]
+
+    return X.tocsr()[has_val], has_val
+
+
+def _get_gram_factor(X):
+    """Get the Cholesky factorization of X.T X, reusing the last one."""
+    key = object_hash(dict(shape=X.shape, indptr=X.indptr,
+                           indices=X.indices, data=X.data))
+    if _gram_cache.get('key') != key:
+        _gram_cache.clear()
+        gram = (X.T * X).toarray()  # dot product of sparse matrices
+        _gram_cache['factor'] = linalg.cho_factor(gram, overwrite_a=True)
+        _gram_cache['key'] = key
+    else:
+        logger.info('Reusing the factorization of the predictor matrix')
+    return _gram_cache['factor']
+
+
+def _solve_rerp_cholesky(X, raw, picks, decim, has_val):
+    """Solve for all channels at once, reading the data in chunks."""
+    factor = _get_gram_factor(X)
+    X = X.T  # CSC, for fast slicing of the samples
+    x_y = np.zeros((X.shape[0], len(picks)))
+    n_chunk = _rerp_chunk_size(len(picks))
+    for start in range(0, len(range(0, raw.n_times, decim)), n_chunk):
+        first, last = np.searchsorted(has_val, [start, start + n_chunk])
+        if first == last:  # no predictor, no need to read the data
+            continue
+        data = _read_rerp_data(raw, picks, decim, start, start + n_chunk)
+        x_y += X[:, first:last].dot(data[:, has_val[first:last] - start].T)
+    return linalg.cho_solve(factor, x_y, overwrite_b=True).T
 
 
 def _make_evokeds(coefs, conds, cond_length, tmin_s, tmax_s, info):
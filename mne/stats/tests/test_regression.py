@@ -10,11 +10,13 @@ import numpy as np
 from numpy.testing import assert_array_equal, assert_allclose, assert_equal
 import pytest
 
+from scipy import linalg
 from scipy.signal import hann
 
 import mne
 from mne import read_source_estimate
 from mne.datasets import testing
+from mne.stats import regression
 from mne.stats.regression import linear_regression, linear_regression_raw
 from mne.io import RawArray
 from mne.utils import requires_sklearn, run_tests_if_main
@@ -153,4 +155,31 @@ def test_continuous_regression_with_overlap():
     pytest.raises(TypeError, linear_regression_raw, raw, events, solver=0)
 
 
+def test_continuous_regression_chunks(monkeypatch):
+    """Test regression reading the data in chunks."""
+    rng = np.random.RandomState(0)
+    data = rng.randn(2, 5000) * 1e-6
+    data[1, 2000:2010] = 1e-3  # artifact
+    raw = RawArray(data, mne.create_info(2, 100., 'eeg'), first_samp=10)
+    onsets = np.sort(rng.choice(np.arange(25, 2450), 100, replace=False)) * 2
+    events = np.c_[onsets + 10, np.zeros(100, int), rng.randint(1, 3, 100)]
+
+    def solver(X, y):
+        return linalg.lstsq(X.toarray(), y)[0].T
+
+    monkeypatch.setattr(regression, '_CHUNK_SIZE', 50)
+    for kwargs in (dict(), dict(reject=dict(eeg=1e-4), tstep=.3),
+                   dict(decim=2)):
+        want = linear_regression_raw(raw, events, tmin=-.1, tmax=.3,
+                                     solver=solver, **kwargs)
+        for _ in range(2):  # the second call reuses the factorization
+            got = linear_regression_raw(raw, events, tmin=-.1, tmax=.3,
+                                        **kwargs)
+            for cond in want:
+                assert_allclose(got[cond].data, want[cond].data,
+                                rtol=1e-10, atol=1e-20)
+    with pytest.raises(RuntimeError, match='No clean segment'):
+        linear_regression_raw(raw, events, reject=dict(eeg=1e-9))
+
+
 run_tests_if_main()
@@ -17,7 +17,9 @@ from mne.io.constants import FIFF
 from mne.chpi import (_calculate_chpi_positions, _calculate_chpi_coil_locs,
                       _calculate_head_pos_ctf, head_pos_to_trans_rot_t,
                       read_head_pos, write_head_pos, filter_chpi,
-                      _get_hpi_info, _get_hpi_initial_fit)
+                      _get_hpi_info, _get_hpi_initial_fit,
+                      _setup_hpi_struct, _fit_cHPI_amplitudes,
+                      _iter_chpi_amplitudes)
 from mne.transforms import rot_to_quat, _angle_between_quats
 from mne.simulation import simulate_raw
 from mne.utils import run_tests_if_main, _TempDir, catch_logging
@@ -372,6 +374,32 @@ def test_calculate_chpi_coil_locs():
                     [-0.0157762, 0.06655744, 0.00545172], atol=1e-3)
 
 
+@testing.requires_testing_data
+def test_chpi_amplitudes_batch():
+    """Test batched cHPI amplitude fitting against per-window fitting."""
+    raw = read_raw_fif(chpi_fif_fname, allow_maxshield='yes')
+    raw.crop(0., 5.)
+    n_window = int(round(0.2 * raw.info['sfreq']))
+    hpi = _setup_hpi_struct(raw.info, n_window)
+    # include a truncated window at the start
+    fit_idxs = np.concatenate([[10], raw.time_as_index(
+        np.arange(0.1, raw.times[-1], 0.3), use_rounding=True)])
+    want = list()
+    for midpt in fit_idxs:
+        start = midpt - n_window // 2
+        time_sl = slice(max(start, 0),
+                        min(start + n_window, len(raw.times)))
+        want.append(_fit_cHPI_amplitudes(raw, time_sl, hpi, 0.))
+    for batch_size in (None, 4):
+        got = [sin_fit for _, sin_fit in
+               _iter_chpi_amplitudes(raw, fit_idxs, hpi, batch_size)]
+        assert len(got) == len(want)
+        for g, w in zip(got, want):
+            # the sign of our fits is arbitrary
+            g = g * np.sign((g * w).sum(-1, keepdims=True))
+            assert_allclose(g, w, rtol=1e-6, atol=1e-9)
+
+
 @testing.requires_testing_data
 def test_chpi_subtraction():
     """Test subtraction of cHPI signals."""
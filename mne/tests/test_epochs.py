@@ -869,6 +869,23 @@ def test_split_saving():
         assert_array_equal(epochs.events, epochs2.events)
 
 
+def test_gzip_seek_points(monkeypatch):
+    """Test reading gzipped epochs using seek points."""
+    monkeypatch.setattr('mne.io.utils._GZIP_INDEX_SPACING', 2 ** 14)
+    tempdir = _TempDir()
+    raw = mne.io.RawArray(np.random.RandomState(0).randn(10, 10000),
+                          mne.create_info(10, 1000.))
+    epochs = mne.Epochs(raw, mne.make_fixed_length_events(raw, 1),
+                        tmin=0, tmax=0.5, baseline=None, preload=True)
+    fname = op.join(tempdir, 'test-epo.fif.gz')
+    epochs.save(fname)
+    assert op.isfile(fname + '.idx')
+    epochs_read = read_epochs(fname, preload=False)
+    for ii in (8, 2, 5, 0):
+        assert_allclose(epochs_read[ii].get_data(), epochs[ii].get_data(),
+                        rtol=1e-6)
+
+
 def test_epochs_proj():
     """Test handling projection (apply proj in Raw or in Epochs)."""
     tempdir = _TempDir()
@@ -1510,11 +1510,13 @@ known_config_types = (
     'MNE_DATASETS_FIELDTRIP_CMC_PATH',
     'MNE_DATASETS_PHANTOM_4DBTI_PATH',
     'MNE_FORCE_SERIAL',
+    'MNE_IO_N_THREADS',
     'MNE_KIT2FIFF_STIM_CHANNELS',
     'MNE_KIT2FIFF_STIM_CHANNEL_CODING',
     'MNE_KIT2FIFF_STIM_CHANNEL_SLOPE',
     'MNE_KIT2FIFF_STIM_CHANNEL_THRESHOLD',
     'MNE_LOGGING_LEVEL',
+    'MNE_MAXWELL_DECOMP_CACHE_SIZE',
     'MNE_MEMMAP_MIN_SIZE',
     'MNE_SKIP_FTP_TESTS',
     'MNE_SKIP_NETWORK_TESTS',